@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Compare peak memory and time of the json.load and streaming cache loaders.
+
+Each loader runs in a fresh subprocess so its peak RSS is measured in
+isolation. The cache is generated in a subprocess as well: ru_maxrss is
+inherited across fork and exec, so a large parent would mask the children. Usage: python benchmarks/bench_load_memory.py [--meetings N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, resource, sys, time
+from granola_mcp_server.server import GranolaMCPServer
+server = GranolaMCPServer(cache_path=sys.argv[1])
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+cache_data = server._read_and_parse(previous=None)
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "peak_rss_kb": peak, "baseline_rss_kb": baseline,
+                  "meetings": len(cache_data.meetings)}))
+"""
+
+
+def run_loader(cache_path: str, streaming: bool) -> dict:
+    env = dict(os.environ, GRANOLA_STREAMING_LOAD="1" if streaming else "0", GRANOLA_SNAPSHOT="0")
+    out = subprocess.run([sys.executable, "-c", CHILD, cache_path], env=env, cwd=ROOT,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--meetings", type=int, default=1000)
+    parser.add_argument("--segments", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "cache-v3.json")
+        subprocess.run([sys.executable, str(ROOT / "benchmarks" / "synthetic_cache.py"), cache_path,
+                        "--meetings", str(args.meetings), "--segments", str(args.segments)], check=True)
+        size_mb = os.path.getsize(cache_path) / 1e6
+
+        print(f"cache: {args.meetings} meetings, {size_mb:.1f} MB")
+        for name, streaming in (("json.load", False), ("streaming", True)):
+            result = run_loader(cache_path, streaming)
+            print(f"{name:>10}: {result['seconds']:.2f}s, peak RSS {result['peak_rss_kb'] / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Compare construction cost and size of the slotted models and their pydantic predecessors.
+
+Field values (titles, dates, note bodies, transcript segments) are parsed
+once from a synthetic cache and shared by both runs, so the numbers cover
+only what the models themselves cost per meeting: one metadata, one
+document and one transcript. Needs the ``bench`` extra for pydantic.
+Usage: uv run --extra bench python benchmarks/bench_models.py [--meetings N]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from granola_mcp_server import parsing  # noqa: E402
+from granola_mcp_server.arena import ArenaText  # noqa: E402
+from granola_mcp_server.models import (  # noqa: E402
+    MeetingDocument, MeetingMetadata, MeetingTranscript, TranscriptSegments,
+)
+from synthetic_cache import generate_state  # noqa: E402
+
+
+class PydanticMetadata(BaseModel):
+    id: str
+    title: str
+    date: datetime
+    duration: Optional[int] = None
+    participants: List[str] = []
+    meeting_type: Optional[str] = None
+    platform: Optional[str] = None
+
+
+class PydanticDocument(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True, populate_by_name=True)
+
+    id: str
+    meeting_id: str
+    title: str
+    body: Union[str, ArenaText] = Field(alias="content")
+    document_type: str
+    created_at: datetime
+    tags: List[str] = []
+
+
+class PydanticTranscript(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    meeting_id: str
+    segments: TranscriptSegments
+    speakers: List[str] = []
+    language: Optional[str] = None
+    confidence: Optional[float] = None
+
+
+def prepare_fields(meetings: int, segments: int) -> list:
+    """Parsed field values per meeting, ready to be turned into models."""
+    state = generate_state(meetings, segments)
+    fields = []
+    for meeting_id, entry in state["documents"].items():
+        meeting = parsing.parse_meeting(meeting_id, entry)
+        transcript = parsing.transcript_fields(meeting_id, state["transcripts"][meeting_id])
+        content = "\n\n".join(sum(parsing.document_parts(meeting_id, entry), []))
+        fields.append((meeting_id, meeting.title, meeting.date, meeting.participants, content, transcript))
+    return fields
+
+
+def build(fields: list, metadata, document, transcript) -> list:
+    models = []
+    for meeting_id, title, date, participants, content, (segments, speakers) in fields:
+        models.append((
+            metadata(id=meeting_id, title=title, date=date, duration=None, participants=list(participants),
+                     meeting_type="meeting", platform=None),
+            document(id=meeting_id, meeting_id=meeting_id, title=title, content=content,
+                     document_type="meeting_notes", created_at=date, tags=[]),
+            transcript(meeting_id=meeting_id, segments=segments, speakers=list(speakers),
+                       language=None, confidence=None),
+        ))
+    return models
+
+
+def measure(fields: list, classes: tuple, repeat: int) -> dict:
+    best = min(_timed(fields, classes) for _ in range(repeat))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    models = build(fields, *classes)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del models
+    return {"us_per_meeting": best / len(fields) * 1e6, "bytes_per_meeting": allocated / len(fields)}
+
+
+def _timed(fields: list, classes: tuple) -> float:
+    started = time.perf_counter()
+    build(fields, *classes)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--meetings", type=int, default=5000)
+    parser.add_argument("--segments", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fields = prepare_fields(args.meetings, args.segments)
+    print(f"{args.meetings} meetings, construction of metadata + document + transcript")
+    for name, classes in (("pydantic", (PydanticMetadata, PydanticDocument, PydanticTranscript)),
+                          ("slotted", (MeetingMetadata, MeetingDocument, MeetingTranscript))):
+        result = measure(fields, classes, args.repeat)
+        print(f"{name:>9}: {result['us_per_meeting']:.1f} µs/meeting, "
+              f"{result['bytes_per_meeting']:.0f} bytes/meeting")
+
+
+if __name__ == "__main__":
+    main()
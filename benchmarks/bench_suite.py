@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Time cold load, every tool handler and reload at several cache sizes.
+
+For each size a synthetic cache and an edited copy of it are generated,
+then a fresh subprocess loads the cache, calls each tool through the
+server's dispatcher (first call, which includes any index built on first
+use, and the median of the warm calls), swaps in the edited copy and
+reloads. Peak RSS is read after every phase. The response cache and the
+snapshot store are disabled so every call and load does the full work;
+other GRANOLA_* variables are passed through and recorded.
+
+Results are written as JSON; ``--compare`` prints them against an
+earlier results file. Usage:
+python benchmarks/bench_suite.py [--sizes 1000,10000,50000] [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+GENERATOR = ROOT / "benchmarks" / "synthetic_cache.py"
+
+# Meetings edited in the copy used for the reload, per 1000 meetings
+MODIFIED_PER_THOUSAND = 10
+
+
+def tool_calls(meetings: int) -> Dict[str, tuple]:
+    """Benchmark name -> (tool, arguments) for the tools served over a cache of ``meetings``."""
+    first, middle = "meeting-000000", f"meeting-{meetings // 2:06d}"
+    batch = [f"meeting-{i:06d}" for i in range(0, meetings, max(1, meetings // 20))][:20]
+    return {
+        "search_bm25": ("search_meetings", {"query": "pricing review", "limit": 10}),
+        "search_legacy": ("search_meetings", {"query": "pricing review", "limit": 10, "ranking": "legacy"}),
+        "semantic_search": ("semantic_search", {"query": "hiring plan for the roadmap", "limit": 10}),
+        "meeting_details": ("get_meeting_details", {"meeting_id": middle}),
+        "meeting_transcript": ("get_meeting_transcript", {"meeting_id": middle}),
+        "meeting_documents": ("get_meeting_documents", {"meeting_id": first}),
+        "meetings_batch": ("get_meetings_batch", {"meeting_ids": batch}),
+        "patterns_participants": ("analyze_meeting_patterns", {"pattern_type": "participants"}),
+        "patterns_frequency": ("analyze_meeting_patterns", {"pattern_type": "frequency"}),
+        "patterns_topics": ("analyze_meeting_patterns", {"pattern_type": "topics"}),
+        "patterns_content_topics": ("analyze_meeting_patterns", {"pattern_type": "content_topics"}),
+    }
+
+
+async def child(cache_path: str, modified_path: str, meetings: int, repeat: int) -> Dict[str, Any]:
+    """Run one size in this process; called in a fresh subprocess by ``run_size``."""
+    import resource
+
+    sys.path.insert(0, str(ROOT))
+    from granola_mcp_server.server import GranolaMCPServer
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+
+    def peak_rss_mb() -> float:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_unit / 1e6
+
+    server = GranolaMCPServer(cache_path=cache_path)
+    phases: Dict[str, float] = {}
+
+    def timed(name: str, method):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                phases[name] = time.perf_counter() - started
+        return wrapper
+
+    server._read_and_parse = timed("read_and_parse_s", server._read_and_parse)
+    server._build_indexes = timed("build_indexes_s", server._build_indexes)
+
+    result: Dict[str, Any] = {"baseline_rss_mb": peak_rss_mb()}
+
+    started = time.perf_counter()
+    await server._ensure_cache_loaded(timeout=None)
+    result["load"] = dict(phases, total_s=time.perf_counter() - started,
+                          meetings=len(server.cache_data.meetings), peak_rss_mb=peak_rss_mb())
+
+    tools = {}
+    for name, (tool, arguments) in tool_calls(meetings).items():
+        started = time.perf_counter()
+        output = await server._call_tool(tool, arguments)
+        first = time.perf_counter() - started
+        warm = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await server._call_tool(tool, arguments)
+            warm.append(time.perf_counter() - started)
+        tools[name] = {"first_ms": first * 1e3, "median_ms": statistics.median(warm) * 1e3,
+                       "output_chars": sum(len(content.text) for content in output)}
+    result["tools"] = tools
+    result["tools_peak_rss_mb"] = peak_rss_mb()
+
+    # Replace the file the way Granola does, and make sure the stat changes
+    os.replace(modified_path, cache_path)
+    later = time.time_ns() + 2_000_000_000
+    os.utime(cache_path, ns=(later, later))
+    phases.clear()
+    started = time.perf_counter()
+    await server._ensure_cache_loaded(timeout=None)
+    # Reloads run in the background while calls are answered from the old snapshot
+    if server._load_task is not None:
+        await server._load_task
+    reload_s = time.perf_counter() - started
+    started = time.perf_counter()
+    await server._call_tool(*tool_calls(meetings)["search_bm25"])
+    result["reload"] = dict(phases, total_s=reload_s, first_search_ms=(time.perf_counter() - started) * 1e3,
+                            version=server.snapshot.version, peak_rss_mb=peak_rss_mb())
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def generate(path: str, meetings: int, segments: int, panel_depth: int, modified: int = 0) -> float:
+    """Write a synthetic cache in a subprocess (so it does not raise this process's RSS); returns seconds."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, str(GENERATOR), path, "--meetings", str(meetings),
+                    "--segments", str(segments), "--panel-depth", str(panel_depth),
+                    "--modified", str(modified)], check=True)
+    return time.perf_counter() - started
+
+
+def run_size(meetings: int, args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "cache-v3.json")
+        modified_path = os.path.join(tmp, "cache-v3.modified.json")
+        modified = max(1, meetings * MODIFIED_PER_THOUSAND // 1000)
+        generate_s = generate(cache_path, meetings, args.segments, args.panel_depth)
+        generate(modified_path, meetings, args.segments, args.panel_depth, modified)
+        file_mb = os.path.getsize(cache_path) / 1e6
+
+        env = dict(os.environ, GRANOLA_SNAPSHOT="0", GRANOLA_RESPONSE_CACHE_ENTRIES="0")
+        out = subprocess.run([sys.executable, __file__, "--child", cache_path, modified_path,
+                              str(meetings), str(args.repeat)],
+                             env=env, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+    return dict(meetings=meetings, modified=modified, file_mb=file_mb, generate_s=generate_s, **result)
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "granola_env": {key: value for key, value in sorted(os.environ.items()) if key.startswith("GRANOLA_")},
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    """Numeric metrics of a results file keyed like ``1000/load.total_s``."""
+    metrics = {}
+
+    def walk(prefix: str, value: Any):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(f"{prefix}.{key}" if prefix else key, item)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[prefix] = float(value)
+
+    for run in results["runs"]:
+        for key, value in run.items():
+            if key != "meetings":
+                walk(f"{run['meetings']}/{key}", value)
+    return metrics
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Lines comparing the time and memory metrics two results files have in common."""
+    before, after = flatten(previous), flatten(current)
+    lines = [f"{'metric':<48} {'before':>10} {'after':>10} {'ratio':>7}"]
+    for key in sorted(before.keys() & after.keys()):
+        if not key.endswith(("_s", "_ms", "_mb")):
+            continue
+        ratio = after[key] / before[key] if before[key] else float("nan")
+        lines.append(f"{key:<48} {before[key]:>10.2f} {after[key]:>10.2f} {ratio:>6.2f}x")
+    return lines
+
+
+def summary(run: Dict[str, Any]) -> List[str]:
+    load, reload = run["load"], run["reload"]
+    lines = [f"{run['meetings']} meetings ({run['file_mb']:.0f} MB): "
+             f"load {load['total_s']:.2f}s (parse {load.get('read_and_parse_s', 0):.2f}s, "
+             f"index {load.get('build_indexes_s', 0):.2f}s), "
+             f"reload of {run['modified']} {reload['total_s']:.2f}s, peak RSS {run['peak_rss_mb']:.0f} MB"]
+    for name, timing in run["tools"].items():
+        lines.append(f"  {name:<26} first {timing['first_ms']:>9.1f} ms   warm {timing['median_ms']:>9.1f} ms")
+    return lines
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        import asyncio
+        cache_path, modified_path, meetings, repeat = sys.argv[2:6]
+        print(json.dumps(asyncio.run(child(cache_path, modified_path, int(meetings), int(repeat)))))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,50000", help="comma-separated meeting counts")
+    parser.add_argument("--segments", type=int, default=100, help="transcript segments per meeting")
+    parser.add_argument("--panel-depth", type=int, default=2, help="list nesting of panel paragraphs")
+    parser.add_argument("--repeat", type=int, default=5, help="warm calls per tool")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        "environment": environment(),
+        "config": {"segments": args.segments, "panel_depth": args.panel_depth, "repeat": args.repeat},
+        "runs": [],
+    }
+    for meetings in (int(size) for size in args.sizes.split(",")):
+        run = run_size(meetings, args)
+        results["runs"].append(run)
+        print("\n".join(summary(run)), flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous: Optional[Dict[str, Any]] = json.load(f)
+        print("\n".join(compare(previous, results)))
+
+
+if __name__ == "__main__":
+    main()
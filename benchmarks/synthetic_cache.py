@@ -0,0 +1,121 @@
+"""Generate synthetic Granola caches in the nested cache-v3.json layout.
+
+The file wraps a JSON string under ``cache`` whose ``state`` holds
+``documents`` (with ProseMirror ``notes``), ``transcripts`` as lists of
+timed speech segments and ``documentPanels``. Output is deterministic for
+a given seed; ``modified`` edits the first meetings afterwards, giving a
+second version of the same cache to measure reloads against.
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+WORDS = [
+    "pricing", "budget", "roadmap", "hiring", "customer", "launch", "design", "review",
+    "migration", "onboarding", "metrics", "churn", "renewal", "contract", "security",
+    "latency", "deploy", "incident", "quarter", "forecast", "pipeline", "partner",
+] + [f"term{i}" for i in range(4000)]
+STOPWORDS = ["the", "a", "and", "of", "to", "we", "that", "is", "it", "so", "yeah", "like"]
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    # Roughly Zipfian: stopwords dominate, then a long tail of content words
+    words = []
+    for _ in range(length):
+        if rng.random() < 0.4:
+            words.append(rng.choice(STOPWORDS))
+        else:
+            words.append(WORDS[min(int(rng.paretovariate(1.1)) - 1, len(WORDS) - 1)])
+    return " ".join(words)
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _panel_node(text: str, depth: int) -> Dict[str, Any]:
+    """A paragraph nested ``depth - 1`` bullet lists deep."""
+    node = {"type": "paragraph", "content": [{"type": "text", "text": text}]}
+    for _ in range(depth - 1):
+        node = {"type": "bulletList", "content": [{"type": "listItem", "content": [node]}]}
+    return node
+
+
+def generate_state(meetings: int, segments: int = 200, seed: int = 0, panel_depth: int = 1,
+                   modified: int = 0) -> Dict[str, Any]:
+    """Build a Granola ``state`` dict with documents, transcripts and panels.
+
+    ``segments`` is the transcript length of each meeting, ``panel_depth``
+    how deeply panel paragraphs are nested in lists and ``modified`` how
+    many meetings (the first ones) get an edited title, notes and one
+    more transcript segment.
+    """
+    rng = random.Random(seed)
+    documents, transcripts, panels = {}, {}, {}
+    for i in range(meetings):
+        meeting_id = f"meeting-{i:06d}"
+        start = datetime(2022 + i % 3, 1 + i % 12, 1 + i % 28, 9 + i % 8)
+        created = _timestamp(start)
+        documents[meeting_id] = {
+            "id": meeting_id,
+            "title": _sentence(rng, 4).title(),
+            "created_at": created,
+            "updated_at": created,
+            "people": [{"name": f"Person {rng.randint(0, 300)}"} for _ in range(rng.randint(1, 6))],
+            "notes_plain": _sentence(rng, 150) if i % 2 else "",
+            "notes": {"type": "doc", "content": [
+                {"type": "paragraph", "content": [{"type": "text", "text": _sentence(rng, 20)}]}
+                for _ in range(5)
+            ]},
+        }
+        transcripts[meeting_id] = [
+            {
+                "id": f"{meeting_id}-{j}",
+                "text": _sentence(rng, 15),
+                "source": rng.choice(["microphone", "system"]),
+                "start_timestamp": _timestamp(start + timedelta(seconds=4 * j)),
+                "end_timestamp": _timestamp(start + timedelta(seconds=4 * j + 3.5)),
+                "is_final": True,
+            }
+            for j in range(segments)
+        ]
+        panels[meeting_id] = {
+            f"panel-{k}": {"content": [_panel_node(_sentence(rng, 30), panel_depth)]}
+            for k in range(2)
+        }
+
+    for meeting_id in list(documents)[:modified]:
+        document = documents[meeting_id]
+        document["title"] += " (Edited)"
+        document["notes_plain"] += " Follow-up added after the meeting."
+        document["updated_at"] = _timestamp(datetime(2025, 1, 1))
+        transcripts[meeting_id].append(dict(transcripts[meeting_id][-1], id=f"{meeting_id}-edit",
+                                            text="one more thing before we go"))
+    return {"documents": documents, "transcripts": transcripts, "documentPanels": panels}
+
+
+def write_cache(path: str, meetings: int, segments: int = 200, seed: int = 0, panel_depth: int = 1,
+                modified: int = 0):
+    """Write a nested cache-v3.json file."""
+    state = generate_state(meetings, segments, seed, panel_depth, modified)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"cache": json.dumps({"state": state})}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--meetings", type=int, default=1000)
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--panel-depth", type=int, default=1)
+    parser.add_argument("--modified", type=int, default=0)
+    args = parser.parse_args()
+    write_cache(args.path, args.meetings, args.segments, args.seed, args.panel_depth, args.modified)
+
+
+if __name__ == "__main__":
+    main()
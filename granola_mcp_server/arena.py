@@ -0,0 +1,177 @@
+"""Memory-mapped storage for transcript and document bodies.
+
+Bodies are appended to one arena file and models keep an ArenaText handle
+(offset, length) instead of the string, so the text stays in the page
+cache and only what a tool returns is decoded. Each body is stored in the
+narrowest fixed-width encoding that holds all of its characters (latin-1,
+UTF-16 or UTF-32, the same choice CPython makes for ``str``), which keeps
+ASCII text at one byte per character and turns any character range into
+a byte range.
+"""
+
+import mmap
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Encoding per bytes-per-character width
+CODECS = {1: "latin-1", 2: "utf-16-le", 4: "utf-32-le"}
+
+# Rewrite the arena once it holds this many times the live bytes (and at least MIN_COMPACT_BYTES)
+COMPACT_RATIO = 2
+MIN_COMPACT_BYTES = 64 * 1024 * 1024
+
+
+class TextArena:
+    """An append-only file of encoded bodies, read through a memory map.
+
+    Writers append from the loading thread while tool handlers read; the
+    map is replaced (never resized in place) when it no longer covers the
+    file, so readers holding the previous map are unaffected.
+    """
+
+    # Open arenas by path, so unpickled handles share one map per file
+    _open: Dict[str, "TextArena"] = {}
+    _open_lock = threading.Lock()
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = str(path) if path is not None else None
+        if self.path is None:
+            # Anonymous arena: gone with the process, never pickled
+            self._file = tempfile.TemporaryFile()
+        else:
+            self._file = open(self.path, "a+b")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "TextArena":
+        """The arena stored at ``path``, shared by every caller; raises FileNotFoundError."""
+        path = str(path)
+        with cls._open_lock:
+            arena = cls._open.get(path)
+            if arena is None:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(path)
+                arena = cls._open[path] = cls(path)
+            return arena
+
+    @classmethod
+    def create(cls, directory: Union[str, Path], prefix: str) -> "TextArena":
+        """A new, empty arena file in ``directory``."""
+        Path(directory).mkdir(mode=0o700, parents=True, exist_ok=True)
+        handle, path = tempfile.mkstemp(dir=directory, prefix=f"{prefix}-", suffix=".arena")
+        os.close(handle)
+        with cls._open_lock:
+            arena = cls._open[path] = cls(path)
+        return arena
+
+    def store(self, text: str) -> "ArenaText":
+        """Append ``text``; the handle is readable after the next ``flush``."""
+        widest = max(text) if text else "\0"
+        width = 1 if widest <= "\xff" else 2 if widest <= "\uffff" else 4
+        data = text.encode(CODECS[width], "surrogatepass")
+        with self._lock:
+            offset = self.size
+            self._file.write(data)
+            self.size += len(data)
+        return ArenaText(self, offset, len(text), width)
+
+    def flush(self):
+        self._file.flush()
+
+    def read(self, start: int, end: int, width: int) -> str:
+        """Decode the bytes [start, end) written with ``width``."""
+        if start == end:
+            return ""
+        view = self._map
+        if view is None or end > len(view):
+            view = self._remap(end)
+        return view[start:end].decode(CODECS[width], "surrogatepass")
+
+    def _remap(self, end: int) -> mmap.mmap:
+        with self._lock:
+            if self._map is None or end > len(self._map):
+                self._file.flush()
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map
+
+    def unlink(self):
+        """Remove the file; maps and handles already open keep working."""
+        if self.path is None:
+            return
+        with self._open_lock:
+            self._open.pop(self.path, None)
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class ArenaText:
+    """Handle to a body in a TextArena: its length in characters and where it starts.
+
+    Supports ``len``, indexing and slicing (decoding only that range),
+    ``str`` (decoding all of it) and comparison with strings.
+    """
+    __slots__ = ("arena", "offset", "length", "width")
+
+    def __init__(self, arena: TextArena, offset: int, length: int, width: int):
+        self.arena = arena
+        self.offset = offset
+        self.length = length
+        self.width = width
+
+    @property
+    def nbytes(self) -> int:
+        return self.length * self.width
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, key: Union[int, slice]) -> str:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step != 1:
+                return str(self)[key]
+            stop = max(stop, start)
+        else:
+            start = key + self.length if key < 0 else key
+            if not 0 <= start < self.length:
+                raise IndexError("arena text index out of range")
+            stop = start + 1
+        return self.arena.read(self.offset + start * self.width, self.offset + stop * self.width, self.width)
+
+    def __str__(self) -> str:
+        return self.arena.read(self.offset, self.offset + self.nbytes, self.width)
+
+    def __repr__(self) -> str:
+        return f"ArenaText(offset={self.offset}, length={self.length}, width={self.width})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ArenaText):
+            if other.arena is self.arena and other.offset == self.offset:
+                return other.length == self.length
+            return other.length == self.length and str(other) == str(self)
+        if isinstance(other, str):
+            return len(other) == self.length and other == str(self)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __reduce__(self):
+        if self.arena.path is None:
+            raise TypeError("text in an anonymous arena cannot be pickled")
+        return _restore, (self.arena.path, self.offset, self.length, self.width)
+
+
+def _restore(path: str, offset: int, length: int, width: int) -> ArenaText:
+    return ArenaText(TextArena.open(path), offset, length, width)
+
+
+def text_of(body: Union[str, ArenaText]) -> str:
+    """A body as a string, decoding it if it lives in an arena."""
+    return body if isinstance(body, str) else str(body)
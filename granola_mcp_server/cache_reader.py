@@ -0,0 +1,261 @@
+"""Streaming reader for Granola's nested cache-v3.json layout.
+
+Granola stores its state as a JSON document whose ``cache`` key holds the
+real payload as one escaped JSON string. Decoding it the obvious way keeps
+the outer document, the unescaped inner string and the fully decoded inner
+dict alive at once. This reader instead unescapes the inner string a chunk
+at a time and decodes one ``documents``/``transcripts``/``documentPanels``
+entry at a time, so only a small window of text and the entry currently
+being parsed are ever held in memory.
+"""
+
+import codecs
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from .stats import PhaseClock
+
+CHUNK_SIZE = 1 << 20
+
+SECTIONS = ("documents", "transcripts", "documentPanels")
+
+# (section, entry key, decoded value, raw JSON text of the value or None)
+CacheEntry = Tuple[str, str, Any, Optional[str]]
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_HIGH_SURROGATE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}')
+_decoder = json.JSONDecoder()
+
+
+class UnsupportedLayout(ValueError):
+    """The file is not in the nested ``{"cache": "<json>"}`` layout."""
+
+
+class _TextWindow:
+    """A refillable window over a stream of text chunks."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, minimum: int = 1) -> bool:
+        """Drop consumed text and append at least ``minimum`` characters."""
+        pieces = [self.buf[self.pos:]]
+        added = 0
+        while added < minimum:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                break
+            pieces.append(chunk)
+            added += len(chunk)
+        self.buf = "".join(pieces)
+        self.pos = 0
+        return added > 0
+
+    def _decode(self, decode) -> Tuple[Any, int]:
+        """Run ``decode(buf, pos)``, growing the window while the value is cut off."""
+        while True:
+            try:
+                value, end = decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                # Grow geometrically so a large value is re-scanned O(1) times
+                self.fill(max(CHUNK_SIZE, len(self.buf) - self.pos))
+                continue
+            if end >= len(self.buf) and not self.eof:
+                # A number could continue past the window
+                self.fill()
+                continue
+            return value, end
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character ('' at end of input)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof or not self.fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}, found {found!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def read_string(self) -> str:
+        self.expect('"')
+        value, self.pos = self._decode(scanstring)
+        return value
+
+    def read_value(self) -> Tuple[Any, str]:
+        """Decode the next JSON value, returning it with its raw text."""
+        self.peek()
+        value, end = self._decode(_decoder.raw_decode)
+        raw = self.buf[self.pos:end]
+        self.pos = end
+        return value, raw
+
+    def skip_value(self):
+        self.peek()
+        _, self.pos = self._decode(_decoder.raw_decode)
+
+    def members(self) -> Iterator[str]:
+        """Yield the keys of the object at the current position.
+
+        The caller must consume each member's value before advancing.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(':')
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.buf, self.pos - 1)
+
+
+def _file_chunks(path: str, clock: PhaseClock) -> Iterator[str]:
+    """Read a UTF-8 file as text chunks."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        while True:
+            with clock.phase("read"):
+                data = f.read(CHUNK_SIZE)
+                text = decoder.decode(data, final=not data)
+            if text:
+                yield text
+            if not data:
+                return
+
+
+def _ends_with_high_surrogate(text: str, start: int, end: int) -> bool:
+    """Whether the escaped run text[start:end] ends in a high-surrogate escape.
+
+    Such an escape must be decoded together with the low half that follows.
+    The backslash only starts an escape if it is preceded by an even number
+    of backslashes within the run.
+    """
+    if end - start < 6 or not _HIGH_SURROGATE.match(text, end - 6):
+        return False
+    i = end - 7
+    while i >= start and text[i] == '\\':
+        i -= 1
+    return (end - 7 - i) % 2 == 0
+
+
+def _safe_cut(text: str, start: int, end: int) -> int:
+    """Largest cut <= end that does not split an escape sequence in text[start:end].
+
+    ``start`` must itself be on an escape boundary.
+    """
+    last = text.rfind('\\', max(start, end - 6), end)
+    if last != -1:
+        run = last
+        while run > start and text[run - 1] == '\\':
+            run -= 1
+        # Backslashes in a run alternate between starting and being escaped
+        if (last - run) % 2 == 0 and (last + 1 >= end or (text[last + 1] == 'u' and last + 6 > end)):
+            end = last
+    if _ends_with_high_surrogate(text, start, end):
+        end -= 6
+    return end
+
+
+def _unescaped_chunks(outer: _TextWindow, clock: PhaseClock) -> Iterator[str]:
+    """Decode the JSON string starting at ``outer.pos`` (after its opening quote) chunk by chunk."""
+    while True:
+        with clock.phase("outer_decode"):
+            end = len(outer.buf) if outer.eof else _safe_cut(outer.buf, outer.pos, len(outer.buf))
+            # The appended quote stands in for a closing quote beyond the window
+            segment = outer.buf[outer.pos:end] + '"'
+            text, stop = scanstring(segment, 0)
+        if text:
+            yield text
+        if stop < len(segment):
+            outer.pos += stop
+            return
+        outer.pos = end
+        if not outer.fill(CHUNK_SIZE):
+            raise json.JSONDecodeError("Unterminated string", outer.buf, outer.pos)
+
+
+def _iter_state_entries(window: _TextWindow, clock: PhaseClock) -> Iterator[CacheEntry]:
+    """Yield section entries from the decoded inner cache document."""
+    if window.peek() != '{':
+        raise UnsupportedLayout("inner cache payload is not a JSON object")
+
+    # Sections outside "state" are only used when there is no "state" key
+    top_level: Dict[str, Any] = {}
+    saw_state = False
+    for key in window.members():
+        if key == "state" and window.peek() == '{':
+            saw_state = True
+            for section in window.members():
+                if section in SECTIONS and window.peek() == '{':
+                    for entry_key in window.members():
+                        clock.start("inner_decode")
+                        try:
+                            value, raw = window.read_value()
+                        finally:
+                            clock.stop()
+                        yield section, entry_key, value, raw
+                else:
+                    window.skip_value()
+        elif key in SECTIONS and not saw_state:
+            top_level[key], _ = window.read_value()
+        else:
+            window.skip_value()
+
+    if not saw_state:
+        yield from iter_dict_entries(top_level)
+
+
+def iter_cache_entries(path: str, clock: Optional[PhaseClock] = None) -> Iterator[CacheEntry]:
+    """Stream section entries out of a nested Granola cache file.
+
+    Raises UnsupportedLayout before yielding anything if the file does not
+    wrap its payload in a ``cache`` string. Time spent reading the file,
+    unescaping the ``cache`` string and decoding entries goes to ``clock``.
+    """
+    clock = clock or PhaseClock()
+    outer = _TextWindow(_file_chunks(path, clock))
+    if outer.peek() != '{':
+        raise UnsupportedLayout("cache file is not a JSON object")
+
+    found = False
+    for key in outer.members():
+        if key == "cache" and outer.peek() == '"' and not found:
+            found = True
+            outer.pos += 1
+            chunks = _unescaped_chunks(outer, clock)
+            yield from _iter_state_entries(_TextWindow(chunks), clock)
+            # Consume whatever follows the inner document up to the closing quote
+            for _ in chunks:
+                pass
+        else:
+            outer.skip_value()
+
+    if not found:
+        raise UnsupportedLayout("cache file has no nested 'cache' string")
+
+
+def iter_dict_entries(raw_data: Dict[str, Any]) -> Iterator[CacheEntry]:
+    """Yield section entries from already-decoded cache state."""
+    for section in SECTIONS:
+        entries = raw_data.get(section)
+        if isinstance(entries, dict):
+            for key, value in entries.items():
+                yield section, key, value, None
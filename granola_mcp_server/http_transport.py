@@ -0,0 +1,141 @@
+"""Streamable HTTP and SSE transports, so one warm process serves many clients.
+
+Every session shares the server's snapshot, indexes and response cache,
+and the cache starts loading when the app starts rather than when the
+first client connects. Sessions run their tool calls as concurrent tasks
+on one event loop; index builds and scoring run in worker threads.
+"""
+
+import asyncio
+import os
+import socket
+import stat
+import sys
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from mcp.server.transport_security import TransportSecuritySettings
+from starlette.applications import Starlette
+from starlette.routing import Mount, Route
+from starlette.types import Receive, Scope, Send
+
+if TYPE_CHECKING:
+    from .server import GranolaMCPServer
+
+TRANSPORTS = ("http", "sse")
+HTTP_PATH = "/mcp"
+SSE_PATH = "/sse"
+MESSAGES_PATH = "/messages/"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def local_security() -> TransportSecuritySettings:
+    """Reject requests whose Host or Origin is not the loopback address (DNS rebinding)."""
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=["127.0.0.1:*", "localhost:*", "[::1]:*"],
+        allowed_origins=["http://127.0.0.1:*", "http://localhost:*", "http://[::1]:*"],
+    )
+
+
+class _ASGIEndpoint:
+    """Wraps a coroutine so Starlette routes to it as a raw ASGI app."""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.handler(scope, receive, send)
+
+
+def http_app(granola: "GranolaMCPServer", transport: str = "http",
+             security: Optional[TransportSecuritySettings] = None) -> Starlette:
+    """ASGI app serving ``granola`` over streamable HTTP at /mcp or SSE at /sse."""
+    if transport == "http":
+        manager = StreamableHTTPSessionManager(app=granola.server, security_settings=security)
+
+        @asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            granola._preload()
+            async with manager.run():
+                yield
+
+        routes: list = [Route(HTTP_PATH, endpoint=_ASGIEndpoint(manager.handle_request))]
+
+    elif transport == "sse":
+        sse = SseServerTransport(MESSAGES_PATH, security_settings=security)
+
+        async def handle_sse(scope: Scope, receive: Receive, send: Send):
+            async with sse.connect_sse(scope, receive, send) as (read_stream, write_stream):
+                await granola.server.run(read_stream, write_stream, granola._initialization_options())
+
+        @asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            granola._preload()
+            yield
+
+        routes = [Route(SSE_PATH, endpoint=_ASGIEndpoint(handle_sse), methods=["GET"]),
+                  Mount(MESSAGES_PATH, app=sse.handle_post_message)]
+
+    else:
+        raise ValueError(f"Unsupported HTTP transport: {transport}. Use one of {', '.join(TRANSPORTS)}.")
+
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+def bind_unix_socket(path: str) -> socket.socket:
+    """A listening Unix socket at ``path`` that only the current user can connect to."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)  # left over from a previous run
+    except FileNotFoundError:
+        pass
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Created without group/other permissions, so no other user can connect in between
+    umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(umask)
+    sock.listen(128)
+    return sock
+
+
+async def serve_http(granola: "GranolaMCPServer", transport: str = "http", host: str = DEFAULT_HOST,
+                     port: int = DEFAULT_PORT, socket_path: Optional[str] = None,
+                     stop: Optional[asyncio.Event] = None):
+    """Serve on ``socket_path`` if given, else on ``host``:``port``, until interrupted or ``stop`` is set."""
+    import uvicorn
+
+    if socket_path:
+        # Browsers cannot reach a Unix socket, so Host checks would only get in the way
+        app = http_app(granola, transport)
+        sockets = [bind_unix_socket(socket_path)]
+    else:
+        if host not in LOCAL_HOSTS:
+            print(f"Warning: serving meeting data on {host}:{port} without authentication", file=sys.stderr)
+        app = http_app(granola, transport, local_security() if host in LOCAL_HOSTS else None)
+        sockets = None
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+
+    async def exit_on_stop():
+        await stop.wait()
+        server.should_exit = True
+
+    watcher = asyncio.ensure_future(exit_on_stop()) if stop is not None else None
+    try:
+        await server.serve(sockets=sockets)
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if socket_path:
+            try:
+                os.unlink(socket_path)
+            except FileNotFoundError:
+                pass
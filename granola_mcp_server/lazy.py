@@ -0,0 +1,138 @@
+"""Deferred parsing of document and transcript entries.
+
+With GRANOLA_LAZY_PARSE a load parses only meeting metadata. Each document
+and transcript keeps its raw cache entry in a LazyEntry, and its model is
+built the first time a tool looks the meeting up, then kept. Index builds
+visit every meeting; they go through ``peek``, which parses without
+keeping the model, so memory follows the meetings actually viewed.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from .models import MeetingDocument, MeetingMetadata, MeetingTranscript
+from .parsing import assemble_document, build_transcript, needs_panel, run_job
+
+# (raw JSON text or None, decoded value or None) of a cache entry
+RawEntry = Tuple[Optional[str], Any]
+
+Model = Union[MeetingDocument, MeetingTranscript]
+
+
+class LazyEntry:
+    """A document or transcript cache entry and, once loaded, its model.
+
+    ``source`` holds the raw entry (and a document's raw panel) until the
+    model is kept. It is cleared only after ``model`` is set, so a reader
+    in another thread that finds no source always finds the model. An
+    entry found to have no content drops its source on any parse, leaving
+    both None.
+    Reloads carry unchanged entries over, so a model loaded through one
+    snapshot is shared with the next.
+    """
+    __slots__ = ("kind", "key", "meeting", "source", "model")
+
+    def __init__(self, kind: str, key: str, entry: RawEntry, meeting: Optional[MeetingMetadata] = None,
+                 panel: Optional[RawEntry] = None):
+        self.kind = kind
+        self.key = key
+        self.meeting = meeting
+        self.source: Optional[Tuple[RawEntry, Optional[RawEntry]]] = (entry, panel)
+        self.model: Optional[Model] = None
+
+    @property
+    def meeting_id(self) -> str:
+        # Granola keys documents and transcripts by their meeting
+        return self.key
+
+    @property
+    def empty(self) -> bool:
+        """Whether the entry was parsed and found to have no content."""
+        return self.source is None and self.model is None
+
+    def peek(self) -> Optional[Model]:
+        """The model, parsed without keeping it unless it was already loaded."""
+        source = self.source
+        if source is None:
+            return self.model
+        model = self._parse(*source)
+        if model is None:
+            self.source = None
+        return model
+
+    def load(self) -> Optional[Model]:
+        """The model, parsed on the first call and kept."""
+        source = self.source
+        if source is None:
+            return self.model
+        self.model = self._parse(*source)
+        self.source = None
+        return self.model
+
+    def _parse(self, entry: RawEntry, panel: Optional[RawEntry]) -> Optional[Model]:
+        if self.kind == "transcript":
+            fields = run_job(("transcript", self.key, *entry))
+            return build_transcript(self.key, fields) if fields else None
+        # A document whose fields cannot be read stays, empty: the meeting index already lists it
+        parts = run_job(("document", self.key, *entry)) or ([], [])
+        panel_text = run_job(("panel", self.key, *panel)) if panel and needs_panel(parts) else ""
+        return assemble_document(self.key, parts, panel_text or "", self.meeting)
+
+
+class LazySection(Mapping):
+    """Documents or transcripts by key, parsed from LazyEntry objects on access.
+
+    Lookups by key keep the model they parse; iterating values or items
+    parses transiently. Entries without content (a transcript with no
+    speech) are absent, but only once a parse has found them empty:
+    ``in`` and ``len`` go by the raw entries and parse nothing, so they
+    can count an empty entry that was never looked at, and a lookup of a
+    key that is ``in`` the section can still miss.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, LazyEntry]] = None):
+        self.entries: Dict[str, LazyEntry] = entries if entries is not None else {}
+
+    def __getitem__(self, key: str) -> Model:
+        model = self.entries[key].load()
+        if model is None:
+            raise KeyError(key)
+        return model
+
+    def __contains__(self, key: object) -> bool:
+        entry = self.entries.get(key)
+        return entry is not None and not entry.empty
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self.items())
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self.entries.values() if not entry.empty)
+
+    def items(self) -> Iterator[Tuple[str, Model]]:
+        for key, entry in list(self.entries.items()):
+            model = entry.peek()
+            if model is not None:
+                yield key, model
+
+    def values(self) -> Iterator[Model]:
+        return (model for _, model in self.items())
+
+
+def peek(section: Mapping, key: str) -> Optional[Any]:
+    """The model for ``key`` in a section, without keeping a lazily parsed one."""
+    if isinstance(section, LazySection):
+        entry = section.entries.get(key)
+        return entry.peek() if entry is not None else None
+    return section.get(key)
+
+
+def entry_objects(section: Mapping) -> Mapping:
+    """Per-key objects of a section that identify its entries without parsing them."""
+    return section.entries if isinstance(section, LazySection) else section
+
+
+def document_owners(documents: Mapping) -> Iterator[Tuple[str, str]]:
+    """(document ID, meeting ID) of every document, without parsing lazy ones."""
+    for doc_id, document in entry_objects(documents).items():
+        yield doc_id, document.meeting_id
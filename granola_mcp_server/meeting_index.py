@@ -0,0 +1,140 @@
+"""Secondary indexes over parsed meetings for per-meeting lookups."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Set
+
+from .lazy import document_owners
+from .models import CacheData, MeetingMetadata
+from .rollups import SECONDS_PER_DAY, DailyRollups, RollupSummary, epoch_seconds
+
+# Above this share of changed meetings an update rebuilds from scratch
+REBUILD_RATIO = 0.25
+
+
+class MeetingIndex:
+    """Lookup tables derived from one CacheData.
+
+    Built alongside each snapshot with a single pass over meetings and
+    documents, so per-meeting tools answer from dictionaries and date
+    filters bisect a sorted timeline instead of scanning every meeting or
+    document on each call.
+    """
+
+    def __init__(self):
+        # meeting_id -> document IDs, in document order
+        self.documents_by_meeting: Dict[str, List[str]] = {}
+        # participant name -> meeting IDs, each meeting once
+        self.meetings_by_participant: Dict[str, List[str]] = {}
+        self._participant_names: Dict[str, str] = {}
+        # Timeline: meeting IDs ordered by (date, id) and their UTC epoch seconds
+        self.ids_by_date: List[str] = []
+        self.epochs = array('q')
+        self.rollups = DailyRollups()
+
+    @classmethod
+    def build(cls, cache_data: CacheData) -> "MeetingIndex":
+        index = cls()
+        for doc_id, meeting_id in document_owners(cache_data.documents):
+            index.documents_by_meeting.setdefault(meeting_id, []).append(doc_id)
+
+        for meeting_id, meeting in cache_data.meetings.items():
+            for participant in dict.fromkeys(meeting.participants):
+                index.meetings_by_participant.setdefault(participant, []).append(meeting_id)
+                index._participant_names.setdefault(participant.casefold(), participant)
+
+        timeline = sorted((epoch_seconds(meeting.date), meeting_id) for meeting_id, meeting in cache_data.meetings.items())
+        index.ids_by_date = [meeting_id for _, meeting_id in timeline]
+        index.epochs = array('q', [epoch for epoch, _ in timeline])
+        index.rollups = DailyRollups.build(cache_data.meetings.values())
+        return index
+
+    def updated(self, previous: CacheData, cache_data: CacheData, changed: Set[str]) -> "MeetingIndex":
+        """Index for ``cache_data``, patched from this index of ``previous``.
+
+        Only meetings in ``changed`` (as reported by changed_meeting_ids) are
+        touched; the tables of this index are copied, never mutated.
+        """
+        if not changed:
+            return self
+        if len(changed) > len(cache_data.meetings) * REBUILD_RATIO:
+            return self.build(cache_data)
+
+        index = MeetingIndex()
+        index.documents_by_meeting = {meeting_id: doc_ids for meeting_id, doc_ids in self.documents_by_meeting.items()
+                                      if meeting_id not in changed}
+        for doc_id, meeting_id in document_owners(cache_data.documents):
+            if meeting_id in changed:
+                index.documents_by_meeting.setdefault(meeting_id, []).append(doc_id)
+
+        index.meetings_by_participant = dict(self.meetings_by_participant)
+        index._participant_names = dict(self._participant_names)
+        index.ids_by_date = list(self.ids_by_date)
+        index.epochs = array('q', self.epochs)
+        index.rollups = self.rollups.updated(previous, cache_data, changed)
+
+        for meeting_id in changed:
+            old = previous.meetings.get(meeting_id)
+            if old is not None:
+                for participant in dict.fromkeys(old.participants):
+                    remaining = [other for other in index.meetings_by_participant.get(participant, [])
+                                 if other != meeting_id]
+                    if remaining:
+                        index.meetings_by_participant[participant] = remaining
+                    else:
+                        index.meetings_by_participant.pop(participant, None)
+                        if index._participant_names.get(participant.casefold()) == participant:
+                            del index._participant_names[participant.casefold()]
+                position = bisect_left(index.epochs, epoch_seconds(old.date))
+                while index.ids_by_date[position] != meeting_id:
+                    position += 1
+                del index.ids_by_date[position], index.epochs[position]
+
+        for meeting_id in changed:
+            meeting = cache_data.meetings.get(meeting_id)
+            if meeting is None:
+                continue
+            for participant in dict.fromkeys(meeting.participants):
+                index.meetings_by_participant[participant] = index.meetings_by_participant.get(participant, []) + [meeting_id]
+                index._participant_names.setdefault(participant.casefold(), participant)
+            epoch = epoch_seconds(meeting.date)
+            position = bisect_right(index.epochs, epoch)
+            index.ids_by_date.insert(position, meeting_id)
+            index.epochs.insert(position, epoch)
+        return index
+
+    def documents_for(self, meeting_id: str) -> List[str]:
+        """IDs of the documents attached to a meeting."""
+        return self.documents_by_meeting.get(meeting_id, [])
+
+    def meetings_with(self, participant: str) -> List[str]:
+        """IDs of meetings a participant attended, matching the name case-insensitively."""
+        meeting_ids = self.meetings_by_participant.get(participant)
+        if meeting_ids is None:
+            name = self._participant_names.get(participant.casefold())
+            meeting_ids = self.meetings_by_participant.get(name, []) if name else []
+        return meeting_ids
+
+    def meeting_ids_between(self, start: Optional[int] = None, end: Optional[int] = None) -> List[str]:
+        """IDs of meetings dated within [start, end] epoch seconds, oldest first."""
+        low = bisect_left(self.epochs, start) if start is not None else 0
+        high = bisect_right(self.epochs, end) if end is not None else len(self.epochs)
+        return self.ids_by_date[low:high]
+
+    def summary(self, meetings: Dict[str, MeetingMetadata], start: Optional[int] = None,
+                end: Optional[int] = None) -> RollupSummary:
+        """Pattern counts for meetings within [start, end] epoch seconds.
+
+        Whole days come from the day rollups; meetings on partially covered
+        boundary days are looked up on the timeline and counted directly.
+        """
+        first, last = self.rollups.whole_days(start, end)
+        if first > last:
+            partial = self.meeting_ids_between(start, end)
+        else:
+            partial = []
+            if start is not None:
+                partial += self.meeting_ids_between(start, first * SECONDS_PER_DAY - 1)
+            if end is not None:
+                partial += self.meeting_ids_between((last + 1) * SECONDS_PER_DAY, end)
+        return self.rollups.summary(start, end, [meetings[meeting_id] for meeting_id in partial])
@@ -1,44 +1,181 @@
-"""Data models for Granola meeting information."""
+"""Data models for Granola meeting information.
 
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel
+Models are slotted dataclasses: tens of thousands of them are built on
+every load, so they carry no per-instance ``__dict__`` and no validation.
+Raw cache values are checked once, where they are parsed (see parsing.py).
+"""
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Any, Tuple, Union
 from datetime import datetime
 
+from .arena import ArenaText, text_of
+
+# Segments before a time window searched for one still running into it, past the last one found
+# (microphone and system segments interleave, so an overlapping one need not be adjacent)
+OVERLAP_LOOKBACK = 8
+
 
-class MeetingMetadata(BaseModel):
+@dataclass(slots=True)
+class MeetingMetadata:
     """Meeting metadata information."""
     id: str
     title: str
     date: datetime
     duration: Optional[int] = None
-    participants: List[str] = []
+    participants: List[str] = field(default_factory=list)
     meeting_type: Optional[str] = None
     platform: Optional[str] = None
 
 
-class MeetingDocument(BaseModel):
+@dataclass(slots=True, init=False)
+class MeetingDocument:
     """Meeting document information."""
     id: str
     meeting_id: str
     title: str
-    content: str
+    # The notes text, or a handle to it in the text arena; construct with ``content=``
+    body: Union[str, ArenaText]
     document_type: str
     created_at: datetime
-    tags: List[str] = []
+    tags: List[str]
+    
+    def __init__(self, id: str, meeting_id: str, title: str, content: Union[str, ArenaText],
+                 document_type: str, created_at: datetime, tags: Optional[List[str]] = None):
+        self.id = id
+        self.meeting_id = meeting_id
+        self.title = title
+        self.body = content
+        self.document_type = document_type
+        self.created_at = created_at
+        self.tags = tags if tags is not None else []
+    
+    @property
+    def content(self) -> str:
+        """The full notes text, decoded if it lives in the text arena."""
+        return text_of(self.body)
+
+
+class TranscriptSegments:
+    """Columnar storage of a transcript's speech segments.
+    
+    Segment texts live in one string, separated by single spaces, so the
+    joined transcript is that string itself rather than a second copy.
+    Once loaded, ``text`` may instead be an ArenaText handle, which slices
+    and measures like the string without keeping it in memory.
+    Per-segment columns are parallel arrays: the offset where each text
+    starts, an index into the transcript's speaker list (-1 if unknown) and
+    start/end times as epoch seconds (NaN if unknown).
+    """
+    __slots__ = ("text", "starts", "speaker_ids", "start_times", "end_times")
+    
+    def __init__(self, text: str = "", starts: Optional[array] = None, speaker_ids: Optional[array] = None,
+                 start_times: Optional[array] = None, end_times: Optional[array] = None):
+        self.text: Union[str, ArenaText] = text
+        self.starts = starts if starts is not None else array('I')
+        self.speaker_ids = speaker_ids if speaker_ids is not None else array('h')
+        self.start_times = start_times if start_times is not None else array('d')
+        self.end_times = end_times if end_times is not None else array('d')
+    
+    @classmethod
+    def from_text(cls, text: str) -> "TranscriptSegments":
+        """A single segment without speaker or timing."""
+        return cls(text, array('I', [0]), array('h', [-1]), array('d', [math.nan]), array('d', [math.nan]))
+    
+    def append(self, text: str, speaker_id: int = -1, start_time: float = math.nan, end_time: float = math.nan):
+        """Add a segment; use a builder list and ``join`` when appending many."""
+        if self.starts:
+            self.text += " "
+        self.starts.append(len(self.text))
+        self.text += text
+        self.speaker_ids.append(speaker_id)
+        self.start_times.append(start_time)
+        self.end_times.append(end_time)
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TranscriptSegments):
+            return NotImplemented
+        # NaN timings compare unequal, so compare their byte representation
+        return (self.text == other.text and self.starts == other.starts
+                and self.speaker_ids == other.speaker_ids
+                and self.start_times.tobytes() == other.start_times.tobytes()
+                and self.end_times.tobytes() == other.end_times.tobytes())
+    
+    def span(self, index: int) -> Tuple[int, int]:
+        """Character range of segment ``index`` within ``text``."""
+        end = self.starts[index + 1] - 1 if index + 1 < len(self.starts) else len(self.text)
+        return self.starts[index], end
+    
+    def segment_text(self, index: int) -> str:
+        start, end = self.span(index)
+        return self.text[start:end]
+    
+    def segment_at(self, offset: int) -> int:
+        """Index of the segment containing character ``offset`` (or the separator after it)."""
+        return max(bisect_right(self.starts, offset) - 1, 0)
+    
+    def time_range(self, start_time: float = -math.inf, end_time: float = math.inf) -> Tuple[int, int]:
+        """Segments [first, stop) overlapping the epoch-seconds window; untimed segments never match.
+        
+        Segments are chronological by start time, so both ends are found by
+        bisecting the start times; the segments just before the window are
+        then checked for one that runs into it (up to OVERLAP_LOOKBACK past
+        the last found). A segment without an end time ends when it starts.
+        """
+        starts, ends = self.start_times, self.end_times
+        
+        def start_of(index: int) -> Tuple[float, int]:
+            start = starts[index]
+            return (start, 1) if start == start else (-math.inf, 0)
+        
+        indexes = range(len(starts))
+        first = bisect_left(indexes, (start_time, 1), key=start_of)
+        index = first - 1
+        while index >= max(first - OVERLAP_LOOKBACK, 0):
+            end = ends[index] if ends[index] == ends[index] else starts[index]
+            if end >= start_time:
+                first = index
+            index -= 1
+        stop = bisect_right(indexes, (end_time, 1), lo=first, key=start_of)
+        return first, stop
+    
+    def iter_segments(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, int, float, float]]:
+        """Yield (text, speaker id, start time, end time) for segments in [start, stop)."""
+        stop = len(self.starts) if stop is None else min(stop, len(self.starts))
+        for index in range(max(start, 0), stop):
+            yield (self.segment_text(index), self.speaker_ids[index],
+                   self.start_times[index], self.end_times[index])
 
 
-class MeetingTranscript(BaseModel):
+@dataclass(slots=True)
+class MeetingTranscript:
     """Meeting transcript information."""
     meeting_id: str
-    content: str
-    speakers: List[str] = []
+    segments: TranscriptSegments
+    speakers: List[str] = field(default_factory=list)
     language: Optional[str] = None
     confidence: Optional[float] = None
+    
+    @property
+    def content(self) -> str:
+        """The full transcript text, segments separated by spaces."""
+        return text_of(self.segments.text)
 
 
-class CacheData(BaseModel):
+@dataclass(slots=True)
+class CacheData:
     """Complete cache data structure."""
-    meetings: Dict[str, MeetingMetadata] = {}
-    documents: Dict[str, MeetingDocument] = {}
-    transcripts: Dict[str, MeetingTranscript] = {}
-    last_updated: Optional[datetime] = None
\ No newline at end of file
+    meetings: Dict[str, MeetingMetadata] = field(default_factory=dict)
+    documents: Dict[str, MeetingDocument] = field(default_factory=dict)
+    transcripts: Dict[str, MeetingTranscript] = field(default_factory=dict)
+    last_updated: Optional[datetime] = None
+    # Per-section fingerprints of the raw entries, used for incremental re-parsing
+    entry_fingerprints: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    # Path of the text arena holding document and transcript bodies, if they were moved there
+    text_arena: Optional[str] = None
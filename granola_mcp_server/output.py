@@ -0,0 +1,144 @@
+"""Output options shared by the tools: field selection, size budgets and format.
+
+Handlers consult these options while collecting what to return, so
+unselected fields are never formatted and long texts are cut before they
+are joined into the response.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Optional, Sequence, Union
+
+from .arena import ArenaText
+
+OUTPUT_FORMATS = ("markdown", "json")
+
+
+def output_properties(fields: Sequence[str] = (), max_chars: Optional[str] = None) -> Dict[str, Any]:
+    """JSON schema properties of the common output arguments.
+
+    ``fields`` lists the tool's selectable fields (no ``fields`` argument if
+    empty) and ``max_chars`` describes what the budget limits (no
+    ``max_chars`` argument if None).
+    """
+    properties: Dict[str, Any] = {}
+    if fields:
+        properties["fields"] = {
+            "type": "array",
+            "items": {"type": "string", "enum": list(fields)},
+            "description": "Only include these fields"
+        }
+    if max_chars:
+        properties["max_chars"] = {
+            "type": "integer",
+            "description": max_chars
+        }
+    properties["format"] = {
+        "type": "string",
+        "enum": list(OUTPUT_FORMATS),
+        "description": "Response format: readable Markdown or compact JSON",
+        "default": "markdown"
+    }
+    return properties
+
+
+@dataclass(frozen=True)
+class OutputOptions:
+    """Parsed ``fields``, ``max_chars`` and ``format`` arguments of one call.
+
+    ``fields`` is None when the tool's default selection applies.
+    """
+    fields: Optional[FrozenSet[str]] = None
+    max_chars: Optional[int] = None
+    format: str = "markdown"
+
+    @classmethod
+    def from_arguments(cls, arguments: Dict[str, Any], allowed: Sequence[str] = ()) -> "OutputOptions":
+        """Validate the output arguments of a tool call; raises ValueError."""
+        output_format = arguments.get("format") or "markdown"
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"unknown format '{output_format}' (expected {', '.join(OUTPUT_FORMATS)})")
+
+        fields = arguments.get("fields")
+        if fields is not None and allowed:
+            unknown = [field for field in fields if field not in allowed]
+            if unknown:
+                raise ValueError(f"unknown fields: {', '.join(unknown)} (expected {', '.join(allowed)})")
+            fields = frozenset(fields)
+        else:
+            fields = None
+
+        max_chars = arguments.get("max_chars")
+        if max_chars is not None and (not isinstance(max_chars, int) or max_chars < 0):
+            raise ValueError("max_chars must be a non-negative integer")
+        return cls(fields=fields, max_chars=max_chars, format=output_format)
+
+    @property
+    def is_json(self) -> bool:
+        return self.format == "json"
+
+    def selected(self, defaults: Sequence[str]) -> FrozenSet[str]:
+        """The requested fields, or ``defaults`` when none were given."""
+        return self.fields if self.fields is not None else frozenset(defaults)
+
+    def budget(self) -> "TextBudget":
+        return TextBudget(self.max_chars)
+
+
+DEFAULT_OUTPUT = OutputOptions()
+
+
+class TextBudget:
+    """Characters of long text (notes, transcripts, result lists) a response may still include."""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.remaining = limit
+        self.truncated = False
+
+    def fits(self, size: int) -> bool:
+        """Charge ``size`` characters if they fit; an exhausted budget marks the response truncated."""
+        if self.remaining is None:
+            return True
+        if size > self.remaining:
+            self.truncated = True
+            return False
+        self.remaining -= size
+        return True
+
+    def take(self, text: Union[str, ArenaText]) -> str:
+        """``text``, cut at a word break if it does not fit the remaining budget.
+        
+        Arena text is only decoded up to the cut.
+        """
+        if self.remaining is None:
+            return str(text)
+        if len(text) <= self.remaining:
+            self.remaining -= len(text)
+            return str(text)
+        self.truncated = True
+        text = clip(text, self.remaining)
+        self.remaining = 0
+        return text
+
+
+def clip(text: Union[str, ArenaText], limit: int) -> str:
+    """Cut ``text`` to at most ``limit`` characters, at the last space if there is one."""
+    if len(text) <= limit:
+        return str(text)
+    if limit <= 0:
+        return ""
+    head = text[:limit + 1]
+    cut = head.rfind(" ", 1, limit + 1)
+    return head[:cut if cut > 0 else limit]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def render_json(payload: Any) -> str:
+    """Compact JSON for a response payload; datetimes become ISO 8601 strings."""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_json_default)
@@ -0,0 +1,398 @@
+"""Per-entry parsing of Granola cache data.
+
+Everything here is a plain module-level function so that work can be
+shipped to worker processes. Workers receive the raw JSON text of an entry
+when it is available (cheap to pickle) and return compact results - text
+and name lists rather than models - which the parent turns into models.
+"""
+
+import json
+import math
+import multiprocessing
+import os
+import sys
+from array import array
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import zoneinfo
+
+from .models import MeetingDocument, MeetingMetadata, MeetingTranscript, TranscriptSegments
+
+# Raw characters of entries sent to a worker in one task
+BATCH_CHARS = 4 << 20
+# Assumed size of a job whose raw text is unknown
+DEFAULT_JOB_CHARS = 4096
+
+# (kind, key, raw JSON text or None, decoded value or None)
+ParseJob = Tuple[str, str, Optional[str], Any]
+
+DocumentParts = Tuple[List[str], List[str]]
+
+
+def configured_workers() -> int:
+    """Worker processes for parsing from GRANOLA_PARSE_WORKERS (0 or 1 parses in-process)."""
+    value = os.getenv("GRANOLA_PARSE_WORKERS", "0").strip().lower()
+    if value == "auto":
+        return os.cpu_count() or 1
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        print(f"Invalid GRANOLA_PARSE_WORKERS value {value!r}, parsing in-process", file=sys.stderr)
+        return 0
+
+
+def has_text(value: Any) -> bool:
+    """Whether a raw field holds non-blank text."""
+    return isinstance(value, str) and bool(value.strip())
+
+
+def checked_text(name: str, value: Any, optional: bool = False) -> Optional[str]:
+    """``value`` if it is a string (or None when ``optional``); raises TypeError otherwise.
+
+    Models do not validate their fields, so raw values are checked here.
+    """
+    if isinstance(value, str) or (optional and value is None):
+        return value
+    raise TypeError(f"{name} should be a string, got {type(value).__name__}")
+
+
+def parse_meeting(meeting_id: str, meeting_data: Dict[str, Any]) -> Optional[MeetingMetadata]:
+    """Build meeting metadata from a Granola document entry."""
+    try:
+        # Extract participants from people array
+        participants = []
+        if "people" in meeting_data and isinstance(meeting_data["people"], list):
+            participants = [checked_text("participant name", person["name"])
+                            for person in meeting_data["people"] if person.get("name")]
+
+        # Parse creation date
+        created_at = meeting_data.get("created_at")
+        if created_at:
+            # Handle Granola's ISO format
+            if created_at.endswith('Z'):
+                created_at = created_at[:-1] + '+00:00'
+            naive_date = datetime.fromisoformat(created_at)
+            # Ensure timezone-aware datetime (assume UTC if naive)
+            if naive_date.tzinfo is None:
+                meeting_date = naive_date.replace(tzinfo=zoneinfo.ZoneInfo('UTC'))
+            else:
+                meeting_date = naive_date
+        else:
+            meeting_date = datetime.now(zoneinfo.ZoneInfo('UTC'))
+
+        return MeetingMetadata(
+            id=meeting_id,
+            title=checked_text("title", meeting_data.get("title", "Untitled Meeting")),
+            date=meeting_date,
+            duration=None,  # Granola doesn't store duration in this format
+            participants=participants,
+            meeting_type=checked_text("type", meeting_data.get("type", "meeting"), optional=True),
+            platform=None  # Not stored in Granola cache
+        )
+    except Exception as e:
+        print(f"Error parsing meeting {meeting_id}: {e}", file=sys.stderr)
+        return None
+
+
+def timestamp_seconds(value: Any) -> float:
+    """Epoch seconds of an ISO-8601 timestamp or number, NaN when missing or invalid."""
+    try:
+        # Python 3.11+ parses the trailing 'Z' Granola writes
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        return math.nan
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def transcript_fields(transcript_id: str, transcript_data: Any) -> Optional[Tuple[TranscriptSegments, List[str]]]:
+    """Split a Granola transcript entry into columnar segments and its speakers."""
+    try:
+        # Ordered by first appearance so results do not depend on the process's hash seed
+        speakers: Dict[str, int] = {}
+        
+        if isinstance(transcript_data, list):
+            # Granola format: list of speech segments
+            texts, speaker_ids, start_stamps, end_stamps = [], [], [], []
+            for segment in transcript_data:
+                if isinstance(segment, dict) and "text" in segment:
+                    text = segment["text"].strip()
+                    
+                    # Extract speaker info if available
+                    speaker_id = -1
+                    if "source" in segment:
+                        speaker_id = speakers.setdefault(segment["source"], len(speakers))
+                    
+                    if text:
+                        texts.append(text)
+                        speaker_ids.append(speaker_id)
+                        start_stamps.append(segment.get("start_timestamp"))
+                        end_stamps.append(segment.get("end_timestamp"))
+            
+            if not texts:
+                return None
+            # Each text is followed by one separating space in the joined string
+            starts = array('I', accumulate((len(text) + 1 for text in texts), initial=0))
+            starts.pop()
+            segments = TranscriptSegments(
+                " ".join(texts), starts, array('h', speaker_ids),
+                array('d', map(timestamp_seconds, start_stamps)),
+                array('d', map(timestamp_seconds, end_stamps)),
+            )
+        
+        elif isinstance(transcript_data, dict):
+            # Fallback: dict format (legacy or different structure), a single untimed segment
+            for field in ("content", "text", "transcript"):
+                if field in transcript_data:
+                    segments = TranscriptSegments.from_text(transcript_data[field])
+                    break
+            else:
+                return None
+            
+            # Extract speakers if available
+            if "speakers" in transcript_data:
+                for speaker in transcript_data["speakers"]:
+                    speakers.setdefault(speaker, len(speakers))
+        
+        else:
+            return None
+        
+        return segments, list(speakers)
+    except Exception as e:
+        print(f"Error parsing transcript {transcript_id}: {e}", file=sys.stderr)
+        return None
+
+
+def build_transcript(meeting_id: str, fields: Tuple[TranscriptSegments, List[str]]) -> MeetingTranscript:
+    """Build a transcript model from ``transcript_fields`` output."""
+    segments, speakers = fields
+    return MeetingTranscript(
+        meeting_id=meeting_id,  # Transcript IDs match meeting IDs in Granola
+        segments=segments,
+        speakers=speakers,
+        language=None,  # Not typically stored in segment format
+        confidence=None  # Would need to be calculated from segments
+    )
+
+
+def document_parts(doc_id: str, doc_data: Dict[str, Any]) -> Optional[DocumentParts]:
+    """Extract a document's notes and its trailing overview/summary parts."""
+    try:
+        # Extract content from various Granola fields
+        content_parts = []
+
+        # Try notes_plain first (cleanest format)
+        if doc_data.get("notes_plain"):
+            content_parts.append(doc_data["notes_plain"])
+
+        # Try notes_markdown as backup
+        elif doc_data.get("notes_markdown"):
+            content_parts.append(doc_data["notes_markdown"])
+
+        # Try to extract from structured notes field
+        elif doc_data.get("notes") and isinstance(doc_data["notes"], dict):
+            notes_content = extract_structured_notes(doc_data["notes"])
+            if notes_content:
+                content_parts.append(notes_content)
+
+        trailer_parts = []
+
+        # Add overview if available
+        if doc_data.get("overview"):
+            trailer_parts.append(f"Overview: {doc_data['overview']}")
+
+        # Add summary if available
+        if doc_data.get("summary"):
+            trailer_parts.append(f"Summary: {doc_data['summary']}")
+
+        return content_parts, trailer_parts
+    except Exception as e:
+        print(f"Error extracting document content for {doc_id}: {e}", file=sys.stderr)
+        return None
+
+
+def needs_panel(parts: DocumentParts) -> bool:
+    """Whether a document falls back to its panels for content."""
+    return not any(has_text(part) for part in parts[0])
+
+
+def assemble_document(doc_id: str, parts: DocumentParts, panel_text: str,
+                      meeting: MeetingMetadata) -> Optional[MeetingDocument]:
+    """Build a meeting document from its extracted parts and its panel text."""
+    try:
+        content_parts, trailer_parts = parts
+        content_parts = list(content_parts)
+
+        # Fallback to document panels when traditional fields are empty
+        if panel_text and needs_panel(parts):
+            content_parts.append(panel_text)
+
+        content = "\n\n".join(content_parts + trailer_parts)
+
+        return MeetingDocument(
+            id=doc_id,
+            meeting_id=doc_id,
+            title=meeting.title,
+            content=content,
+            document_type="meeting_notes",
+            created_at=meeting.date,
+            tags=[]
+        )
+    except Exception as e:
+        print(f"Error extracting document content for {doc_id}: {e}", file=sys.stderr)
+        return None
+
+
+def extract_structured_notes(notes_data: Dict[str, Any]) -> str:
+    """Extract text content from Granola's structured notes format."""
+    try:
+        if not isinstance(notes_data, dict) or 'content' not in notes_data:
+            return ""
+
+        def extract_text_from_content(content_list):
+            text_parts = []
+            if isinstance(content_list, list):
+                for item in content_list:
+                    if isinstance(item, dict):
+                        # Handle different content types
+                        if item.get('type') == 'paragraph' and 'content' in item:
+                            text_parts.append(extract_text_from_content(item['content']))
+                        elif item.get('type') == 'text' and 'text' in item:
+                            text_parts.append(item['text'])
+                        elif 'content' in item:
+                            text_parts.append(extract_text_from_content(item['content']))
+            return ' '.join(text_parts)
+
+        return extract_text_from_content(notes_data['content'])
+
+    except Exception as e:
+        print(f"Error extracting structured notes: {e}", file=sys.stderr)
+        return ""
+
+
+def extract_document_panel_content(panel_data: Any) -> str:
+    """Extract text content from Granola's documentPanels structure."""
+    if not panel_data:
+        return ""
+
+    text_parts = []
+
+    def extract_from_node(node: Any):
+        if isinstance(node, dict):
+            node_type = node.get('type')
+
+            if node_type == 'text' and node.get('text'):
+                text_parts.append(node['text'])
+            elif 'content' in node:
+                extract_from_node(node['content'])
+        elif isinstance(node, list):
+            for item in node:
+                extract_from_node(item)
+
+    try:
+        if isinstance(panel_data, dict):
+            # Panels keyed by UUID -> {content: [...]} structure
+            for panel_id in sorted(panel_data.keys()):
+                panel = panel_data.get(panel_id)
+                if isinstance(panel, dict):
+                    extract_from_node(panel.get('content'))
+        elif isinstance(panel_data, list):
+            for panel in panel_data:
+                extract_from_node(panel)
+
+    except Exception as exc:
+        print(f"Error extracting panel content: {exc}", file=sys.stderr)
+
+    combined = '\n\n'.join(part.strip() for part in text_parts if isinstance(part, str) and part.strip())
+    return combined.strip()
+
+
+def panel_text(doc_id: str, panel_data: Any) -> str:
+    """Job wrapper for ``extract_document_panel_content``."""
+    return extract_document_panel_content(panel_data)
+
+
+_JOB_FUNCTIONS: Dict[str, Callable[[str, Any], Any]] = {
+    "transcript": transcript_fields,
+    "document": document_parts,
+    "panel": panel_text,
+}
+
+
+def run_job(job: ParseJob) -> Any:
+    """Run one parse job, decoding its raw text first when needed."""
+    kind, key, raw, value = job
+    if value is None and raw is not None:
+        try:
+            value = json.loads(raw)
+        except ValueError as e:
+            print(f"Error decoding {kind} {key}: {e}", file=sys.stderr)
+            return None
+    return _JOB_FUNCTIONS[kind](key, value)
+
+
+def run_batch(jobs: List[ParseJob]) -> List[Tuple[Tuple[str, str], Any]]:
+    """Worker entry point: run a batch of jobs and return their results by (kind, key)."""
+    return [((job[0], job[1]), run_job(job)) for job in jobs]
+
+
+class ParseJobs:
+    """Collects parse jobs and runs them in-process or across worker processes.
+
+    With more than one worker, jobs are grouped into batches of roughly
+    BATCH_CHARS raw characters and submitted as soon as a batch fills, so
+    workers parse while the caller is still reading the cache file. The
+    pool is only started once there is more than one batch of work, which
+    keeps small incremental reloads in-process.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers
+        self.results: Dict[Tuple[str, str], Any] = {}
+        self._executor: Optional[Executor] = None
+        self._batch: List[ParseJob] = []
+        self._batch_chars = 0
+        self._futures: List[Future] = []
+
+    def add(self, kind: str, key: str, raw: Optional[str], value: Any):
+        """Queue a job; ``raw`` is the entry's JSON text when known."""
+        if self.workers <= 1:
+            self.results[(kind, key)] = run_job((kind, key, raw, value))
+            return
+
+        # Ship the compact raw text rather than pickling the decoded value
+        self._batch.append((kind, key, raw, None) if raw is not None else (kind, key, None, value))
+        self._batch_chars += len(raw) if raw is not None else DEFAULT_JOB_CHARS
+        if self._batch_chars >= BATCH_CHARS:
+            self._submit()
+
+    def _submit(self):
+        if self._executor is None:
+            # Spawn, not fork: loads run on a worker thread of an asyncio process
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        self._futures.append(self._executor.submit(run_batch, self._batch))
+        self._batch, self._batch_chars = [], 0
+
+    def finish(self) -> Dict[Tuple[str, str], Any]:
+        """Wait for all queued jobs and return every result so far."""
+        if self._batch:
+            if self._executor is None:
+                self.results.update(run_batch(self._batch))
+                self._batch, self._batch_chars = [], 0
+            else:
+                self._submit()
+        for future in self._futures:
+            self.results.update(future.result())
+        self._futures = []
+        return self.results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
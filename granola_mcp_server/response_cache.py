@@ -0,0 +1,97 @@
+"""Memoized tool responses, valid for one cache snapshot.
+
+Agents tend to repeat the same searches and pattern analyses within a
+session. Rendered results are kept in an LRU bounded by entry count and
+total characters, keyed by tool name, the call's arguments in canonical
+form and the snapshot version, so a reload makes every earlier entry
+unreachable; the server also clears them when it installs a snapshot.
+"""
+
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp.types import TextContent
+
+# Tools whose responses are memoized: the ones that compute over many meetings
+CACHED_TOOLS = frozenset({"search_meetings", "semantic_search", "analyze_meeting_patterns"})
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_CHARS = 8 << 20
+
+ResponseKey = Tuple[str, str, int]
+
+
+@dataclass
+class ResponseCacheStats:
+    """Counters describing response cache use."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0  # entries dropped because the snapshot changed
+    entries: int = 0
+    chars: int = 0
+
+
+def normalized_arguments(arguments: Dict[str, Any]) -> str:
+    """Canonical JSON of tool arguments: sorted keys, unset (None) values dropped."""
+    def prune(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: prune(item) for key, item in value.items() if item is not None}
+        if isinstance(value, (list, tuple)):
+            return [prune(item) for item in value]
+        return value
+    return json.dumps(prune(arguments or {}), sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ResponseCache:
+    """LRU of rendered tool results; ``max_entries`` of 0 disables it."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_chars: int = DEFAULT_MAX_CHARS):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.stats = ResponseCacheStats()
+        self._entries: "OrderedDict[ResponseKey, Tuple[List[TextContent], int]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_chars > 0
+
+    @staticmethod
+    def key(name: str, arguments: Dict[str, Any], version: int) -> ResponseKey:
+        return name, normalized_arguments(arguments), version
+
+    def get(self, key: ResponseKey) -> Optional[List[TextContent]]:
+        """The stored result for ``key``, counted as a hit or a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return list(entry[0])
+
+    def put(self, key: ResponseKey, result: List[TextContent]):
+        """Store ``result``, evicting the least recently used entries to stay in bounds."""
+        size = sum(len(content.text) for content in result)
+        if not self.enabled or size > self.max_chars:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.stats.chars -= previous[1]
+        self._entries[key] = (list(result), size)
+        self.stats.chars += size
+        while len(self._entries) > self.max_entries or self.stats.chars > self.max_chars:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.stats.chars -= evicted
+            self.stats.evictions += 1
+        self.stats.entries = len(self._entries)
+
+    def invalidate(self, version: int):
+        """Drop entries computed for any snapshot other than ``version``."""
+        stale = [key for key in self._entries if key[2] != version]
+        for key in stale:
+            self.stats.chars -= self._entries.pop(key)[1]
+        self.stats.invalidations += len(stale)
+        self.stats.entries = len(self._entries)
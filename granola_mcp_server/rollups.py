@@ -0,0 +1,183 @@
+"""Per-day rollups of meeting counts, participants and title topics.
+
+The pattern analyses only ever need counts, so instead of walking every
+meeting on each call they merge pre-aggregated day buckets. Buckets are
+keyed by UTC day number and kept up to date on reload by subtracting a
+changed meeting's old contribution and adding its new one.
+"""
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .models import CacheData, MeetingMetadata
+
+SECONDS_PER_DAY = 86400
+
+# Above this share of changed meetings an update rebuilds from scratch
+REBUILD_RATIO = 0.25
+
+# Title words that say nothing about a meeting's topic
+TOPIC_STOPWORDS = frozenset(['meeting', 'call', 'sync', 'with'])
+
+_EPOCH = date(1970, 1, 1)
+
+
+def title_topics(title: str) -> List[str]:
+    """Topic words of a meeting title, one entry per occurrence."""
+    return [word for word in title.lower().split() if len(word) > 3 and word not in TOPIC_STOPWORDS]
+
+
+def epoch_seconds(moment: datetime) -> int:
+    """Whole UTC epoch seconds of an aware datetime."""
+    return math.floor(moment.timestamp())
+
+
+def day_number(epoch: int) -> int:
+    """UTC day number (days since 1970-01-01) of an epoch second."""
+    return epoch // SECONDS_PER_DAY
+
+
+@lru_cache(maxsize=16384)
+def month_key(day: int) -> str:
+    """'YYYY-MM' of a UTC day number."""
+    return (_EPOCH + timedelta(days=day)).strftime("%Y-%m")
+
+
+class DayBucket:
+    """Counts for the meetings of one day (or any set of meetings)."""
+    __slots__ = ("meetings", "participants", "topics")
+
+    def __init__(self):
+        self.meetings = 0
+        self.participants: Dict[str, int] = {}
+        self.topics: Dict[str, int] = {}
+
+    def copy(self) -> "DayBucket":
+        bucket = DayBucket()
+        bucket.meetings = self.meetings
+        bucket.participants = dict(self.participants)
+        bucket.topics = dict(self.topics)
+        return bucket
+
+    def add(self, meeting: MeetingMetadata, sign: int = 1):
+        """Count a meeting in (sign 1) or back out (sign -1); zero counts are dropped."""
+        self.meetings += sign
+        for counts, keys in ((self.participants, dict.fromkeys(meeting.participants)),
+                             (self.topics, title_topics(meeting.title))):
+            for key in keys:
+                count = counts.get(key, 0) + sign
+                if count:
+                    counts[key] = count
+                else:
+                    del counts[key]
+
+
+@dataclass
+class RollupSummary:
+    """Merged counts for a date range."""
+    meetings: int = 0
+    participants: Counter = field(default_factory=Counter)
+    months: Counter = field(default_factory=Counter)
+    topics: Counter = field(default_factory=Counter)
+
+    def add_bucket(self, bucket: DayBucket, month: str):
+        self.meetings += bucket.meetings
+        self.months[month] += bucket.meetings
+        self.participants.update(bucket.participants)
+        self.topics.update(bucket.topics)
+
+
+class DailyRollups:
+    """Day buckets over all meetings, plus a running total for unfiltered queries."""
+
+    def __init__(self):
+        self.buckets: Dict[int, DayBucket] = {}
+        self.days = array('i')  # sorted keys of ``buckets``
+        self.total = DayBucket()
+
+    @classmethod
+    def build(cls, meetings: Iterable[MeetingMetadata]) -> "DailyRollups":
+        rollups = cls()
+        for meeting in meetings:
+            day = day_number(epoch_seconds(meeting.date))
+            bucket = rollups.buckets.get(day)
+            if bucket is None:
+                bucket = rollups.buckets[day] = DayBucket()
+            bucket.add(meeting)
+            rollups.total.add(meeting)
+        rollups.days = array('i', sorted(rollups.buckets))
+        return rollups
+
+    def updated(self, previous: CacheData, cache_data: CacheData, changed: Set[str]) -> "DailyRollups":
+        """Rollups for ``cache_data``, patched from these rollups of ``previous``.
+
+        Touched buckets are copied before they change, so this object is
+        left as it was.
+        """
+        if not changed:
+            return self
+        if len(changed) > len(cache_data.meetings) * REBUILD_RATIO:
+            return self.build(cache_data.meetings.values())
+
+        rollups = DailyRollups()
+        rollups.buckets = dict(self.buckets)
+        rollups.total = self.total.copy()
+        copied: Set[int] = set()
+
+        def bucket_for(day: int) -> DayBucket:
+            if day not in copied:
+                copied.add(day)
+                existing = rollups.buckets.get(day)
+                rollups.buckets[day] = existing.copy() if existing else DayBucket()
+            return rollups.buckets[day]
+
+        for meeting_id in changed:
+            for source, sign in ((previous, -1), (cache_data, 1)):
+                meeting = source.meetings.get(meeting_id)
+                if meeting is not None:
+                    bucket_for(day_number(epoch_seconds(meeting.date))).add(meeting, sign)
+                    rollups.total.add(meeting, sign)
+
+        for day in copied:
+            if not rollups.buckets[day].meetings:
+                del rollups.buckets[day]
+        rollups.days = array('i', sorted(rollups.buckets))
+        return rollups
+
+    def summary(self, start: Optional[int] = None, end: Optional[int] = None,
+                partial: Iterable[MeetingMetadata] = ()) -> RollupSummary:
+        """Merge the buckets of whole UTC days in [start, end] (epoch seconds).
+
+        Meetings on partially covered boundary days are not bucketed; the
+        caller passes them in ``partial``.
+        """
+        summary = RollupSummary()
+        if start is None and end is None:
+            summary.meetings = self.total.meetings
+            summary.participants.update(self.total.participants)
+            summary.topics.update(self.total.topics)
+            for day in self.days:
+                summary.months[month_key(day)] += self.buckets[day].meetings
+        else:
+            first, last = self.whole_days(start, end)
+            for day in self.days[bisect_left(self.days, first):bisect_right(self.days, last)]:
+                summary.add_bucket(self.buckets[day], month_key(day))
+
+        for meeting in partial:
+            bucket = DayBucket()
+            bucket.add(meeting)
+            summary.add_bucket(bucket, month_key(day_number(epoch_seconds(meeting.date))))
+        return summary
+
+    @staticmethod
+    def whole_days(start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        """First and last day numbers fully covered by [start, end] (first > last if none)."""
+        first = -(-start // SECONDS_PER_DAY) if start is not None else -2 ** 31
+        last = day_number(end + 1) - 1 if end is not None else 2 ** 31 - 1
+        return first, last
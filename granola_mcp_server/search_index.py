@@ -0,0 +1,487 @@
+"""Inverted full-text index over meeting titles, participants, notes and transcripts."""
+
+import gc
+import math
+import re
+from array import array
+from bisect import bisect_left
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .lazy import document_owners, peek
+from .models import CacheData
+
+TOKEN_RE = re.compile(r"\w+")
+PHRASE_RE = re.compile(r'"([^"]*)"')
+
+# Position gap inserted between participant names so phrases never span two people
+PARTICIPANT_GAP = 100
+
+# Prefix expansion of the last query term is skipped for very short terms
+MIN_PREFIX_LENGTH = 2
+
+# Rebuild from scratch instead of patching once this share of meetings changed
+REBUILD_RATIO = 0.5
+
+# BM25 parameters and default per-field boosts
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_FIELD_BOOSTS = {
+    "title": 3.0,
+    "participants": 2.0,
+    "notes": 1.5,
+    "transcript": 1.0,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Split a query into loose terms and quoted phrases (as token lists)."""
+    phrases = [tokens for tokens in (tokenize(p) for p in PHRASE_RE.findall(query)) if tokens]
+    terms = tokenize(PHRASE_RE.sub(" ", query))
+    return terms, phrases
+
+
+def document_ids_by_meeting(cache_data: CacheData) -> Dict[str, List[str]]:
+    """Group document IDs by the meeting they belong to."""
+    grouped: Dict[str, List[str]] = {}
+    for doc_id, meeting_id in document_owners(cache_data.documents):
+        grouped.setdefault(meeting_id, []).append(doc_id)
+    return grouped
+
+
+def meeting_field_texts(cache_data: CacheData, meeting_id: str, document_ids: Dict[str, List[str]],
+                        fields: Iterable[str]) -> Dict[str, List[str]]:
+    """Return the indexed text units of a meeting, for the given fields.
+
+    Lazily loaded notes and transcripts are parsed for the occasion and not kept.
+    """
+    meeting = cache_data.meetings.get(meeting_id)
+    if meeting is None:
+        return {}
+
+    texts = {"title": [meeting.title], "participants": list(meeting.participants)}
+    if "notes" in fields:
+        documents = (peek(cache_data.documents, doc_id) for doc_id in document_ids.get(meeting_id, []))
+        texts["notes"] = [document.content for document in documents if document is not None]
+    if "transcript" in fields:
+        transcript = peek(cache_data.transcripts, meeting_id)
+        texts["transcript"] = [transcript.content] if transcript else []
+    return texts
+
+
+class TermPostings:
+    """Postings of one term in one field.
+
+    ``docs`` holds ascending meeting ordinals, ``freqs`` the number of
+    occurrences per meeting and ``positions`` the token positions of every
+    occurrence, concatenated in ``docs`` order.
+    """
+    __slots__ = ("docs", "freqs", "positions", "_offsets")
+
+    def __init__(self, docs: array, freqs: array, positions: array):
+        self.docs = docs
+        self.freqs = freqs
+        self.positions = positions
+        self._offsets: Optional[List[int]] = None
+
+    def __getstate__(self):
+        return self.docs, self.freqs, self.positions
+
+    def __setstate__(self, state):
+        self.docs, self.freqs, self.positions = state
+        self._offsets = None
+
+    def offsets(self) -> List[int]:
+        """Start index into ``positions`` for each entry of ``docs``."""
+        if self._offsets is None:
+            offsets = [0]
+            total = 0
+            for freq in self.freqs:
+                total += freq
+                offsets.append(total)
+            self._offsets = offsets
+        return self._offsets
+
+    def positions_by_doc(self) -> Dict[int, array]:
+        """Map meeting ordinal to its token positions for this term."""
+        offsets = self.offsets()
+        positions = self.positions
+        return {doc: positions[offsets[i]:offsets[i + 1]] for i, doc in enumerate(self.docs)}
+
+    def positions_for(self, ordinal: int) -> Optional[array]:
+        """Token positions of this term in one meeting, or None if it does not occur there."""
+        i = bisect_left(self.docs, ordinal)
+        if i == len(self.docs) or self.docs[i] != ordinal:
+            return None
+        offsets = self.offsets()
+        return self.positions[offsets[i]:offsets[i + 1]]
+
+    def without(self, removed: List[int]) -> Optional["TermPostings"]:
+        """Return a copy with the given (sorted) ordinals removed, or None if empty."""
+        docs, freqs, positions = self.docs, self.freqs, self.positions
+        keep_docs, keep_freqs, keep_positions = array('I'), array('I'), array('I')
+        doc_start = pos_start = 0
+        for ordinal in removed:
+            i = bisect_left(docs, ordinal, doc_start)
+            if i >= len(docs) or docs[i] != ordinal:
+                continue
+            pos_i = pos_start + sum(freqs[doc_start:i])
+            keep_docs.extend(docs[doc_start:i])
+            keep_freqs.extend(freqs[doc_start:i])
+            keep_positions.extend(positions[pos_start:pos_i])
+            doc_start = i + 1
+            pos_start = pos_i + freqs[i]
+        if doc_start == 0:
+            return self
+        keep_docs.extend(docs[doc_start:])
+        keep_freqs.extend(freqs[doc_start:])
+        keep_positions.extend(positions[pos_start:])
+        if not keep_docs:
+            return None
+        return TermPostings(keep_docs, keep_freqs, keep_positions)
+
+    def concat(self, other: "TermPostings") -> "TermPostings":
+        """Return a copy with ``other``'s entries appended.
+
+        New ordinals are always larger than existing ones, so appending keeps
+        ``docs`` sorted.
+        """
+        return TermPostings(self.docs + other.docs, self.freqs + other.freqs, self.positions + other.positions)
+
+
+def next_unit_base(base: int, length: int) -> int:
+    """Position of the first token of the unit after one of ``length`` tokens starting at ``base``.
+
+    Units start on multiples of PARTICIPANT_GAP past the end of the previous
+    unit, so positions of different units never collide or run together.
+    """
+    return base + (length // PARTICIPANT_GAP + 1) * PARTICIPANT_GAP
+
+
+def _term_positions(units: List[str]) -> Tuple[int, Dict[str, List[int]]]:
+    """Tokenize text units, returning the token count and positions per term.
+
+    Positions are grouped with a stable sort rather than a per-token loop,
+    which keeps the Python-level work proportional to distinct terms.
+    """
+    grouped: Dict[str, List[int]] = {}
+    length = 0
+    base = 0
+    for unit in units:
+        tokens = tokenize(unit)
+        length += len(tokens)
+        order = sorted(range(len(tokens)), key=tokens.__getitem__)
+        unit_base, base = base, next_unit_base(base, len(tokens))
+        for term, positions in groupby(order, key=tokens.__getitem__):
+            positions = [unit_base + p for p in positions] if unit_base else list(positions)
+            if term in grouped:
+                grouped[term].extend(positions)
+            else:
+                grouped[term] = positions
+    return length, grouped
+
+
+class SearchIndex:
+    """Token-level positional inverted index with postings per field.
+
+    Meetings are addressed internally by an ordinal assigned on insertion.
+    An index is never mutated once it is serving queries: ``updated`` returns
+    a new index that shares untouched postings with this one.
+    ``fields`` lists the fields that were indexed; the others have no
+    postings. Lazy loads start with METADATA_FIELDS, which need no parsing.
+    """
+    FIELDS = ("title", "participants", "notes", "transcript")
+    METADATA_FIELDS = ("title", "participants")
+
+    def __init__(self, fields: Tuple[str, ...] = FIELDS):
+        self.fields = fields
+        self.postings: Dict[str, Dict[str, TermPostings]] = {field: {} for field in self.FIELDS}
+        self.field_lengths: Dict[str, array] = {field: array('I') for field in self.FIELDS}
+        self.total_lengths: Dict[str, int] = {field: 0 for field in self.FIELDS}
+        self.doc_ids: List[Optional[str]] = []
+        self.ordinals: Dict[str, int] = {}
+        self.doc_terms: Dict[int, Dict[str, Tuple[str, ...]]] = {}
+        self._sorted_terms: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_sorted_terms"] = {}
+        return state
+
+    @property
+    def full_text(self) -> bool:
+        """Whether notes and transcripts are indexed."""
+        return self.fields == self.FIELDS
+
+    @classmethod
+    def build(cls, cache_data: CacheData, fields: Tuple[str, ...] = FIELDS) -> "SearchIndex":
+        """Index ``fields`` of every meeting in ``cache_data``."""
+        index = cls(fields)
+        index._apply(cache_data, removed=[], added=list(cache_data.meetings))
+        return index
+
+    def updated(self, cache_data: CacheData, meeting_ids: Iterable[str]) -> "SearchIndex":
+        """Return an index reflecting ``cache_data`` for the given changed meetings.
+
+        ``meeting_ids`` lists meetings that were added, modified or removed
+        since this index was built.
+        """
+        meeting_ids = set(meeting_ids)
+        if not meeting_ids:
+            return self
+
+        tombstones = len(self.doc_ids) - len(self.ordinals)
+        if len(meeting_ids) + tombstones > REBUILD_RATIO * max(len(cache_data.meetings), 1):
+            return self.build(cache_data, self.fields)
+
+        index = SearchIndex(self.fields)
+        index.postings = {field: dict(terms) for field, terms in self.postings.items()}
+        index.field_lengths = {field: lengths[:] for field, lengths in self.field_lengths.items()}
+        index.total_lengths = dict(self.total_lengths)
+        index.doc_ids = list(self.doc_ids)
+        index.ordinals = dict(self.ordinals)
+        index.doc_terms = dict(self.doc_terms)
+
+        removed = [mid for mid in meeting_ids if mid in index.ordinals]
+        added = [mid for mid in meeting_ids if mid in cache_data.meetings]
+        index._apply(cache_data, removed, added)
+        return index
+
+    def _apply(self, cache_data: CacheData, removed: List[str], added: List[str]):
+        """Remove and (re-)add meetings, rebuilding each touched term once."""
+        # Building allocates millions of short-lived lists; cyclic GC passes
+        # over them find nothing to free and cost roughly a third of the time.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._apply_changes(cache_data, removed, added)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self._sorted_terms = {}
+
+    def _apply_changes(self, cache_data: CacheData, removed: List[str], added: List[str]):
+        removals: Dict[Tuple[str, str], List[int]] = {}
+        for meeting_id in removed:
+            ordinal = self.ordinals.pop(meeting_id)
+            self.doc_ids[ordinal] = None
+            for field, terms in self.doc_terms.pop(ordinal).items():
+                self.total_lengths[field] -= self.field_lengths[field][ordinal]
+                for term in terms:
+                    removals.setdefault((field, term), []).append(ordinal)
+
+        # Postings of the added meetings, merged into the live postings below
+        additions: Dict[str, Dict[str, TermPostings]] = {field: {} for field in self.FIELDS}
+        document_ids = document_ids_by_meeting(cache_data) if added and "notes" in self.fields else {}
+        for meeting_id in added:
+            ordinal = len(self.doc_ids)
+            self.doc_ids.append(meeting_id)
+            self.ordinals[meeting_id] = ordinal
+            field_terms = {}
+            field_texts = meeting_field_texts(cache_data, meeting_id, document_ids, self.fields)
+            for field in self.FIELDS:
+                length, term_positions = _term_positions(field_texts.get(field, []))
+                self.field_lengths[field].append(length)
+                self.total_lengths[field] += length
+                field_additions = additions[field]
+                for term, positions in term_positions.items():
+                    postings = field_additions.get(term)
+                    if postings is None:
+                        postings = field_additions[term] = TermPostings(array('I'), array('I'), array('I'))
+                    postings.docs.append(ordinal)
+                    postings.freqs.append(len(positions))
+                    postings.positions.extend(positions)
+                field_terms[field] = tuple(term_positions)
+            self.doc_terms[ordinal] = field_terms
+
+        for (field, term), ordinals in removals.items():
+            postings = self.postings[field][term].without(sorted(ordinals))
+            if postings is None:
+                del self.postings[field][term]
+            else:
+                self.postings[field][term] = postings
+
+        for field, field_additions in additions.items():
+            field_postings = self.postings[field]
+            for term, postings in field_additions.items():
+                existing = field_postings.get(term)
+                field_postings[term] = postings if existing is None else existing.concat(postings)
+
+    def _expand(self, field: str, term: str) -> List[str]:
+        """Return vocabulary terms of ``field`` that start with ``term``."""
+        vocabulary = self._sorted_terms.get(field)
+        if vocabulary is None:
+            vocabulary = sorted(self.postings[field])
+            self._sorted_terms[field] = vocabulary
+        matches = []
+        i = bisect_left(vocabulary, term)
+        while i < len(vocabulary) and vocabulary[i].startswith(term):
+            matches.append(vocabulary[i])
+            i += 1
+        return matches
+
+    def _positions(self, field: str, term: str, prefix: bool = False) -> Dict[int, array]:
+        """Positions of ``term`` (or any term it prefixes) per meeting ordinal."""
+        terms = [term]
+        if prefix and len(term) >= MIN_PREFIX_LENGTH:
+            terms = self._expand(field, term)
+
+        merged: Dict[int, array] = {}
+        for candidate in terms:
+            postings = self.postings[field].get(candidate)
+            if postings is None:
+                continue
+            for ordinal, positions in postings.positions_by_doc().items():
+                if ordinal in merged:
+                    merged[ordinal] = array('I', sorted(merged[ordinal] + positions))
+                else:
+                    merged[ordinal] = positions
+        return merged
+
+    def phrase_matches(self, field: str, terms: List[str], prefix_last: bool = False) -> Dict[str, List[int]]:
+        """Find meetings where ``terms`` occur consecutively in ``field``.
+
+        Returns the start positions of every occurrence, per meeting ID.
+        """
+        if not terms:
+            return {}
+
+        per_term = []
+        for i, term in enumerate(terms):
+            positions = self._positions(field, term, prefix=prefix_last and i == len(terms) - 1)
+            if not positions:
+                return {}
+            per_term.append(positions)
+
+        candidates = set(min(per_term, key=len))
+        for positions in per_term:
+            candidates.intersection_update(positions)
+
+        matches = {}
+        for ordinal in candidates:
+            starts = set(per_term[0][ordinal])
+            for offset, positions in enumerate(per_term[1:], 1):
+                starts.intersection_update(p - offset for p in positions[ordinal])
+                if not starts:
+                    break
+            if starts:
+                matches[self.doc_ids[ordinal]] = sorted(starts)
+        return matches
+
+    def match_positions(self, field: str, meeting_id: str, terms: Iterable[str],
+                        phrases: Iterable[List[str]] = ()) -> List[Tuple[int, int]]:
+        """Where query terms and phrases occur in one meeting's ``field``.
+
+        Returns sorted (start position, length in tokens) pairs, read from
+        the stored postings without touching the meeting's text.
+        """
+        ordinal = self.ordinals.get(meeting_id)
+        if ordinal is None:
+            return []
+        field_postings = self.postings[field]
+
+        def positions(term: str) -> Optional[array]:
+            postings = field_postings.get(term)
+            return postings.positions_for(ordinal) if postings is not None else None
+
+        hits = []
+        for term in set(terms):
+            found = positions(term)
+            if found:
+                hits.extend((position, 1) for position in found)
+        for phrase in phrases:
+            per_term = [positions(term) for term in phrase]
+            if not all(per_term):
+                continue
+            starts = set(per_term[0])
+            for offset, found in enumerate(per_term[1:], 1):
+                starts.intersection_update(position - offset for position in found)
+            hits.extend((start, len(phrase)) for start in starts)
+        return sorted(set(hits))
+
+    def legacy_scores(self, query: str) -> Dict[str, int]:
+        """Score meetings with the original substring weighting.
+
+        A title match scores 2, each matching participant 1 and a transcript
+        match 1. The query matches a field when its tokens appear there in
+        order, with the last token also matching as a word prefix.
+        """
+        terms = tokenize(query)
+        scores: Dict[str, int] = {}
+
+        for meeting_id in self.phrase_matches("title", terms, prefix_last=True):
+            scores[meeting_id] = scores.get(meeting_id, 0) + 2
+
+        for meeting_id, starts in self.phrase_matches("participants", terms, prefix_last=True).items():
+            matching_people: Set[int] = {start // PARTICIPANT_GAP for start in starts}
+            scores[meeting_id] = scores.get(meeting_id, 0) + len(matching_people)
+
+        for meeting_id in self.phrase_matches("transcript", terms, prefix_last=True):
+            scores[meeting_id] = scores.get(meeting_id, 0) + 1
+
+        return scores
+
+    def bm25_scores(self, query: str, boosts: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Score meetings with per-field BM25, summed with field boosts.
+
+        Quoted phrases in ``query`` are required: a meeting must contain each
+        phrase in at least one field, and phrase occurrences are scored like
+        terms. Loose terms are optional and only add to the score. Raises
+        ValueError for a boost that is not a non-negative number for one of
+        FIELDS.
+        """
+        for field, boost in (boosts or {}).items():
+            if field not in self.FIELDS:
+                raise ValueError(f"unknown field '{field}' (expected {', '.join(self.FIELDS)})")
+            if (isinstance(boost, bool) or not isinstance(boost, (int, float))
+                    or not math.isfinite(boost) or boost < 0):
+                raise ValueError(f"boost for '{field}' must be a non-negative number, got {boost!r}")
+        boosts = {**DEFAULT_FIELD_BOOSTS, **(boosts or {})}
+        terms, phrases = parse_query(query)
+        doc_count = len(self.ordinals)
+        if not doc_count:
+            return {}
+
+        scores: Dict[int, float] = {}
+        phrase_hits: List[Set[int]] = [set() for _ in phrases]
+
+        for field in self.FIELDS:
+            boost = boosts.get(field, 0.0)
+            if boost <= 0:
+                continue
+            lengths = self.field_lengths[field]
+            average_length = self.total_lengths[field] / doc_count or 1.0
+
+            # Each scored unit is (ordinals, frequencies) for one term or phrase
+            units = []
+            for term in set(terms):
+                postings = self.postings[field].get(term)
+                if postings is not None:
+                    units.append((postings.docs, postings.freqs))
+            for i, phrase in enumerate(phrases):
+                matches = self.phrase_matches(field, phrase)
+                if matches:
+                    ordinals = [self.ordinals[meeting_id] for meeting_id in matches]
+                    phrase_hits[i].update(ordinals)
+                    units.append((ordinals, [len(starts) for starts in matches.values()]))
+
+            for ordinals, freqs in units:
+                df = len(ordinals)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                weight = boost * idf
+                for ordinal, tf in zip(ordinals, freqs):
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[ordinal] / average_length)
+                    scores[ordinal] = scores.get(ordinal, 0.0) + weight * tf * (BM25_K1 + 1) / (tf + norm)
+
+        if phrases:
+            required = set.intersection(*phrase_hits)
+            return {self.doc_ids[o]: score for o, score in scores.items() if o in required}
+        return {self.doc_ids[o]: score for o, score in scores.items()}
@@ -0,0 +1,653 @@
+"""Embedding search over meeting notes and transcripts.
+
+Notes are split into paragraphs and transcripts into windows of whole
+speech segments; each chunk becomes one L2-normalised row of a float32
+matrix. Rows are grouped by meeting in meeting-index date order, so the
+chunks of a date range are a contiguous block of rows and a query is one
+matrix-vector product over that block followed by ``argpartition``.
+
+With a store directory the matrix lives in a file that is memory-mapped
+rather than read, and a restarted server only embeds meetings whose text
+changed. Large corpora additionally get a clustered (IVF-style) index
+that scores only the rows of the clusters nearest to the query.
+"""
+
+import hashlib
+import importlib
+import math
+import os
+import pickle
+import re
+import sys
+import threading
+import uuid
+import zlib
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Set, Tuple
+
+import numpy as np
+
+from .lazy import peek
+from .meeting_index import MeetingIndex
+from .models import CacheData, TranscriptSegments
+from .search_index import tokenize
+from .topic_index import STOPWORDS
+
+# Bump whenever chunking or the stored layout changes
+SEMANTIC_VERSION = 1
+
+# Chunks hold about this many characters: one or more paragraphs, or whole segments
+CHUNK_CHARS = 800
+
+# Chunks handed to the embedder per call
+EMBED_BATCH = 256
+
+# Dimension of the default hashing embedder
+HASHING_DIM = 256
+
+# Corpora with at least this many chunks also get a clustered index
+ANN_MIN_CHUNKS = 100_000
+
+# Clusters searched per query, and rows scored per batch when assigning clusters
+ANN_PROBES = 32
+ANN_ITERATIONS = 8
+ASSIGN_BATCH = 65536
+
+# Candidate chunks considered per requested meeting before grouping by meeting
+CANDIDATES_PER_RESULT = 8
+
+FIELDS = ("transcript", "notes")
+
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+SENTENCE_RE = re.compile(r"[^\s.!?][^.!?\n]*[.!?]*")
+
+
+class Embedder(Protocol):
+    """Turns texts into fixed-size vectors that are close for related texts.
+
+    ``name`` identifies the model and its settings: stored vectors are only
+    reused by an embedder with the same ``name`` and ``dim``.
+    """
+    name: str
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> Any:
+        """A (len(texts), dim) array-like; rows need not be normalised."""
+        ...
+
+
+class HashingEmbedder:
+    """Deterministic feature-hashing embedder; needs no model download or network.
+
+    Words (stopwords dropped), adjacent word pairs and character 4-grams of
+    each word are hashed into ``dim`` signed buckets, words weighted by
+    sublinear term frequency. The 4-grams put inflections ("pricing",
+    "priced") close together; there is no notion of synonyms.
+
+    Each distinct word is hashed once: its buckets and signed weights are
+    kept in flat arrays (CSR by word number), so embedding a batch is a
+    dictionary lookup per token followed by array gathers. Batches may be
+    embedded from several threads at once (an index build and a query);
+    the vocabulary is extended under a lock, and each batch works on the
+    arrays it saw together with its word numbers.
+    """
+
+    def __init__(self, dim: int = HASHING_DIM):
+        if dim <= 0:
+            raise ValueError(f"dimension must be positive, got {dim}")
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self._word_ids: Dict[str, int] = {}
+        self._codes = np.zeros(0, dtype=np.uint64)  # word number -> crc32 of the word
+        self._starts = np.zeros(1, dtype=np.int64)  # word number -> first feature
+        self._buckets = np.zeros(0, dtype=np.int64)
+        self._weights = np.zeros(0, dtype=np.float64)
+        self._lock = threading.Lock()
+
+    def _bucket(self, feature: str) -> Tuple[int, int, float]:
+        code = zlib.crc32(feature.encode('utf-8'))
+        return code, code % self.dim, -1.0 if code & 0x80000000 else 1.0
+
+    def _add_words(self, words: List[str]):
+        """Hash new words and their 4-grams into the feature arrays; call with the lock held.
+
+        The arrays are replaced, never modified, and the word numbers are
+        published last, so a number always has its features.
+        """
+        codes, lengths, buckets, weights = [], [], [], []
+        for word in words:
+            padded = f"<{word}>"
+            grams = [padded[i:i + 4] for i in range(len(padded) - 3)]
+            hashed = [self._bucket(word)] + [self._bucket(f"#{gram}") for gram in grams]
+            codes.append(hashed[0][0])
+            lengths.append(len(hashed))
+            buckets.extend(bucket for _, bucket, _ in hashed)
+            # The 4-grams of a word together weigh half as much as the word itself
+            weights.append(hashed[0][2])
+            weights.extend(sign * 0.5 / len(grams) for _, _, sign in hashed[1:])
+        self._codes = np.concatenate((self._codes, np.array(codes, dtype=np.uint64)))
+        self._starts = np.concatenate((self._starts, self._starts[-1] + np.cumsum(lengths, dtype=np.int64)))
+        self._buckets = np.concatenate((self._buckets, np.array(buckets, dtype=np.int64)))
+        self._weights = np.concatenate((self._weights, np.array(weights, dtype=np.float64)))
+        first = len(self._word_ids)
+        self._word_ids.update((word, first + i) for i, word in enumerate(words))
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        texts_words = [[word for word in tokenize(text) if len(word) > 1 and word not in STOPWORDS]
+                       for text in texts]
+        ids: List[int] = []
+        rows: List[int] = []
+        with self._lock:
+            word_ids = self._word_ids
+            new = [word for word in dict.fromkeys(word for words in texts_words for word in words)
+                   if word not in word_ids]
+            if new:
+                self._add_words(new)
+            for row, words in enumerate(texts_words):
+                ids.extend(word_ids[word] for word in words)
+                rows.extend([row] * len(words))
+            # Arrays covering every word number taken above; later additions replace them
+            vocabulary = len(word_ids)
+            codes, starts, buckets, weights = self._codes, self._starts, self._buckets, self._weights
+        matrix = np.zeros(len(texts) * self.dim, dtype=np.float64)
+        if not ids:
+            return matrix.reshape(len(texts), self.dim).astype(np.float32)
+        token_ids = np.array(ids, dtype=np.int64)
+        token_rows = np.array(rows, dtype=np.int64)
+
+        # Words: 1 + log(count) per (row, word), spread over the word's features
+        keys, counts = np.unique(token_rows * vocabulary + token_ids, return_counts=True)
+        key_rows, key_ids = np.divmod(keys, vocabulary)
+        firsts = starts[key_ids]
+        lengths = starts[key_ids + 1] - firsts
+        features = np.repeat(firsts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        np.add.at(matrix, np.repeat(key_rows * self.dim, lengths) + buckets[features],
+                  weights[features] * np.repeat(1.0 + np.log(counts), lengths))
+
+        # Adjacent word pairs within a text, hashed from the two word codes
+        same = token_rows[1:] == token_rows[:-1]
+        pairs = (codes[token_ids[:-1]] << np.uint64(32)) | codes[token_ids[1:]]
+        mixed = pairs[same] * np.uint64(0x9E3779B97F4A7C15)
+        pair_buckets = (mixed >> np.uint64(32)).astype(np.int64) % self.dim
+        signs = np.where(mixed >> np.uint64(63), -0.5, 0.5)
+        np.add.at(matrix, token_rows[1:][same] * self.dim + pair_buckets, signs)
+        return matrix.reshape(len(texts), self.dim).astype(np.float32)
+
+
+def load_embedder(spec: Optional[str] = None) -> Embedder:
+    """The embedder described by ``spec`` (the GRANOLA_EMBEDDER setting).
+
+    ``hashing`` or ``hashing:<dim>`` selects the built-in HashingEmbedder;
+    ``package.module:attribute`` names an embedder object, or a class or
+    zero-argument factory returning one. Raises ValueError or ImportError.
+    """
+    spec = (spec or "hashing").strip()
+    target, _, attribute = spec.partition(":")
+    if target == "hashing":
+        return HashingEmbedder(int(attribute) if attribute else HASHING_DIM)
+    if not attribute:
+        raise ValueError(f"expected 'module:attribute', got '{spec}'")
+    factory = getattr(importlib.import_module(target), attribute)
+    embedder = factory if hasattr(factory, "embed") else factory()
+    if not hasattr(embedder, "embed") or int(getattr(embedder, "dim", 0)) <= 0:
+        raise ValueError(f"'{spec}' is not an embedder with an embed() method and a positive dim")
+    return embedder
+
+
+def embedder_key(embedder: Embedder) -> str:
+    """Identity of an embedder's vector space, stored with the vectors it produced."""
+    return f"{getattr(embedder, 'name', type(embedder).__qualname__)}/{embedder.dim}"
+
+
+def embed_texts(embedder: Embedder, texts: Sequence[str]) -> np.ndarray:
+    """L2-normalised float32 embeddings of ``texts``; empty texts get zero rows."""
+    matrix = np.array(embedder.embed(list(texts)), dtype=np.float32)
+    if matrix.shape != (len(texts), embedder.dim):
+        raise ValueError(f"embedder returned shape {matrix.shape}, expected {(len(texts), embedder.dim)}")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def segment_windows(segments: TranscriptSegments, limit: int = CHUNK_CHARS) -> List[Tuple[int, int]]:
+    """Runs of whole segments [first, stop) spanning about ``limit`` characters each.
+
+    A segment longer than ``limit`` is a window of its own.
+    """
+    starts = segments.starts
+    count = len(starts)
+    windows = []
+    first = 0
+    while first < count:
+        bound = starts[first] + limit + 1
+        # Segment i fits if the next one starts (one separator after its end) within the bound
+        stop = max(bisect_right(starts, bound, first + 1) - 1, first + 1)
+        if stop == count - 1 and len(segments.text) < bound:
+            stop = count
+        windows.append((first, stop))
+        first = stop
+    return windows
+
+
+def paragraph_ranges(text: str, limit: int = CHUNK_CHARS) -> List[Tuple[int, int]]:
+    """Character ranges of the paragraphs of ``text``.
+
+    Consecutive short paragraphs are merged up to ``limit`` characters and
+    longer ones are split at spaces, so chunks stay comparable in size.
+    """
+    pieces = []
+    position = 0
+    for match in PARAGRAPH_RE.finditer(text):
+        pieces.append((position, match.start()))
+        position = match.end()
+    pieces.append((position, len(text)))
+
+    ranges: List[Tuple[int, int]] = []
+    current: Optional[Tuple[int, int]] = None
+    for start, end in pieces:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            continue
+        if current and end - current[0] <= limit:
+            current = (current[0], end)
+            continue
+        if current:
+            ranges.append(current)
+        while end - start > limit:
+            cut = text.rfind(" ", start + limit // 2, start + limit)
+            if cut <= start:
+                cut = start + limit
+            ranges.append((start, cut))
+            start = cut
+            while start < end and text[start].isspace():
+                start += 1
+        current = (start, end)
+    if current:
+        ranges.append(current)
+    return ranges
+
+
+def meeting_units(cache_data: CacheData, meeting_index: MeetingIndex, meeting_id: str) -> Dict[str, List[str]]:
+    """Source texts of a meeting's chunks: its joined transcript and each note document.
+
+    Lazily loaded bodies are parsed for the occasion and not kept.
+    """
+    transcript = peek(cache_data.transcripts, meeting_id)
+    documents = (peek(cache_data.documents, doc_id) for doc_id in meeting_index.documents_for(meeting_id))
+    return {
+        "transcript": [transcript.content] if transcript else [],
+        "notes": [document.content for document in documents if document is not None],
+    }
+
+
+def meeting_chunks(cache_data: CacheData, meeting_index: MeetingIndex, meeting_id: str) -> List[Tuple[int, ...]]:
+    """(field, unit, start, end, first segment, stop segment) of each chunk of a meeting.
+
+    ``field`` indexes FIELDS; notes chunks have no segments (-1).
+    """
+    chunks: List[Tuple[int, ...]] = []
+    transcript = peek(cache_data.transcripts, meeting_id)
+    if transcript is not None and transcript.content.strip():
+        segments = transcript.segments
+        for first, stop in segment_windows(segments):
+            chunks.append((0, 0, segments.starts[first], segments.span(stop - 1)[1], first, stop))
+    for unit, text in enumerate(meeting_units(cache_data, meeting_index, meeting_id)["notes"]):
+        chunks.extend((1, unit, start, end, -1, -1) for start, end in paragraph_ranges(text))
+    return chunks
+
+
+def content_digest(cache_data: CacheData, meeting_index: MeetingIndex, meeting_id: str) -> bytes:
+    """Digest of the texts a meeting's chunks are cut from."""
+    digest = hashlib.blake2b(digest_size=16)
+    for field_name, units in meeting_units(cache_data, meeting_index, meeting_id).items():
+        for text in units:
+            digest.update(f"{field_name}:{len(text)}:".encode('utf-8'))
+            digest.update(text.encode('utf-8'))
+    return digest.digest()
+
+
+def train_centroids(vectors: np.ndarray, clusters: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids of a sample of ``vectors``."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), clusters * 40)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, clusters, replace=False)].copy()
+    for _ in range(ANN_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind='stable')
+        counts = np.bincount(assignment, minlength=clusters)
+        present = np.flatnonzero(counts)
+        boundaries = np.concatenate(([0], np.cumsum(counts[present])[:-1]))
+        sums = np.add.reduceat(sample[order], boundaries, axis=0)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Clusters that lost every sample row keep their previous centroid
+        centroids[present] = sums / np.maximum(norms, 1e-12)
+    return centroids
+
+
+def assign_clusters(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid of each row, scoring ASSIGN_BATCH rows at a time."""
+    assignment = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BATCH):
+        block = np.asarray(vectors[start:start + ASSIGN_BATCH])
+        assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+@dataclass
+class Passage:
+    """A chunk of a meeting's notes or transcript close to a semantic query.
+
+    ``start``/``end`` are character offsets into the source text: the
+    joined transcript, or note document number ``unit``.
+    """
+    field: str
+    unit: int
+    start: int
+    end: int
+    score: float
+    text: str = ""
+    segments: Optional[Tuple[int, int]] = None  # transcript segments [first, stop) covered
+
+    def payload(self) -> Dict[str, Any]:
+        """JSON fields of the passage."""
+        payload: Dict[str, Any] = {"field": self.field, "text": self.text, "score": round(self.score, 4),
+                                   "offset": self.start, "end": self.end}
+        if self.field == "notes":
+            payload["document"] = self.unit
+        if self.segments:
+            payload["start_segment"], payload["end_segment"] = self.segments
+        return payload
+
+    def markdown(self) -> str:
+        """The passage on one line."""
+        return " ".join(self.text.split())
+
+
+class SemanticIndex:
+    """Chunk embeddings of every meeting, one L2-normalised float32 row per chunk.
+
+    ``chunks`` holds (field, unit, start, end, first segment, stop segment)
+    per row and ``epochs`` the meeting's UTC epoch seconds, ascending.
+    Meeting ``i`` owns rows ``row_starts[i]:row_starts[i + 1]``; ``keys``
+    are the content digests its rows were embedded from.
+    """
+
+    def __init__(self, embedder: str, vectors: np.ndarray, meeting_ids: List[str], keys: List[bytes],
+                 row_starts: np.ndarray, chunks: np.ndarray, epochs: np.ndarray,
+                 centroids: Optional[np.ndarray] = None, assignment: Optional[np.ndarray] = None,
+                 trained_rows: int = 0, vectors_file: Optional[str] = None):
+        self.embedder = embedder
+        self.vectors = vectors
+        self.meeting_ids = meeting_ids
+        self.keys = keys
+        self.row_starts = row_starts
+        self.chunks = chunks
+        self.epochs = epochs
+        self.centroids = centroids
+        self.assignment = assignment
+        self.trained_rows = trained_rows
+        self.vectors_file = vectors_file
+        self.chunk_meetings = np.repeat(np.arange(len(meeting_ids), dtype=np.int32), np.diff(row_starts))
+        # Rows of each cluster, ascending within the cluster
+        self.cluster_rows: Optional[np.ndarray] = None
+        self.cluster_offsets: Optional[np.ndarray] = None
+        if centroids is not None and assignment is not None:
+            self.cluster_rows = np.argsort(assignment, kind='stable')
+            self.cluster_offsets = np.searchsorted(assignment[self.cluster_rows], np.arange(len(centroids) + 1))
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @classmethod
+    def build(cls, cache_data: CacheData, meeting_index: MeetingIndex, embedder: Embedder,
+              path: Optional[Path] = None, previous: Optional["SemanticIndex"] = None,
+              changed: Optional[Set[str]] = None, ann_min_chunks: int = ANN_MIN_CHUNKS) -> "SemanticIndex":
+        """Embed every meeting's chunks, reusing the rows of ``previous`` for unchanged meetings.
+
+        With ``changed`` (changed_meeting_ids against the data ``previous``
+        was built from), other meetings are taken as unchanged without
+        hashing their text; otherwise content digests decide. With ``path``
+        the vectors are written to a memory-mapped file next to it.
+        """
+        key = embedder_key(embedder)
+        if previous is not None and previous.embedder != key:
+            previous = None
+        old_positions = {meeting_id: i for i, meeting_id in enumerate(previous.meeting_ids)} if previous else {}
+
+        # Plan the rows first so the matrix can be allocated at its final size
+        plan: List[Tuple[str, bytes, Optional[int], List[Tuple[int, ...]]]] = []
+        row_starts = np.zeros(len(meeting_index.ids_by_date) + 1, dtype=np.int64)
+        for position, meeting_id in enumerate(meeting_index.ids_by_date):
+            old = old_positions.get(meeting_id)
+            if old is not None and changed is not None and meeting_id not in changed:
+                digest = previous.keys[old]
+            else:
+                digest = content_digest(cache_data, meeting_index, meeting_id)
+                if old is not None and previous.keys[old] != digest:
+                    old = None
+            chunks: List[Tuple[int, ...]] = []
+            if old is None:
+                chunks = meeting_chunks(cache_data, meeting_index, meeting_id)
+                size = len(chunks)
+            else:
+                size = int(previous.row_starts[old + 1] - previous.row_starts[old])
+            plan.append((meeting_id, digest, old, chunks))
+            row_starts[position + 1] = row_starts[position] + size
+
+        epochs = np.repeat(np.array(meeting_index.epochs, dtype=np.int64), np.diff(row_starts))
+        if (previous is not None and previous.meeting_ids == meeting_index.ids_by_date
+                and all(old == position for position, (_, _, old, _) in enumerate(plan))
+                and np.array_equal(previous.epochs, epochs)):
+            return previous
+
+        rows = int(row_starts[-1])
+        vectors_file = f"{path.name}-{uuid.uuid4().hex[:12]}.f32" if path is not None and rows else None
+        if vectors_file:
+            path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            vectors = np.memmap(path.parent / f".{vectors_file}.tmp", dtype=np.float32, mode='w+',
+                                shape=(rows, embedder.dim))
+        else:
+            vectors = np.zeros((rows, embedder.dim), dtype=np.float32)
+        table = np.empty((rows, 6), dtype=np.int32)
+        reuse_assignment = (previous is not None and previous.centroids is not None
+                            and rows >= ann_min_chunks and rows <= 2 * previous.trained_rows)
+        assignment = np.full(rows, -1, dtype=np.int32) if reuse_assignment else None
+
+        pending_rows: List[int] = []
+        pending_texts: List[str] = []
+
+        def flush():
+            if pending_rows:
+                vectors[pending_rows] = embed_texts(embedder, pending_texts)
+                pending_rows.clear()
+                pending_texts.clear()
+
+        for position, (meeting_id, _, old, chunks) in enumerate(plan):
+            row = int(row_starts[position])
+            if old is not None:
+                low, high = int(previous.row_starts[old]), int(previous.row_starts[old + 1])
+                vectors[row:row + high - low] = previous.vectors[low:high]
+                table[row:row + high - low] = previous.chunks[low:high]
+                if assignment is not None:
+                    assignment[row:row + high - low] = previous.assignment[low:high]
+                continue
+            units = meeting_units(cache_data, meeting_index, meeting_id)
+            for offset, chunk in enumerate(chunks):
+                table[row + offset] = chunk
+                pending_rows.append(row + offset)
+                pending_texts.append(units[FIELDS[chunk[0]]][chunk[1]][chunk[2]:chunk[3]])
+                if len(pending_rows) >= EMBED_BATCH:
+                    flush()
+        flush()
+
+        centroids, trained_rows = None, 0
+        if reuse_assignment:
+            centroids, trained_rows = previous.centroids, previous.trained_rows
+            fresh = np.flatnonzero(assignment < 0)
+            if len(fresh):
+                assignment[fresh] = assign_clusters(vectors[fresh], centroids)
+        elif rows >= ann_min_chunks:
+            clusters = int(min(max(math.sqrt(rows), 16), 1024, rows))
+            centroids, trained_rows = train_centroids(vectors, clusters), rows
+            assignment = assign_clusters(vectors, centroids)
+
+        index = cls(key, vectors, [meeting_id for meeting_id, *_ in plan], [digest for _, digest, *_ in plan],
+                    row_starts, table, epochs, centroids, assignment, trained_rows, vectors_file)
+        if path is not None:
+            index._commit(path, previous)
+        return index
+
+    def _commit(self, path: Path, previous: Optional["SemanticIndex"]):
+        """Move freshly written vectors into place and record them in the metadata file."""
+        try:
+            if self.vectors_file:
+                self.vectors.flush()
+                os.replace(path.parent / f".{self.vectors_file}.tmp", path.parent / self.vectors_file)
+                self.vectors = np.memmap(path.parent / self.vectors_file, dtype=np.float32, mode='r',
+                                         shape=self.vectors.shape)
+            meta = {
+                "version": SEMANTIC_VERSION,
+                "embedder": self.embedder,
+                "shape": self.vectors.shape,
+                "vectors_file": self.vectors_file,
+                "meeting_ids": self.meeting_ids,
+                "keys": self.keys,
+                "row_starts": self.row_starts,
+                "chunks": self.chunks,
+                "epochs": self.epochs,
+                "centroids": self.centroids,
+                "assignment": self.assignment,
+                "trained_rows": self.trained_rows,
+            }
+            temp_path = path.parent / f".{path.name}.pickle.tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path.with_name(f"{path.name}.pickle"))
+            if previous is not None and previous.vectors_file and previous.vectors_file != self.vectors_file:
+                # A memory-mapped previous index keeps reading the unlinked file
+                (path.parent / previous.vectors_file).unlink(missing_ok=True)
+        except Exception as e:
+            print(f"Error writing semantic index {path}: {e}", file=sys.stderr)
+
+    @classmethod
+    def load(cls, path: Path, embedder: Embedder) -> Optional["SemanticIndex"]:
+        """The index stored at ``path`` if it was built by this embedder, vectors memory-mapped."""
+        try:
+            with open(path.with_name(f"{path.name}.pickle"), 'rb') as f:
+                meta = pickle.load(f)
+            if meta.get("version") != SEMANTIC_VERSION or meta.get("embedder") != embedder_key(embedder):
+                return None
+            if meta["vectors_file"]:
+                vectors = np.memmap(path.parent / meta["vectors_file"], dtype=np.float32, mode='r',
+                                    shape=meta["shape"])
+            else:
+                vectors = np.zeros(meta["shape"], dtype=np.float32)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading semantic index {path}: {e}", file=sys.stderr)
+            return None
+        return cls(meta["embedder"], vectors, meta["meeting_ids"], meta["keys"], meta["row_starts"],
+                   meta["chunks"], meta["epochs"], meta["centroids"], meta["assignment"],
+                   meta["trained_rows"], meta["vectors_file"])
+
+    def rows_between(self, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[int, int]:
+        """Row range [low, high) of meetings dated within the inclusive epoch bounds."""
+        low = 0 if start is None else int(np.searchsorted(self.epochs, start, side='left'))
+        high = len(self.epochs) if end is None else int(np.searchsorted(self.epochs, end, side='right'))
+        return low, max(high, low)
+
+    def top_chunks(self, query: np.ndarray, limit: int, start: Optional[int] = None,
+                   end: Optional[int] = None, probes: int = ANN_PROBES) -> List[Tuple[int, float]]:
+        """Up to ``limit`` (row, cosine similarity) pairs, best first, within the date bounds.
+
+        With a clustered index only the rows of the ``probes`` clusters
+        nearest to the query are scored; if those hold too few rows in the
+        date range, every row in it is scored instead.
+        """
+        low, high = self.rows_between(start, end)
+        if limit <= 0 or low == high:
+            return []
+        candidates = None
+        if self.cluster_rows is not None and probes < len(self.centroids):
+            nearest = np.argpartition(-(self.centroids @ query), probes)[:probes]
+            parts = []
+            for cluster in nearest:
+                rows = self.cluster_rows[self.cluster_offsets[cluster]:self.cluster_offsets[cluster + 1]]
+                parts.append(rows[np.searchsorted(rows, low):np.searchsorted(rows, high)])
+            candidates = np.sort(np.concatenate(parts))
+            if len(candidates) < limit:
+                candidates = None
+        if candidates is None:
+            scores = np.asarray(self.vectors[low:high]) @ query
+            rows = np.arange(low, high)
+        else:
+            scores = np.asarray(self.vectors[candidates]) @ query
+            rows = candidates
+        if limit < len(scores):
+            best = np.argpartition(-scores, limit)[:limit]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(int(rows[i]), float(scores[i])) for i in best if scores[i] > 0]
+
+    def top_meetings(self, query: np.ndarray, limit: int, passages: int = 2, start: Optional[int] = None,
+                     end: Optional[int] = None) -> List[Tuple[str, float, List[Tuple[int, float]]]]:
+        """The ``limit`` meetings with the most similar chunks, each with its best ``passages`` rows.
+
+        A meeting scores as its best chunk. Candidates are widened until
+        enough distinct meetings are found or every row was considered.
+        """
+        low, high = self.rows_between(start, end)
+        wanted = max(limit, 1) * max(CANDIDATES_PER_RESULT, passages)
+        while True:
+            chunks = self.top_chunks(query, wanted, start, end)
+            grouped: Dict[int, List[Tuple[int, float]]] = {}
+            for row, score in chunks:
+                grouped.setdefault(int(self.chunk_meetings[row]), []).append((row, score))
+            if len(grouped) >= limit or wanted >= high - low or len(chunks) < wanted:
+                break
+            wanted *= 4
+        ranked = sorted(grouped.items(), key=lambda item: -item[1][0][1])[:limit]
+        return [(self.meeting_ids[position], rows[0][1], rows[:max(passages, 0)]) for position, rows in ranked]
+
+    def passage(self, row: int, score: float, cache_data: CacheData, meeting_index: MeetingIndex,
+                query: Optional[np.ndarray] = None, embedder: Optional[Embedder] = None,
+                limit: Optional[int] = None) -> Passage:
+        """The text and location of chunk ``row``.
+
+        With a query, embedder and ``limit``, a chunk longer than ``limit``
+        is narrowed to the piece most similar to the query (a transcript
+        segment or a notes sentence) and what follows it, up to ``limit``
+        characters.
+        """
+        field_number, unit, start, end, first, stop = (int(value) for value in self.chunks[row])
+        meeting_id = self.meeting_ids[int(self.chunk_meetings[row])]
+        units = meeting_units(cache_data, meeting_index, meeting_id)[FIELDS[field_number]]
+        source = units[unit] if unit < len(units) else ""
+        transcript = peek(cache_data.transcripts, meeting_id) if first >= 0 else None
+
+        if query is not None and embedder is not None and limit is not None and end - start > limit:
+            if transcript is not None:
+                pieces = [transcript.segments.span(index) for index in range(first, stop)]
+            else:
+                pieces = [(match.start(), match.end())
+                          for match in SENTENCE_RE.finditer(source, start, end)] or [(start, end)]
+            scores = embed_texts(embedder, [source[low:high] for low, high in pieces]) @ query
+            start = pieces[int(np.argmax(scores))][0]
+            end = min(end, start + limit)
+            if end < pieces[-1][1]:
+                cut = source.rfind(" ", start + 1, end + 1)
+                end = cut if cut > start else end
+            if transcript is not None:
+                segments = transcript.segments
+                first, stop = segments.segment_at(start), segments.segment_at(max(end - 1, start)) + 1
+
+        return Passage(field=FIELDS[field_number], unit=unit, start=start, end=end, score=score,
+                       text=source[start:end], segments=(first, stop) if first >= 0 else None)
@@ -1,12 +1,18 @@
 """Granola MCP Server implementation."""
 
+import asyncio
+import hashlib
+import heapq
 import json
+import math
 import os
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple, Union
 from datetime import datetime
 import zoneinfo
 import time
+from dataclasses import asdict
 
 from mcp.server import Server
 from mcp.server.models import InitializationOptions
@@ -17,20 +23,124 @@ from mcp.types import (
     Tool,
 )
 
-from .models import CacheData, MeetingMetadata, MeetingDocument, MeetingTranscript
+from .arena import COMPACT_RATIO, MIN_COMPACT_BYTES, ArenaText, TextArena
+from .cache_reader import SECTIONS, CacheEntry, UnsupportedLayout, iter_cache_entries, iter_dict_entries
+from .lazy import LazyEntry, LazySection, RawEntry, entry_objects
+from .models import CacheData, MeetingDocument, MeetingTranscript, TranscriptSegments
+from .parsing import (
+    DocumentParts,
+    ParseJobs,
+    assemble_document,
+    build_transcript,
+    configured_workers,
+    document_parts,
+    has_text,
+    needs_panel,
+    parse_meeting,
+    timestamp_seconds,
+)
+from .meeting_index import MeetingIndex
+from .output import DEFAULT_OUTPUT, OutputOptions, TextBudget, clip, output_properties, render_json
+from .rollups import RollupSummary, epoch_seconds
+from .response_cache import CACHED_TOOLS, DEFAULT_MAX_CHARS, DEFAULT_MAX_ENTRIES, ResponseCache
+from .search_index import SearchIndex
+from .semantic_index import ANN_MIN_CHUNKS, Embedder, HashingEmbedder, SemanticIndex, embed_texts, load_embedder
+from .snippets import Snippet, find_snippets, snippet_segments
+from .snapshot import CacheSnapshot, ReloadStats, SourceFingerprint, changed_meeting_ids
+from .stats import PhaseClock, ServerStats, process_memory, snapshot_sizes
+from .store import SnapshotStore, default_store_dir
+from .topic_index import TopicIndex
+
+# Selectable output fields per tool; the defaults are what the Markdown output always showed
+SEARCH_FIELDS = ("id", "date", "participants", "score", "snippets")
+DEFAULT_SEARCH_FIELDS = ("id", "date", "participants", "snippets")
+DETAIL_FIELDS = ("id", "date", "duration", "participants", "type", "platform", "documents", "transcript")
+DOCUMENT_FIELDS = ("id", "type", "created", "tags", "content")
+DEFAULT_DOCUMENT_FIELDS = ("type", "created", "tags", "content")
+TRANSCRIPT_FIELDS = ("speakers", "language", "confidence", "content")
+SEMANTIC_FIELDS = ("id", "date", "participants", "score", "passages")
+DEFAULT_SEMANTIC_FIELDS = ("id", "date", "score", "passages")
+TOOL_FIELDS = {
+    "search_meetings": SEARCH_FIELDS,
+    "semantic_search": SEMANTIC_FIELDS,
+    "get_meeting_details": DETAIL_FIELDS,
+    "get_meeting_documents": DOCUMENT_FIELDS,
+    "get_meeting_transcript": TRANSCRIPT_FIELDS,
+}
+
+# Highlighted snippets per search hit, by default and at most
+DEFAULT_SNIPPETS = 2
+MAX_SNIPPETS = 5
+
+# Matching passages per semantic_search hit, by default and at most, and their length
+DEFAULT_PASSAGES = 2
+MAX_PASSAGES = 5
+PASSAGE_CHARS = 300
+
+# Limits and defaults of get_meetings_batch
+MAX_BATCH_MEETINGS = 100
+BATCH_FIELDS = ("metadata", "notes", "transcript", "preview")
+DEFAULT_BATCH_FIELDS = ["metadata", "preview"]
+DEFAULT_BATCH_ITEM_CHARS = 4000
+PREVIEW_CHARS = 300
+
+
+def _fingerprint_entry(entry: Any, raw: Optional[str] = None) -> str:
+    """Content fingerprint of a raw cache entry, used to skip unchanged entries on reload."""
+    if isinstance(entry, dict) and entry.get("updated_at"):
+        return f"u:{entry['updated_at']}"
+    if raw is None:
+        raw = json.dumps(entry, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
 
 
 class GranolaMCPServer:
     """Granola MCP Server for meeting intelligence queries."""
     
-    def __init__(self, cache_path: Optional[str] = None, timezone: Optional[str] = None):
+    def __init__(self, cache_path: Optional[str] = None, timezone: Optional[str] = None,
+                 snapshot_dir: Optional[str] = None):
         """Initialize the Granola MCP server."""
         if cache_path is None:
             cache_path = os.path.expanduser("~/Library/Application Support/Granola/cache-v3.json")
         
         self.cache_path = cache_path
         self.server = Server("granola-mcp-server")
-        self.cache_data: Optional[CacheData] = None
+        self.snapshot: Optional[CacheSnapshot] = None
+        self.reload_stats = ReloadStats()
+        # Load phase timings and tool latencies, reported by server_stats
+        self.stats = ServerStats()
+        self.request_log = os.getenv("GRANOLA_REQUEST_LOG", "0") != "0"
+        self.auto_reload = os.getenv("GRANOLA_AUTO_RELOAD", "1") != "0"
+        self.streaming_load = os.getenv("GRANOLA_STREAMING_LOAD", "1") != "0"
+        self.parse_workers = configured_workers()
+        # Parse only meeting metadata up front; notes and transcripts on first access
+        self.lazy_parse = os.getenv("GRANOLA_LAZY_PARSE", "0") != "0"
+        # Document and transcript bodies live in a memory-mapped arena instead of strings
+        self.text_arena = os.getenv("GRANOLA_TEXT_ARENA", "0") != "0"
+        self.arena: Optional[TextArena] = None
+        self._failed_fingerprint: Optional[SourceFingerprint] = None
+        # Loads run in a worker thread; concurrent callers share the in-flight one
+        self._load_task: Optional[asyncio.Future] = None
+        self._load_started: Optional[float] = None
+        self.load_timeout = float(os.getenv("GRANOLA_LOAD_TIMEOUT", "20"))
+        # Full-text search indexes of lazy loads are built on first use
+        self._search_lock = asyncio.Lock()
+        # Topic indexes are built on first use, once per snapshot
+        self._topic_lock = asyncio.Lock()
+        # Semantic indexes too, each updated from the last one built
+        self._semantic_lock = asyncio.Lock()
+        self._semantic_base: Optional[Tuple[CacheData, SemanticIndex]] = None
+        self.embedder = self._load_embedder()
+        self.semantic_ann_min_chunks = int(os.getenv("GRANOLA_SEMANTIC_ANN_MIN_CHUNKS", str(ANN_MIN_CHUNKS)))
+        # Rendered results of repeated searches and analyses, valid until the next snapshot
+        self.response_cache = ResponseCache(
+            max_entries=int(os.getenv("GRANOLA_RESPONSE_CACHE_ENTRIES", str(DEFAULT_MAX_ENTRIES))),
+            max_chars=int(os.getenv("GRANOLA_RESPONSE_CACHE_CHARS", str(DEFAULT_MAX_CHARS))))
+        
+        # Persisted parse results let a fresh process skip re-parsing an unchanged cache
+        if snapshot_dir is None and os.getenv("GRANOLA_SNAPSHOT", "1") != "0":
+            snapshot_dir = os.getenv("GRANOLA_SNAPSHOT_DIR") or default_store_dir()
+        self.store = SnapshotStore(snapshot_dir, cache_path) if snapshot_dir else None
         
         # Set up timezone handling
         if timezone:
@@ -41,6 +151,21 @@ class GranolaMCPServer:
             
         self._setup_handlers()
     
+    @staticmethod
+    def _load_embedder() -> Embedder:
+        """The embedder configured by GRANOLA_EMBEDDER, or the hashing embedder if it cannot be loaded."""
+        spec = os.getenv("GRANOLA_EMBEDDER")
+        try:
+            return load_embedder(spec)
+        except Exception as e:
+            print(f"Error loading embedder '{spec}': {e}; using the hashing embedder", file=sys.stderr)
+            return HashingEmbedder()
+    
+    @property
+    def cache_data(self) -> Optional[CacheData]:
+        """Cache data of the currently installed snapshot."""
+        return self.snapshot.cache_data if self.snapshot else None
+    
     def _detect_local_timezone(self):
         """Detect the local timezone."""
         try:
@@ -80,7 +205,7 @@ class GranolaMCPServer:
                 return zoneinfo.ZoneInfo(offset_mapping[hours_offset])
                 
         except Exception as e:
-            print(f"Error detecting timezone: {e}")
+            print(f"Error detecting timezone: {e}", file=sys.stderr)
         
         # Ultimate fallback to Eastern Time (common for US business)
         return zoneinfo.ZoneInfo('America/New_York')
@@ -119,7 +244,77 @@ class GranolaMCPServer:
                                 "type": "integer", 
                                 "description": "Maximum number of results",
                                 "default": 10
-                            }
+                            },
+                            "ranking": {
+                                "type": "string",
+                                "description": "Scoring mode: 'bm25' ranks by term relevance across titles, participants, notes and transcripts (quoted \"phrases\" must match exactly); 'legacy' uses fixed title/participant/transcript match weights",
+                                "enum": ["bm25", "legacy"],
+                                "default": "bm25"
+                            },
+                            "field_boosts": {
+                                "type": "object",
+                                "description": "Optional BM25 weight per field; 0 leaves the field out",
+                                "properties": {
+                                    "title": {"type": "number", "minimum": 0},
+                                    "participants": {"type": "number", "minimum": 0},
+                                    "notes": {"type": "number", "minimum": 0},
+                                    "transcript": {"type": "number", "minimum": 0}
+                                },
+                                "additionalProperties": False
+                            },
+                            "date_range": {
+                                "type": "object",
+                                "properties": {
+                                    "start_date": {"type": "string", "format": "date"},
+                                    "end_date": {"type": "string", "format": "date"}
+                                },
+                                "description": "Optional date range (inclusive, UTC) to restrict results to"
+                            },
+                            "participant": {
+                                "type": "string",
+                                "description": "Optional participant name (exact, case-insensitive) to restrict results to meetings they attended"
+                            },
+                            "snippets": {
+                                "type": "integer",
+                                "description": "Highlighted excerpts from notes and transcript per result, with offsets and transcript segments to read more (0 to disable)",
+                                "default": DEFAULT_SNIPPETS,
+                                "maximum": MAX_SNIPPETS
+                            },
+                            **output_properties(SEARCH_FIELDS, "Maximum characters of results to return; results that do not fit are counted but left out")
+                        },
+                        "required": ["query"]
+                    }
+                ),
+                Tool(
+                    name="semantic_search",
+                    description="Find meetings whose notes or transcript are about the same thing as the query, even without shared keywords, using local embeddings",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "Natural-language description of what to find"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of meetings",
+                                "default": 10
+                            },
+                            "date_range": {
+                                "type": "object",
+                                "properties": {
+                                    "start_date": {"type": "string", "format": "date"},
+                                    "end_date": {"type": "string", "format": "date"}
+                                },
+                                "description": "Optional date range (inclusive, UTC) to restrict results to"
+                            },
+                            "passages": {
+                                "type": "integer",
+                                "description": "Most similar passages per meeting, with offsets and transcript segments to read more (0 to disable)",
+                                "default": DEFAULT_PASSAGES,
+                                "maximum": MAX_PASSAGES
+                            },
+                            **output_properties(SEMANTIC_FIELDS, "Maximum characters of results to return; results that do not fit are counted but left out")
                         },
                         "required": ["query"]
                     }
@@ -133,21 +328,53 @@ class GranolaMCPServer:
                             "meeting_id": {
                                 "type": "string",
                                 "description": "Meeting ID to retrieve details for"
-                            }
+                            },
+                            **output_properties(DETAIL_FIELDS)
                         },
                         "required": ["meeting_id"]
                     }
                 ),
                 Tool(
                     name="get_meeting_transcript",
-                    description="Get transcript for a specific meeting",
+                    description="Get transcript for a specific meeting, optionally one window or page at a time",
                     inputSchema={
                         "type": "object",
                         "properties": {
                             "meeting_id": {
                                 "type": "string", 
                                 "description": "Meeting ID to get transcript for"
-                            }
+                            },
+                            "offset": {
+                                "type": "integer",
+                                "description": "Character offset into the transcript (or into the selected window) to start from",
+                                "default": 0
+                            },
+                            "max_chars": {
+                                "type": "integer",
+                                "minimum": 1,
+                                "description": "Maximum characters of transcript text to return; a cursor is returned when more remains"
+                            },
+                            "start_segment": {
+                                "type": "integer",
+                                "description": "First speech segment to include (0-based)"
+                            },
+                            "end_segment": {
+                                "type": "integer",
+                                "description": "Segment to stop before (exclusive)"
+                            },
+                            "start_time": {
+                                "type": ["string", "number"],
+                                "description": "Window start: seconds from the start of the transcript, or an ISO timestamp"
+                            },
+                            "end_time": {
+                                "type": ["string", "number"],
+                                "description": "Window end: seconds from the start of the transcript, or an ISO timestamp"
+                            },
+                            "cursor": {
+                                "type": "string",
+                                "description": "Continuation cursor from a previous truncated response; other window arguments are ignored. Cursors expire when the cache reloads"
+                            },
+                            **output_properties(TRANSCRIPT_FIELDS)
                         },
                         "required": ["meeting_id"]
                     }
@@ -161,11 +388,40 @@ class GranolaMCPServer:
                             "meeting_id": {
                                 "type": "string",
                                 "description": "Meeting ID to get documents for" 
-                            }
+                            },
+                            **output_properties(DOCUMENT_FIELDS, "Maximum characters of document content to return, shared by all documents in order")
                         },
                         "required": ["meeting_id"]
                     }
                 ),
+                Tool(
+                    name="get_meetings_batch",
+                    description="Get details, notes and/or transcripts for several meetings in one call",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "meeting_ids": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "maxItems": MAX_BATCH_MEETINGS,
+                                "description": "Meeting IDs to retrieve, e.g. from search_meetings"
+                            },
+                            "fields": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": list(BATCH_FIELDS)},
+                                "description": "What to include per meeting: metadata, notes (full documents), transcript, preview (short excerpts of notes and transcript)",
+                                "default": DEFAULT_BATCH_FIELDS
+                            },
+                            "max_chars_per_item": {
+                                "type": "integer",
+                                "description": "Maximum characters of notes, transcript and preview text per meeting",
+                                "default": DEFAULT_BATCH_ITEM_CHARS
+                            },
+                            **output_properties()
+                        },
+                        "required": ["meeting_ids"]
+                    }
+                ),
                 Tool(
                     name="analyze_meeting_patterns",
                     description="Analyze patterns across multiple meetings",
@@ -174,8 +430,8 @@ class GranolaMCPServer:
                         "properties": {
                             "pattern_type": {
                                 "type": "string",
-                                "description": "Type of pattern to analyze (topics, participants, frequency)",
-                                "enum": ["topics", "participants", "frequency"]
+                                "description": "Type of pattern to analyze (topics from titles, content_topics by TF-IDF over notes and transcripts, participants, frequency)",
+                                "enum": ["topics", "content_topics", "participants", "frequency"]
                             },
                             "date_range": {
                                 "type": "object",
@@ -184,563 +440,1544 @@ class GranolaMCPServer:
                                     "end_date": {"type": "string", "format": "date"}
                                 },
                                 "description": "Optional date range for analysis"
-                            }
+                            },
+                            **output_properties()
                         },
                         "required": ["pattern_type"]
                     }
+                ),
+                Tool(
+                    name="server_stats",
+                    description="Report server performance: load phase timings, tool latencies, cache sizes and memory use",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            **output_properties()
+                        }
+                    }
                 )
             ]
         
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             """Handle tool calls."""
-            await self._ensure_cache_loaded()
-            
-            if name == "search_meetings":
-                return await self._search_meetings(
-                    query=arguments["query"],
-                    limit=arguments.get("limit", 10)
-                )
-            elif name == "get_meeting_details":
-                return await self._get_meeting_details(arguments["meeting_id"])
-            elif name == "get_meeting_transcript":
-                return await self._get_meeting_transcript(arguments["meeting_id"])
-            elif name == "get_meeting_documents":
-                return await self._get_meeting_documents(arguments["meeting_id"])
-            elif name == "analyze_meeting_patterns":
-                return await self._analyze_meeting_patterns(
-                    pattern_type=arguments["pattern_type"],
-                    date_range=arguments.get("date_range")
-                )
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+            return await self._call_tool(name, arguments)
+    
+    async def _call_tool(self, name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Run a tool, timing it and logging the request when GRANOLA_REQUEST_LOG is set."""
+        started = time.perf_counter()
+        outcome = {"cached": False, "chars": 0}
+        error = None
+        try:
+            result = await self._run_tool(name, arguments, outcome)
+            outcome["chars"] = sum(len(content.text) for content in result)
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.stats.record_tool(name, seconds, error=error is not None, cached=outcome["cached"])
+            if self.request_log:
+                self._log_request(name, seconds, outcome, error)
+    
+    async def _run_tool(self, name: str, arguments: Dict[str, Any], outcome: Dict[str, Any]) -> List[TextContent]:
+        """Run a tool, answering repeated calls on the same snapshot from the response cache."""
+        if name == "server_stats":
+            # Answered while the cache is still loading too
+            return await self._dispatch_tool(name, arguments)
+        if not await self._ensure_cache_loaded(timeout=self.load_timeout):
+            outcome["loading"] = True
+            return [TextContent(type="text", text=self._loading_message())]
+        
+        cacheable = name in CACHED_TOOLS and self.response_cache.enabled
+        if cacheable:
+            version = self.snapshot.version
+            key = ResponseCache.key(name, arguments, version)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                outcome["cached"] = True
+                return cached
+        
+        result = await self._dispatch_tool(name, arguments)
+        # A reload during the call may have mixed snapshots into the result
+        if cacheable and self.snapshot.version == version:
+            self.response_cache.put(key, result)
+        return result
+    
+    def _log_request(self, name: str, seconds: float, outcome: Dict[str, Any], error: Optional[Exception]):
+        """Log one line describing a tool call."""
+        record = {
+            "tool": name,
+            "ms": round(seconds * 1e3, 3),
+            "snapshot": self.snapshot.version if self.snapshot else None,
+            **outcome,
+        }
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        self._log_event(record)
+    
+    @staticmethod
+    def _log_event(record: Dict[str, Any]):
+        """Write a timestamped JSON line to stderr (stdout carries the stdio transport)."""
+        line = {"ts": datetime.now(zoneinfo.ZoneInfo('UTC')).isoformat(timespec="milliseconds"), **record}
+        print(json.dumps(line), file=sys.stderr, flush=True)
+    
+    async def _dispatch_tool(self, name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Parse output options and call the tool's handler."""
+        try:
+            output = OutputOptions.from_arguments(arguments, TOOL_FIELDS.get(name, ()))
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Invalid output options: {e}")]
+        
+        if name == "search_meetings":
+            return await self._search_meetings(
+                query=arguments["query"],
+                limit=arguments.get("limit", 10),
+                ranking=arguments.get("ranking", "bm25"),
+                field_boosts=arguments.get("field_boosts"),
+                date_range=arguments.get("date_range"),
+                participant=arguments.get("participant"),
+                snippets=arguments.get("snippets", DEFAULT_SNIPPETS),
+                output=output
+            )
+        elif name == "semantic_search":
+            return await self._semantic_search(
+                query=arguments["query"],
+                limit=arguments.get("limit", 10),
+                date_range=arguments.get("date_range"),
+                passages=arguments.get("passages", DEFAULT_PASSAGES),
+                output=output
+            )
+        elif name == "get_meeting_details":
+            return await self._get_meeting_details(arguments["meeting_id"], output=output)
+        elif name == "get_meeting_transcript":
+            return await self._get_meeting_transcript(
+                arguments["meeting_id"],
+                offset=arguments.get("offset", 0),
+                max_chars=arguments.get("max_chars"),
+                start_segment=arguments.get("start_segment"),
+                end_segment=arguments.get("end_segment"),
+                start_time=arguments.get("start_time"),
+                end_time=arguments.get("end_time"),
+                cursor=arguments.get("cursor"),
+                output=output
+            )
+        elif name == "get_meeting_documents":
+            return await self._get_meeting_documents(arguments["meeting_id"], output=output)
+        elif name == "get_meetings_batch":
+            return await self._get_meetings_batch(
+                arguments["meeting_ids"],
+                fields=arguments.get("fields"),
+                max_chars_per_item=arguments.get("max_chars_per_item", DEFAULT_BATCH_ITEM_CHARS),
+                output=output
+            )
+        elif name == "analyze_meeting_patterns":
+            return await self._analyze_meeting_patterns(
+                pattern_type=arguments["pattern_type"],
+                date_range=arguments.get("date_range"),
+                output=output
+            )
+        elif name == "server_stats":
+            return await self._server_stats(output=output)
+        else:
+            raise ValueError(f"Unknown tool: {name}")
+    
+    async def _ensure_cache_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Ensure cache data is loaded, starting a reload if the file on disk changed.
+        
+        Once a snapshot is installed, a reload runs in the background and
+        callers keep being answered from the current snapshot until it is
+        swapped. Only the first load is waited for, at most ``timeout``
+        seconds; the load keeps running in the background after that.
+        Returns False only while no snapshot is available yet.
+        """
+        if self._load_task is None and not self._needs_load():
+            return True
+        
+        if self.snapshot is not None:
+            self._start_load()
+            return True
+        
+        try:
+            await asyncio.wait_for(self._load_cache(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.snapshot is not None
+    
+    def _needs_load(self) -> bool:
+        """Whether the served snapshot is missing or stale."""
+        if self.snapshot is None:
+            return True
+        if not self.auto_reload:
+            return False
+        
+        # A stat is cheap enough to do on every tool call
+        fingerprint = SourceFingerprint.from_path(self.cache_path)
+        return fingerprint != self.snapshot.fingerprint and fingerprint != self._failed_fingerprint
+    
+    def _start_load(self) -> asyncio.Future:
+        """Start a cache load unless one is already in flight, and return it."""
+        if self._load_task is None:
+            self._load_started = time.perf_counter()
+            self._load_task = asyncio.ensure_future(self._run_load())
+            self._load_task.add_done_callback(self._load_finished)
+        return self._load_task
     
-    async def _ensure_cache_loaded(self):
-        """Ensure cache data is loaded."""
-        if self.cache_data is None:
-            await self._load_cache()
+    def _preload(self):
+        """Start loading before the first tool call, unless the snapshot is current."""
+        if self._needs_load():
+            self._start_load()
+    
+    def _load_finished(self, task: asyncio.Future):
+        self._load_task = None
+    
+    def _loading_message(self) -> str:
+        """Status text returned to tool calls while the first load is running."""
+        elapsed = time.perf_counter() - self._load_started if self._load_started else 0.0
+        return (f"Granola cache is still loading ({elapsed:.0f}s elapsed, {self.cache_path}). "
+                "Please try again in a few seconds.")
     
     async def _load_cache(self):
-        """Load and parse Granola cache data."""
+        """Load and parse Granola cache data, joining a load that is already running."""
+        # Shielded so a cancelled tool call does not abandon the shared load
+        await asyncio.shield(self._start_load())
+    
+    async def _run_load(self):
+        """Read, parse and index the cache in a worker thread, then install it.
+        
+        The new data is built off to the side and installed in a single
+        assignment on the event loop, so a failed reload keeps serving the
+        previous snapshot and tool handlers never see a half-swapped one.
+        """
+        started = time.perf_counter()
+        initial = self.snapshot is None
+        # Stat before reading: if the file changes mid-read, the next call reloads again
+        fingerprint = SourceFingerprint.from_path(self.cache_path)
+        clock = PhaseClock()
+        
         try:
-            cache_path = Path(self.cache_path)
-            if not cache_path.exists():
-                self.cache_data = CacheData()
-                return
-            
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
-            
-            # Handle Granola's nested cache structure
-            if 'cache' in raw_data and isinstance(raw_data['cache'], str):
-                # Cache data is stored as a JSON string inside the 'cache' key
-                actual_data = json.loads(raw_data['cache'])
-                if 'state' in actual_data:
-                    raw_data = actual_data['state']
-                else:
-                    raw_data = actual_data
-            
-            self.cache_data = await self._parse_cache_data(raw_data)
-            
+            cache_data, search_index, meeting_index, from_store = await asyncio.to_thread(
+                self._build_snapshot_data, fingerprint, clock)
         except Exception as e:
-            self.cache_data = CacheData()
-            print(f"Error loading cache: {e}")
+            self.reload_stats.record_failure(e)
+            self._failed_fingerprint = fingerprint
+            self._log_event({"event": "load_failed", "cache_path": self.cache_path, "initial": initial,
+                             "ms": round((time.perf_counter() - started) * 1e3, 3),
+                             "error": f"{type(e).__name__}: {e}"})
+            if self.snapshot is None:
+                empty = CacheData()
+                self._install_snapshot(empty, SearchIndex.build(empty), MeetingIndex.build(empty), fingerprint)
+            return
+        
+        self._failed_fingerprint = None
+        self._install_snapshot(cache_data, search_index, meeting_index, fingerprint)
+        seconds = time.perf_counter() - started
+        self.reload_stats.record(seconds, initial, from_store=from_store)
+        self.stats.record_load(clock, seconds)
+    
+    def _build_snapshot_data(self, fingerprint: Optional[SourceFingerprint], clock: Optional[PhaseClock] = None
+                             ) -> Tuple[CacheData, SearchIndex, MeetingIndex, bool]:
+        """Produce cache data and its indexes for the file version ``fingerprint``.
+        
+        Blocking; runs in a worker thread. Returns whether the result came
+        from the persisted store. Phase timings go to ``clock``.
+        """
+        clock = clock or PhaseClock()
+        if fingerprint is not None and self.snapshot is None and self.store:
+            with clock.phase("store_load"):
+                stored = self.store.load(fingerprint, self._parse_settings())
+            if stored:
+                cache_data, search_index = stored
+                if cache_data.text_arena:
+                    self.arena = TextArena.open(cache_data.text_arena)
+                with clock.phase("index_build"):
+                    meeting_index = MeetingIndex.build(cache_data)
+                return cache_data, search_index, meeting_index, True
+        
+        if fingerprint is None:
+            cache_data = CacheData()
+        else:
+            cache_data = self._read_and_parse(previous=self.cache_data, clock=clock)
+        
+        with clock.phase("index_build"):
+            search_index, meeting_index = self._build_indexes(cache_data)
+        if self.text_arena and not self.lazy_parse:
+            # After indexing, so the indexes were built from the strings still in memory
+            with clock.phase("arena_store"):
+                self._store_bodies(cache_data)
+        
+        if fingerprint is not None and self.store:
+            with clock.phase("store_save"):
+                self.store.save(fingerprint, self._parse_settings(), cache_data, search_index)
+        return cache_data, search_index, meeting_index, False
+    
+    def _store_bodies(self, cache_data: CacheData):
+        """Move document and transcript bodies held as strings into the text arena.
+        
+        Bodies carried over from the previous parse are already there. Each
+        reload appends the changed ones, so once the arena is mostly bodies
+        nothing refers to any more, every body is copied to a fresh arena.
+        """
+        holders = [(doc, "body") for doc in cache_data.documents.values()]
+        holders += [(transcript.segments, "text") for transcript in cache_data.transcripts.values()]
+        arena = self.arena
+        if arena is not None:
+            live = sum(body.nbytes if isinstance(body, ArenaText) else len(body)
+                       for body in (getattr(holder, name) for holder, name in holders))
+            if arena.size > max(live * COMPACT_RATIO, MIN_COMPACT_BYTES):
+                arena = None
+        if arena is None:
+            arena = TextArena.create(self.store.directory, self.store.arena_prefix) if self.store else TextArena()
+        
+        for holder, name in holders:
+            body = getattr(holder, name)
+            if isinstance(body, ArenaText) and body.arena is arena:
+                continue
+            # Models shared with the previous snapshot may be updated too: the text is the same
+            setattr(holder, name, arena.store(str(body)))
+        arena.flush()
+        
+        if arena is not self.arena:
+            if self.arena is not None:
+                self.arena.unlink()
+            self.arena = arena
+            if self.store:
+                self.store.remove_stale_arenas(keep=arena.path)
+        cache_data.text_arena = arena.path
+    
+    def _read_and_parse(self, previous: Optional[CacheData], clock: Optional[PhaseClock] = None) -> CacheData:
+        """Read the cache file and parse it, streaming entries when the layout allows."""
+        clock = clock or PhaseClock()
+        if self.streaming_load:
+            try:
+                return self._parse_entries(iter_cache_entries(self.cache_path, clock), previous, clock)
+            except UnsupportedLayout:
+                pass
+        return self._parse_cache_data(self._read_raw_cache(clock), previous=previous, clock=clock)
+    
+    def _read_raw_cache(self, clock: Optional[PhaseClock] = None) -> Dict[str, Any]:
+        """Read the cache file and unwrap Granola's nested JSON structure."""
+        clock = clock or PhaseClock()
+        with clock.phase("read"):
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        with clock.phase("outer_decode"):
+            raw_data = json.loads(text)
+        del text
+        
+        # Handle Granola's nested cache structure
+        if 'cache' in raw_data and isinstance(raw_data['cache'], str):
+            # Cache data is stored as a JSON string inside the 'cache' key
+            with clock.phase("inner_decode"):
+                actual_data = json.loads(raw_data['cache'])
+            if 'state' in actual_data:
+                raw_data = actual_data['state']
+            else:
+                raw_data = actual_data
+        
+        return raw_data
+    
+    def _parse_settings(self) -> Dict[str, Any]:
+        """Settings that change parse output; part of the stored snapshot key."""
+        return {"parse_panels": os.getenv("GRANOLA_PARSE_PANELS", "1") != "0", "text_arena": self.text_arena,
+                "lazy_parse": self.lazy_parse}
+    
+    def _build_indexes(self, cache_data: CacheData) -> Tuple[SearchIndex, MeetingIndex]:
+        """Build the indexes for new cache data, patching the current ones when possible."""
+        if self.snapshot is None:
+            fields = SearchIndex.METADATA_FIELDS if self.lazy_parse else SearchIndex.FIELDS
+            return SearchIndex.build(cache_data, fields), MeetingIndex.build(cache_data)
+        previous = self.snapshot.cache_data
+        changed = changed_meeting_ids(previous, cache_data)
+        return (self.snapshot.search_index.updated(cache_data, changed),
+                self.snapshot.meeting_index.updated(previous, cache_data, changed))
+    
+    def _install_snapshot(self, cache_data: CacheData, search_index: SearchIndex, meeting_index: MeetingIndex,
+                          fingerprint: Optional[SourceFingerprint]):
+        """Atomically replace the served snapshot."""
+        version = self.snapshot.version + 1 if self.snapshot else 1
+        self.snapshot = CacheSnapshot(
+            cache_data=cache_data,
+            search_index=search_index,
+            meeting_index=meeting_index,
+            fingerprint=fingerprint,
+            version=version,
+            loaded_at=datetime.now(zoneinfo.ZoneInfo('UTC'))
+        )
+        self.response_cache.invalidate(version)
     
-    async def _parse_cache_data(self, raw_data: Dict[str, Any]) -> CacheData:
+    def _parse_cache_data(self, raw_data: Dict[str, Any], previous: Optional[CacheData] = None,
+                          clock: Optional[PhaseClock] = None) -> CacheData:
         """Parse raw cache data into structured models."""
+        return self._parse_entries(iter_dict_entries(raw_data), previous, clock)
+    
+    def _parse_entries(self, entries: Iterable[CacheEntry], previous: Optional[CacheData] = None,
+                       clock: Optional[PhaseClock] = None) -> CacheData:
+        """Parse a stream of raw cache entries into structured models.
+        
+        Entries may arrive in any section order. When ``previous`` is given,
+        entries whose content fingerprint is unchanged are carried over from
+        it instead of being parsed again, so a refresh only pays for meetings
+        that were added or modified. Entries not in the stream are dropped.
+        Transcript, document and panel parsing goes through ParseJobs, which
+        spreads it across GRANOLA_PARSE_WORKERS processes when configured;
+        ``clock`` then times the wait for the workers as ``parse_workers``.
+        """
+        clock = clock or PhaseClock()
+        if self.lazy_parse:
+            return self._parse_entries_lazy(entries, previous, clock)
+        
         cache_data = CacheData()
+        parse_panels = self._parse_settings()["parse_panels"]
+        prints: Dict[str, Dict[str, str]] = {section: {} for section in SECTIONS}
+        cache_data.entry_fingerprints = prints
+        
+        previous_prints = previous.entry_fingerprints if previous else {}
+        old_documents = previous_prints.get("documents", {})
+        old_transcripts = previous_prints.get("transcripts", {})
+        old_panels = previous_prints.get("documentPanels", {})
+        
+        # Documents whose content may depend on panels: None when parsed by a job,
+        # else the fields of a reusable document in case its panel changed
+        pending_documents: Dict[str, Optional[Dict[str, Any]]] = {}
+        panels: Dict[str, Tuple[Optional[str], Any]] = {}
+        documents_done = False
+        jobs = ParseJobs(self.parse_workers)
         
-        # Parse Granola documents (which are meetings)
-        if "documents" in raw_data:
-            for meeting_id, meeting_data in raw_data["documents"].items():
-                try:
-                    # Extract participants from people array
-                    participants = []
-                    if "people" in meeting_data and isinstance(meeting_data["people"], list):
-                        participants = [person.get("name", "") for person in meeting_data["people"] if person.get("name")]
+        try:
+            for section, key, value, raw in entries:
+                if section != "documents" and prints["documents"]:
+                    documents_done = True
+                if section == "documentPanels" and not parse_panels:
+                    continue
+                
+                clock.start("fingerprint")
+                fingerprint = _fingerprint_entry(value, raw)
+                clock.stop()
+                prints[section][key] = fingerprint
+                
+                if section == "documents":
+                    # Granola documents are meetings
+                    unchanged = previous is not None and old_documents.get(key) == fingerprint
+                    if unchanged and key in previous.meetings:
+                        meeting = previous.meetings[key]
+                    else:
+                        clock.start("parse_meetings")
+                        meeting = parse_meeting(key, value)
+                        clock.stop()
+                    if meeting is None:
+                        continue
+                    cache_data.meetings[key] = meeting
                     
-                    # Parse creation date
-                    created_at = meeting_data.get("created_at")
-                    if created_at:
-                        # Handle Granola's ISO format
-                        if created_at.endswith('Z'):
-                            created_at = created_at[:-1] + '+00:00'
-                        naive_date = datetime.fromisoformat(created_at)
-                        # Ensure timezone-aware datetime (assume UTC if naive)
-                        if naive_date.tzinfo is None:
-                            meeting_date = naive_date.replace(tzinfo=zoneinfo.ZoneInfo('UTC'))
+                    if unchanged and key in previous.documents:
+                        if has_text(value.get("notes_plain")) or has_text(value.get("notes_markdown")):
+                            # Panels are never consulted for these documents
+                            cache_data.documents[key] = previous.documents[key]
                         else:
-                            meeting_date = naive_date
+                            # Reusable unless its panel changed, which is only known at the end
+                            pending_documents[key] = {field: value.get(field) for field in ("notes", "overview", "summary")}
                     else:
-                        meeting_date = datetime.now(zoneinfo.ZoneInfo('UTC'))
-                    
-                    metadata = MeetingMetadata(
-                        id=meeting_id,
-                        title=meeting_data.get("title", "Untitled Meeting"),
-                        date=meeting_date,
-                        duration=None,  # Granola doesn't store duration in this format
-                        participants=participants,
-                        meeting_type=meeting_data.get("type", "meeting"),
-                        platform=None  # Not stored in Granola cache
-                    )
-                    cache_data.meetings[meeting_id] = metadata
-                except Exception as e:
-                    print(f"Error parsing meeting {meeting_id}: {e}")
-        
-        # Parse Granola transcripts (list format)
-        if "transcripts" in raw_data:
-            for transcript_id, transcript_data in raw_data["transcripts"].items():
-                try:
-                    # Use transcript_id as meeting_id (they match in Granola)
-                    meeting_id = transcript_id
-                    
-                    # Extract transcript content and speakers
-                    content_parts = []
-                    speakers_set = set()
-                    
-                    if isinstance(transcript_data, list):
-                        # Granola format: list of speech segments
-                        for segment in transcript_data:
-                            if isinstance(segment, dict) and "text" in segment:
-                                text = segment["text"].strip()
-                                if text:
-                                    content_parts.append(text)
-                                
-                                # Extract speaker info if available
-                                if "source" in segment:
-                                    speakers_set.add(segment["source"])
-                    
-                    elif isinstance(transcript_data, dict):
-                        # Fallback: dict format (legacy or different structure)
-                        if "content" in transcript_data:
-                            content_parts.append(transcript_data["content"])
-                        elif "text" in transcript_data:
-                            content_parts.append(transcript_data["text"])
-                        elif "transcript" in transcript_data:
-                            content_parts.append(transcript_data["transcript"])
-                        
-                        # Extract speakers if available
-                        if "speakers" in transcript_data:
-                            speakers_set.update(transcript_data["speakers"])
-                    
-                    # Combine all content and create transcript
-                    if content_parts:
-                        full_content = " ".join(content_parts)
-                        speakers_list = list(speakers_set) if speakers_set else []
-                        
-                        transcript = MeetingTranscript(
-                            meeting_id=meeting_id,
-                            content=full_content,
-                            speakers=speakers_list,
-                            language=None,  # Not typically stored in segment format
-                            confidence=None  # Would need to be calculated from segments
-                        )
-                        cache_data.transcripts[meeting_id] = transcript
-                        
-                except Exception as e:
-                    print(f"Error parsing transcript {transcript_id}: {e}")
-        
-        # Extract document content from Granola documents
-        document_panels = raw_data.get("documentPanels", {})
-        parse_panels = os.getenv("GRANOLA_PARSE_PANELS", "1") != "0"
-
-        if "documents" in raw_data:
-            for doc_id, doc_data in raw_data["documents"].items():
-                try:
-                    # Extract content from various Granola fields
-                    content_parts = []
-                    
-                    # Try notes_plain first (cleanest format)
-                    if doc_data.get("notes_plain"):
-                        content_parts.append(doc_data["notes_plain"])
-                    
-                    # Try notes_markdown as backup
-                    elif doc_data.get("notes_markdown"):
-                        content_parts.append(doc_data["notes_markdown"])
-                    
-                    # Try to extract from structured notes field
-                    elif doc_data.get("notes") and isinstance(doc_data["notes"], dict):
-                        notes_content = self._extract_structured_notes(doc_data["notes"])
-                        if notes_content:
-                            content_parts.append(notes_content)
-                    
-                    # Fallback to document panels when traditional fields are empty
-                    if parse_panels and not any(isinstance(part, str) and part.strip() for part in content_parts):
-                        panel_text = self._extract_document_panel_content(document_panels.get(doc_id))
-                        if panel_text:
-                            content_parts.append(panel_text)
-
-                    # Add overview if available
-                    if doc_data.get("overview"):
-                        content_parts.append(f"Overview: {doc_data['overview']}")
-                    
-                    # Add summary if available  
-                    if doc_data.get("summary"):
-                        content_parts.append(f"Summary: {doc_data['summary']}")
-                    
-                    content = "\n\n".join(content_parts)
-                    
-                    # Only create document if we have a meeting for it
-                    if doc_id in cache_data.meetings:
-                        meeting = cache_data.meetings[doc_id]
-                        document = MeetingDocument(
-                            id=doc_id,
-                            meeting_id=doc_id,
-                            title=meeting.title,
-                            content=content,
-                            document_type="meeting_notes",
-                            created_at=meeting.date,
-                            tags=[]
-                        )
-                        cache_data.documents[doc_id] = document
-                        
-                except Exception as e:
-                    print(f"Error extracting document content for {doc_id}: {e}")
+                        pending_documents[key] = None
+                        clock.start("parse_documents")
+                        jobs.add("document", key, raw, value)
+                        clock.stop()
+                
+                elif section == "transcripts":
+                    if previous and key in previous.transcripts and old_transcripts.get(key) == fingerprint:
+                        cache_data.transcripts[key] = previous.transcripts[key]
+                    else:
+                        clock.start("parse_transcripts")
+                        jobs.add("transcript", key, raw, value)
+                        clock.stop()
+                
+                elif not documents_done or key in pending_documents:
+                    # Keep the compact raw text until we know whether the panel is needed
+                    panels[key] = (raw, None) if raw is not None else (None, value)
+            
+            with clock.phase("parse_workers"):
+                results = jobs.finish()
+            with clock.phase("parse_transcripts"):
+                for (kind, key), fields in results.items():
+                    if kind == "transcript" and fields:
+                        cache_data.transcripts[key] = build_transcript(key, fields)
+            
+            # Extract document content, falling back to panels when the notes are empty
+            clock.start("parse_documents")
+            parts_by_document: Dict[str, DocumentParts] = {}
+            for doc_id, fields in pending_documents.items():
+                if fields is not None:
+                    if old_panels.get(doc_id) == prints["documentPanels"].get(doc_id):
+                        cache_data.documents[doc_id] = previous.documents[doc_id]
+                        continue
+                    parts = document_parts(doc_id, fields)
+                else:
+                    parts = results.get(("document", doc_id))
+                if parts is None:
+                    continue
+                parts_by_document[doc_id] = parts
+                if doc_id in panels and needs_panel(parts):
+                    jobs.add("panel", doc_id, *panels[doc_id])
+            
+            with clock.phase("parse_workers"):
+                results = jobs.finish()
+            for doc_id, parts in parts_by_document.items():
+                panel_text = results.get(("panel", doc_id)) or ""
+                document = assemble_document(doc_id, parts, panel_text, cache_data.meetings[doc_id])
+                if document:
+                    cache_data.documents[doc_id] = document
+            clock.stop()
+        finally:
+            jobs.close()
         
         cache_data.last_updated = datetime.now(zoneinfo.ZoneInfo('UTC'))
         return cache_data
     
-    def _extract_structured_notes(self, notes_data: Dict[str, Any]) -> str:
-        """Extract text content from Granola's structured notes format."""
-        try:
-            if not isinstance(notes_data, dict) or 'content' not in notes_data:
-                return ""
+    def _parse_entries_lazy(self, entries: Iterable[CacheEntry], previous: Optional[CacheData] = None,
+                            clock: Optional[PhaseClock] = None) -> CacheData:
+        """Parse meeting metadata only, leaving documents and transcripts as LazyEntry objects.
+        
+        Each entry keeps its raw JSON text (or decoded value when the cache
+        was not streamed) until a tool asks for the meeting. Entries whose
+        fingerprint is unchanged keep the previous LazyEntry, loaded or not.
+        """
+        cache_data = CacheData(documents=LazySection(), transcripts=LazySection())
+        parse_panels = self._parse_settings()["parse_panels"]
+        prints: Dict[str, Dict[str, str]] = {section: {} for section in SECTIONS}
+        cache_data.entry_fingerprints = prints
+        
+        previous_prints = previous.entry_fingerprints if previous else {}
+        old_entries = {section: entry_objects(getattr(previous, section)) if previous else {}
+                       for section in ("documents", "transcripts")}
+        
+        # Documents that may need their panel, and the panels seen so far
+        documents: Dict[str, Tuple[RawEntry, bool]] = {}
+        panels: Dict[str, RawEntry] = {}
+        clock = clock or PhaseClock()
+        
+        for section, key, value, raw in entries:
+            if section == "documentPanels" and not parse_panels:
+                continue
             
-            def extract_text_from_content(content_list):
-                text_parts = []
-                if isinstance(content_list, list):
-                    for item in content_list:
-                        if isinstance(item, dict):
-                            # Handle different content types
-                            if item.get('type') == 'paragraph' and 'content' in item:
-                                text_parts.append(extract_text_from_content(item['content']))
-                            elif item.get('type') == 'text' and 'text' in item:
-                                text_parts.append(item['text'])
-                            elif 'content' in item:
-                                text_parts.append(extract_text_from_content(item['content']))
-                return ' '.join(text_parts)
+            clock.start("fingerprint")
+            fingerprint = _fingerprint_entry(value, raw)
+            clock.stop()
+            prints[section][key] = fingerprint
+            # Keep the compact raw text rather than the decoded value when there is one
+            entry = (raw, None) if raw is not None else (None, value)
+            unchanged = previous_prints.get(section, {}).get(key) == fingerprint
             
-            return extract_text_from_content(notes_data['content'])
+            if section == "documents":
+                if unchanged and key in previous.meetings:
+                    meeting = previous.meetings[key]
+                else:
+                    clock.start("parse_meetings")
+                    meeting = parse_meeting(key, value)
+                    clock.stop()
+                if meeting is None:
+                    continue
+                cache_data.meetings[key] = meeting
+                # Panels are never consulted for documents with plain or markdown notes
+                uses_panel = not (has_text(value.get("notes_plain")) or has_text(value.get("notes_markdown")))
+                documents[key] = (entry, uses_panel)
             
-        except Exception as e:
-            print(f"Error extracting structured notes: {e}")
-            return ""
-
-    def _extract_document_panel_content(self, panel_data: Any) -> str:
-        """Extract text content from Granola's documentPanels structure."""
-        if not panel_data:
-            return ""
-
-        text_parts = []
-
-        def extract_from_node(node: Any):
-            if isinstance(node, dict):
-                node_type = node.get('type')
-
-                if node_type == 'text' and node.get('text'):
-                    text_parts.append(node['text'])
-                elif 'content' in node:
-                    extract_from_node(node['content'])
-            elif isinstance(node, list):
-                for item in node:
-                    extract_from_node(item)
-
-        try:
-            if isinstance(panel_data, dict):
-                # Panels keyed by UUID -> {content: [...]} structure
-                for panel_id in sorted(panel_data.keys()):
-                    panel = panel_data.get(panel_id)
-                    if isinstance(panel, dict):
-                        extract_from_node(panel.get('content'))
-            elif isinstance(panel_data, list):
-                for panel in panel_data:
-                    extract_from_node(panel)
-
-        except Exception as exc:
-            print(f"Error extracting panel content: {exc}")
-
-        combined = '\n\n'.join(part.strip() for part in text_parts if isinstance(part, str) and part.strip())
-        return combined.strip()
+            elif section == "transcripts":
+                old = old_entries["transcripts"].get(key)
+                if unchanged and isinstance(old, LazyEntry):
+                    cache_data.transcripts.entries[key] = old
+                else:
+                    cache_data.transcripts.entries[key] = LazyEntry("transcript", key, entry)
+            
+            else:
+                panels[key] = entry
+        
+        old_panels = previous_prints.get("documentPanels", {})
+        for key, (entry, uses_panel) in documents.items():
+            old = old_entries["documents"].get(key)
+            unchanged = previous_prints.get("documents", {}).get(key) == prints["documents"][key]
+            if (unchanged and isinstance(old, LazyEntry)
+                    and (not uses_panel or old_panels.get(key) == prints["documentPanels"].get(key))):
+                cache_data.documents.entries[key] = old
+            else:
+                cache_data.documents.entries[key] = LazyEntry(
+                    "document", key, entry, meeting=cache_data.meetings[key],
+                    panel=panels.get(key) if uses_panel else None)
+        
+        cache_data.last_updated = datetime.now(zoneinfo.ZoneInfo('UTC'))
+        return cache_data
     
-    async def _search_meetings(self, query: str, limit: int = 10) -> List[TextContent]:
-        """Search meetings by query."""
+    async def _search_meetings(self, query: str, limit: int = 10, ranking: str = "bm25",
+                               field_boosts: Optional[Dict[str, float]] = None,
+                               date_range: Optional[Dict] = None, participant: Optional[str] = None,
+                               snippets: int = DEFAULT_SNIPPETS,
+                               output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
+        """Search meetings by query.
+        
+        A participant filter keeps the scored meetings listed for that name
+        in the meeting index. Snippets are located from the index's term
+        positions and only built for results that make it into the response.
+        """
         if not self.cache_data:
             return [TextContent(type="text", text="No meeting data available")]
         
-        query_lower = query.lower()
-        results = []
+        try:
+            bounds = self._date_range_bounds(date_range)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Invalid date_range: {e}")]
+        if participant is not None and not isinstance(participant, str):
+            return [TextContent(type="text", text=f"Invalid participant: expected a name, got {type(participant).__name__}")]
         
-        for meeting_id, meeting in self.cache_data.meetings.items():
-            score = 0
-            
-            # Search in title
-            if query_lower in meeting.title.lower():
-                score += 2
-            
-            # Search in participants
-            for participant in meeting.participants:
-                if query_lower in participant.lower():
-                    score += 1
-            
-            # Search in transcript content if available
-            if meeting_id in self.cache_data.transcripts:
-                transcript = self.cache_data.transcripts[meeting_id]
-                if query_lower in transcript.content.lower():
-                    score += 1
-            
-            if score > 0:
-                results.append((score, meeting))
+        # Scoring runs in a worker thread so concurrent sessions are not held up behind it
+        search_index = await self._search_index()
+        if ranking == "legacy":
+            # Title matches score 2, each matching participant 1, a transcript match 1
+            scores = await asyncio.to_thread(search_index.legacy_scores, query)
+        elif ranking == "bm25":
+            try:
+                scores = await asyncio.to_thread(search_index.bm25_scores, query, field_boosts)
+            except ValueError as e:
+                return [TextContent(type="text", text=f"Invalid field_boosts: {e}")]
+        else:
+            return [TextContent(type="text", text=f"Unknown ranking mode: {ranking}")]
+        
+        if participant:
+            attended = self.snapshot.meeting_index.meetings_with(participant)
+            scores = {meeting_id: scores[meeting_id] for meeting_id in attended if meeting_id in scores}
         
-        # Sort by relevance and limit results
-        results.sort(key=lambda x: x[0], reverse=True)
-        results = results[:limit]
+        if bounds:
+            in_range = set(self.snapshot.meeting_index.meeting_ids_between(*bounds))
+            scores = {meeting_id: score for meeting_id, score in scores.items() if meeting_id in in_range}
+        
+        # Select the top results by relevance (most recent first on ties)
+        meetings = self.cache_data.meetings
+        results = heapq.nlargest(
+            limit,
+            ((score, meetings[meeting_id]) for meeting_id, score in scores.items() if meeting_id in meetings),
+            key=lambda x: (x[0], x[1].date)
+        )
         
         if not results:
             return [TextContent(type="text", text=f"No meetings found matching '{query}'")]
         
-        output_lines = [f"Found {len(results)} meeting(s) matching '{query}':\n"]
-        
+        # Results are added while they fit max_chars; the rest are only counted
+        fields = output.selected(DEFAULT_SEARCH_FIELDS)
+        budget = output.budget()
+        entries = []
         for score, meeting in results:
-            output_lines.append(f"• **{meeting.title}** ({meeting.id})")
-            output_lines.append(f"  Date: {self._format_local_time(meeting.date)}")
-            if meeting.participants:
-                output_lines.append(f"  Participants: {', '.join(meeting.participants)}")
+            entry = {"title": meeting.title}
+            if "id" in fields:
+                entry["id"] = meeting.id
+            if "date" in fields:
+                entry["date"] = self._convert_to_local_time(meeting.date)
+            if "participants" in fields:
+                entry["participants"] = meeting.participants
+            if "score" in fields:
+                entry["score"] = round(score, 4)
+            if "snippets" in fields and snippets > 0:
+                entry["snippets"] = self._search_snippets(meeting.id, query, min(snippets, MAX_SNIPPETS))
+            if output.is_json:
+                if "snippets" in entry:
+                    entry["snippets"] = [snippet.payload() for snippet in entry["snippets"]]
+                rendered = render_json(entry)
+            else:
+                rendered = "\n".join(self._search_result_lines(entry))
+            if not budget.fits(len(rendered)):
+                break
+            entries.append(rendered)
+        omitted = len(results) - len(entries)
+        
+        if output.is_json:
+            return [TextContent(type="text", text=f'{{"query":{render_json(query)},"results":[{",".join(entries)}],'
+                                                  f'"omitted":{omitted}}}')]
+        
+        shown = f" (showing {len(entries)})" if omitted else ""
+        output_lines = [f"Found {len(results)} meeting(s) matching '{query}'{shown}:\n"]
+        for rendered in entries:
+            output_lines.append(rendered)
+            output_lines.append("")
+        if omitted:
+            output_lines.append(f"*{omitted} more result(s) omitted to stay within max_chars*")
+        
+        return [TextContent(type="text", text="\n".join(output_lines))]
+    
+    async def _search_index(self) -> SearchIndex:
+        """Search index of the current snapshot; a lazy load's gains notes and transcripts on first use."""
+        snapshot = self.snapshot
+        if not snapshot.search_index.full_text:
+            async with self._search_lock:
+                if not snapshot.search_index.full_text:
+                    started = time.perf_counter()
+                    snapshot.search_index = await asyncio.to_thread(SearchIndex.build, snapshot.cache_data)
+                    self.stats.record_phase("index_search_full_text", time.perf_counter() - started)
+        return snapshot.search_index
+    
+    def _search_result_lines(self, entry: Dict[str, Any]) -> List[str]:
+        """Markdown lines of one search result."""
+        lines = [f"• **{entry['title']}** ({entry['id']})" if "id" in entry else f"• **{entry['title']}**"]
+        if "date" in entry:
+            lines.append(f"  Date: {self._format_local_time(entry['date'])}")
+        if "score" in entry:
+            lines.append(f"  Score: {entry['score']}")
+        if entry.get("participants"):
+            lines.append(f"  Participants: {', '.join(entry['participants'])}")
+        for snippet in entry.get("snippets") or entry.get("passages") or []:
+            if snippet.segments:
+                where = f"transcript segments {snippet.segments[0]}-{snippet.segments[1] - 1}"
+            else:
+                where = f"notes document {snippet.unit + 1}" if snippet.field == "notes" else snippet.field
+            lines.append(f"  > {snippet.markdown()} _({where}, offset {snippet.start})_")
+        return lines
+    
+    def _search_snippets(self, meeting_id: str, query: str, limit: int) -> List[Snippet]:
+        """Highlighted excerpts of a search hit; transcript ones know the segments they cover."""
+        transcript = self.cache_data.transcripts.get(meeting_id)
+        units = {
+            "notes": [self.cache_data.documents[doc_id].content
+                      for doc_id in self.snapshot.meeting_index.documents_for(meeting_id)],
+            "transcript": [transcript.content] if transcript else [],
+        }
+        snippets = find_snippets(self.snapshot.search_index, meeting_id, query, units, limit)
+        for snippet in snippets:
+            if transcript is not None:
+                snippet.segments = snippet_segments(snippet, transcript.segments)
+        return snippets
+    
+    async def _semantic_search(self, query: str, limit: int = 10, date_range: Optional[Dict] = None,
+                               passages: int = DEFAULT_PASSAGES,
+                               output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
+        """Rank meetings by embedding similarity of their notes and transcript chunks to the query."""
+        if not self.cache_data:
+            return [TextContent(type="text", text="No meeting data available")]
+        
+        try:
+            bounds = self._date_range_bounds(date_range)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Invalid date_range: {e}")]
+        
+        semantic_index = await self._semantic_index()
+        query_vector = (await asyncio.to_thread(embed_texts, self.embedder, [query]))[0]
+        if not query_vector.any():
+            return [TextContent(type="text", text=f"No meetings found related to '{query}'")]
+        
+        passages = min(max(passages, 0), MAX_PASSAGES)
+        fields = output.selected(DEFAULT_SEMANTIC_FIELDS)
+        results = await asyncio.to_thread(semantic_index.top_meetings, query_vector, limit,
+                                          passages if "passages" in fields else 0, *(bounds or (None, None)))
+        meetings = self.cache_data.meetings
+        results = [result for result in results if result[0] in meetings]
+        
+        if not results:
+            return [TextContent(type="text", text=f"No meetings found related to '{query}'")]
+        
+        # Results are added while they fit max_chars; the rest are only counted
+        budget = output.budget()
+        entries = []
+        for meeting_id, score, rows in results:
+            meeting = meetings[meeting_id]
+            entry: Dict[str, Any] = {"title": meeting.title}
+            if "id" in fields:
+                entry["id"] = meeting.id
+            if "date" in fields:
+                entry["date"] = self._convert_to_local_time(meeting.date)
+            if "participants" in fields:
+                entry["participants"] = meeting.participants
+            if "score" in fields:
+                entry["score"] = round(score, 4)
+            if rows:
+                entry["passages"] = [semantic_index.passage(row, row_score, self.cache_data,
+                                                            self.snapshot.meeting_index, query_vector,
+                                                            self.embedder, PASSAGE_CHARS)
+                                     for row, row_score in rows]
+            if output.is_json:
+                if "passages" in entry:
+                    entry["passages"] = [passage.payload() for passage in entry["passages"]]
+                rendered = render_json(entry)
+            else:
+                rendered = "\n".join(self._search_result_lines(entry))
+            if not budget.fits(len(rendered)):
+                break
+            entries.append(rendered)
+        omitted = len(results) - len(entries)
+        
+        if output.is_json:
+            return [TextContent(type="text", text=f'{{"query":{render_json(query)},"results":[{",".join(entries)}],'
+                                                  f'"omitted":{omitted}}}')]
+        
+        shown = f" (showing {len(entries)})" if omitted else ""
+        output_lines = [f"Found {len(results)} meeting(s) related to '{query}'{shown}:\n"]
+        for rendered in entries:
+            output_lines.append(rendered)
             output_lines.append("")
+        if omitted:
+            output_lines.append(f"*{omitted} more result(s) omitted to stay within max_chars*")
         
         return [TextContent(type="text", text="\n".join(output_lines))]
     
-    async def _get_meeting_details(self, meeting_id: str) -> List[TextContent]:
+    async def _semantic_index(self) -> SemanticIndex:
+        """Semantic index of the current snapshot, embedded in a worker thread on first use.
+        
+        Builds run one at a time, each starting from the last index built (or
+        the stored one), so only meetings whose text changed are embedded.
+        """
+        snapshot = self.snapshot
+        async with self._semantic_lock:
+            if snapshot.semantic_index is None:
+                started = time.perf_counter()
+                snapshot.semantic_index = await asyncio.to_thread(
+                    self._build_semantic_index, snapshot, self._semantic_base)
+                self.stats.record_phase("index_semantic", time.perf_counter() - started)
+                self._semantic_base = (snapshot.cache_data, snapshot.semantic_index)
+        return snapshot.semantic_index
+    
+    def _build_semantic_index(self, snapshot: CacheSnapshot,
+                              base: Optional[Tuple[CacheData, SemanticIndex]]) -> SemanticIndex:
+        """Blocking; runs in a worker thread."""
+        path = self.store.semantic_path if self.store else None
+        if base is not None:
+            previous, changed = base[1], changed_meeting_ids(base[0], snapshot.cache_data)
+        else:
+            previous, changed = SemanticIndex.load(path, self.embedder) if path else None, None
+        return SemanticIndex.build(snapshot.cache_data, snapshot.meeting_index, self.embedder, path,
+                                   previous, changed, self.semantic_ann_min_chunks)
+    
+    async def _get_meeting_details(self, meeting_id: str,
+                                   output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
         """Get detailed meeting information."""
         if not self.cache_data or meeting_id not in self.cache_data.meetings:
             return [TextContent(type="text", text=f"Meeting '{meeting_id}' not found")]
         
         meeting = self.cache_data.meetings[meeting_id]
+        details = self._meeting_details(meeting_id, output.selected(DETAIL_FIELDS))
         
-        details = [
-            f"# Meeting Details: {meeting.title}\n",
-            f"**ID:** {meeting.id}",
-            f"**Date:** {self._format_local_time(meeting.date)}",
-        ]
+        if output.is_json:
+            return [TextContent(type="text", text=render_json({"title": meeting.title, **details}))]
         
-        if meeting.duration:
-            details.append(f"**Duration:** {meeting.duration} minutes")
+        lines = [f"# Meeting Details: {meeting.title}\n"]
+        lines.extend(self._meeting_detail_lines(details))
         
-        if meeting.participants:
-            details.append(f"**Participants:** {', '.join(meeting.participants)}")
+        return [TextContent(type="text", text="\n".join(lines))]
+    
+    def _meeting_details(self, meeting_id: str, fields: Iterable[str] = DETAIL_FIELDS) -> Dict[str, Any]:
+        """Selected detail fields of a meeting, in DETAIL_FIELDS order."""
+        meeting = self.cache_data.meetings[meeting_id]
+        values = {
+            "id": lambda: meeting.id,
+            "date": lambda: self._convert_to_local_time(meeting.date),
+            "duration": lambda: meeting.duration,
+            "participants": lambda: meeting.participants,
+            "type": lambda: meeting.meeting_type,
+            "platform": lambda: meeting.platform,
+            "documents": lambda: len(self.snapshot.meeting_index.documents_for(meeting_id)),
+            "transcript": lambda: meeting_id in self.cache_data.transcripts,
+        }
+        return {field: values[field]() for field in DETAIL_FIELDS if field in fields}
+    
+    def _meeting_detail_lines(self, details: Dict[str, Any]) -> List[str]:
+        """Markdown fields describing a meeting, without a heading."""
+        lines = []
+        
+        if "id" in details:
+            lines.append(f"**ID:** {details['id']}")
+        
+        if "date" in details:
+            lines.append(f"**Date:** {self._format_local_time(details['date'])}")
+        
+        if details.get("duration"):
+            lines.append(f"**Duration:** {details['duration']} minutes")
         
-        if meeting.meeting_type:
-            details.append(f"**Type:** {meeting.meeting_type}")
+        if details.get("participants"):
+            lines.append(f"**Participants:** {', '.join(details['participants'])}")
         
-        if meeting.platform:
-            details.append(f"**Platform:** {meeting.platform}")
+        if details.get("type"):
+            lines.append(f"**Type:** {details['type']}")
+        
+        if details.get("platform"):
+            lines.append(f"**Platform:** {details['platform']}")
         
         # Add document count
-        doc_count = sum(1 for doc in self.cache_data.documents.values() 
-                       if doc.meeting_id == meeting_id)
-        if doc_count > 0:
-            details.append(f"**Documents:** {doc_count}")
+        if details.get("documents"):
+            lines.append(f"**Documents:** {details['documents']}")
         
         # Add transcript availability
-        if meeting_id in self.cache_data.transcripts:
-            details.append("**Transcript:** Available")
+        if details.get("transcript"):
+            lines.append("**Transcript:** Available")
         
-        return [TextContent(type="text", text="\n".join(details))]
+        return lines
     
-    async def _get_meeting_transcript(self, meeting_id: str) -> List[TextContent]:
-        """Get meeting transcript."""
+    async def _get_meeting_transcript(self, meeting_id: str, offset: int = 0, max_chars: Optional[int] = None,
+                                      start_segment: Optional[int] = None, end_segment: Optional[int] = None,
+                                      start_time: Any = None, end_time: Any = None,
+                                      cursor: Optional[str] = None,
+                                      output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
+        """Get meeting transcript, or one window/page of it.
+        
+        The window is a character range of the joined transcript text, so
+        each call only copies the text it returns.
+        """
         if not self.cache_data:
             return [TextContent(type="text", text="No meeting data available")]
         
-        if meeting_id not in self.cache_data.transcripts:
+        # A lazily parsed transcript may turn out empty only when it is looked up
+        transcript = self.cache_data.transcripts.get(meeting_id)
+        if transcript is None:
             return [TextContent(type="text", text=f"No transcript available for meeting '{meeting_id}'")]
         
-        transcript = self.cache_data.transcripts[meeting_id]
         meeting = self.cache_data.meetings.get(meeting_id)
+        title = meeting.title if meeting else meeting_id
+        
+        try:
+            page = self._transcript_page(transcript, offset, max_chars, start_segment, end_segment,
+                                         start_time, end_time, cursor)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Invalid transcript window: {e}")]
+        
+        fields = output.selected(TRANSCRIPT_FIELDS)
+        if output.is_json:
+            payload = {"meeting_id": meeting_id, "title": title}
+            payload.update(self._transcript_payload(transcript, page, fields))
+            return [TextContent(type="text", text=render_json(payload))]
         
-        output = [f"# Transcript: {meeting.title if meeting else meeting_id}\n"]
+        lines = [f"# Transcript: {title}\n"]
+        lines.extend(self._transcript_lines(transcript, page, fields))
         
-        if transcript.speakers:
-            output.append(f"**Speakers:** {', '.join(transcript.speakers)}")
+        return [TextContent(type="text", text="\n".join(lines))]
+    
+    def _transcript_page(self, transcript: MeetingTranscript, offset: int = 0, max_chars: Optional[int] = None,
+                         start_segment: Optional[int] = None, end_segment: Optional[int] = None,
+                         start_time: Any = None, end_time: Any = None,
+                         cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Locate one page of a transcript; raises ValueError for a bad window or cursor.
+        
+        Returns the page's character range (``start``/``end``) and the
+        continuation cursor if more of the window remains.
+        """
+        segments = transcript.segments
+        text = segments.text
         
-        if transcript.language:
-            output.append(f"**Language:** {transcript.language}")
+        if max_chars is not None and (not isinstance(max_chars, int) or max_chars < 1):
+            raise ValueError(f"max_chars must be an integer of at least 1, got {max_chars!r}")
         
-        if transcript.confidence:
-            output.append(f"**Confidence:** {transcript.confidence:.2%}")
+        if cursor:
+            page_start, window_end = self._parse_transcript_cursor(cursor, segments)
+        else:
+            window_start, window_end = self._transcript_window(
+                segments, start_segment, end_segment, start_time, end_time)
+            page_start = window_start + max(offset, 0)
         
-        output.append("\n## Transcript Content\n")
-        output.append(transcript.content)
+        window_end = min(window_end, len(text))
+        page_start = min(page_start, window_end)
+        page_end = window_end
+        if max_chars is not None and page_start + max_chars < window_end:
+            page_end = self._transcript_break(text, page_start, page_start + max_chars)
         
-        return [TextContent(type="text", text="\n".join(output))]
+        # The next page skips the space the page was broken at
+        next_start = page_end + 1 if page_end < window_end and text[page_end] == " " else page_end
+        next_cursor = (f"{self.snapshot.version}:{len(segments)}:{next_start}:{window_end}"
+                       if next_start < window_end else None)
+        return {"start": page_start, "end": page_end, "next_cursor": next_cursor}
     
-    async def _get_meeting_documents(self, meeting_id: str) -> List[TextContent]:
+    def _transcript_lines(self, transcript: MeetingTranscript, page: Dict[str, Any],
+                          fields: Iterable[str] = TRANSCRIPT_FIELDS) -> List[str]:
+        """Markdown lines for a page located by _transcript_page."""
+        segments = transcript.segments
+        text = segments.text
+        page_start, page_end = page["start"], page["end"]
+        lines = []
+        
+        if transcript.speakers and "speakers" in fields:
+            lines.append(f"**Speakers:** {', '.join(transcript.speakers)}")
+        
+        if transcript.language and "language" in fields:
+            lines.append(f"**Language:** {transcript.language}")
+        
+        if transcript.confidence and "confidence" in fields:
+            lines.append(f"**Confidence:** {transcript.confidence:.2%}")
+        
+        if "content" in fields:
+            if page_start == 0 and page_end == len(text):
+                lines.append("\n## Transcript Content\n")
+            else:
+                first = segments.segment_at(page_start)
+                last = segments.segment_at(max(page_end - 1, page_start))
+                lines.append(f"\n## Transcript Content (characters {page_start}-{page_end} of {len(text)}, "
+                             f"segments {first}-{last} of {len(segments)})\n")
+            lines.append(text[page_start:page_end])
+            
+            if page["next_cursor"]:
+                lines.append(f"\n**More available:** call again with `cursor` set to `{page['next_cursor']}`")
+        
+        return lines
+    
+    def _transcript_payload(self, transcript: MeetingTranscript, page: Dict[str, Any],
+                            fields: Iterable[str] = TRANSCRIPT_FIELDS) -> Dict[str, Any]:
+        """JSON fields for a page located by _transcript_page."""
+        payload: Dict[str, Any] = {}
+        if "speakers" in fields:
+            payload["speakers"] = transcript.speakers
+        if "language" in fields:
+            payload["language"] = transcript.language
+        if "confidence" in fields:
+            payload["confidence"] = transcript.confidence
+        if "content" in fields:
+            segments = transcript.segments
+            page_start, page_end = page["start"], page["end"]
+            payload["range"] = {
+                "start": page_start,
+                "end": page_end,
+                "length": len(segments.text),
+                "first_segment": segments.segment_at(page_start),
+                "last_segment": segments.segment_at(max(page_end - 1, page_start)),
+                "segments": len(segments),
+            }
+            payload["content"] = segments.text[page_start:page_end]
+            payload["next_cursor"] = page["next_cursor"]
+        return payload
+    
+    def _parse_transcript_cursor(self, cursor: str, segments: TranscriptSegments) -> Tuple[int, int]:
+        """Return the (page start, window end) of a continuation cursor issued for these segments.
+        
+        A cursor is ``version:segment count:page start:window end``; one
+        from an earlier snapshot or another transcript is rejected rather
+        than resumed at offsets that may no longer line up.
+        """
+        try:
+            version, count, start, end = (int(part) for part in cursor.split(":"))
+        except ValueError:
+            raise ValueError(f"unrecognised cursor '{cursor}'") from None
+        if (version != self.snapshot.version or count != len(segments)
+                or not 0 <= start <= end <= len(segments.text)):
+            raise ValueError(f"unrecognised cursor '{cursor}'")
+        return start, end
+    
+    def _transcript_window(self, segments: TranscriptSegments, start_segment: Optional[int],
+                           end_segment: Optional[int], start_time: Any, end_time: Any) -> Tuple[int, int]:
+        """Character range of the transcript selected by segment and time bounds."""
+        first, stop = 0, len(segments)
+        if start_segment is not None:
+            first = max(first, start_segment)
+        if end_segment is not None:
+            stop = min(stop, end_segment)
+        
+        if start_time is not None or end_time is not None:
+            base = next((t for t in segments.start_times if t == t), None)
+            lower = self._transcript_time(start_time, base, -math.inf)
+            upper = self._transcript_time(end_time, base, math.inf)
+            time_first, time_stop = segments.time_range(lower, upper)
+            first, stop = max(first, time_first), min(stop, time_stop)
+        
+        if first >= stop:
+            return 0, 0
+        return segments.span(first)[0], segments.span(stop - 1)[1]
+    
+    @staticmethod
+    def _transcript_time(value: Any, base: Optional[float], default: float) -> float:
+        """Epoch seconds for a window bound given as an offset in seconds or an ISO timestamp."""
+        if value is None:
+            return default
+        if isinstance(value, str):
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        if isinstance(value, (int, float)):
+            if base is None:
+                raise ValueError("this transcript has no segment timings")
+            return base + value
+        seconds = timestamp_seconds(value)
+        if seconds != seconds:
+            raise ValueError(f"cannot parse time '{value}'")
+        return seconds
+    
+    @staticmethod
+    def _transcript_break(text: Union[str, ArenaText], start: int, limit: int) -> int:
+        """End a page at the last whitespace before ``limit`` so words are not split."""
+        cut = text[start + 1:limit + 1].rfind(" ")
+        return start + 1 + cut if cut >= 0 else limit
+    
+    async def _get_meeting_documents(self, meeting_id: str,
+                                     output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
         """Get meeting documents."""
         if not self.cache_data:
             return [TextContent(type="text", text="No meeting data available")]
         
-        documents = [doc for doc in self.cache_data.documents.values() 
-                    if doc.meeting_id == meeting_id]
+        documents = [self.cache_data.documents[doc_id]
+                     for doc_id in self.snapshot.meeting_index.documents_for(meeting_id)]
         
         if not documents:
             return [TextContent(type="text", text=f"No documents found for meeting '{meeting_id}'")]
         
         meeting = self.cache_data.meetings.get(meeting_id)
-        output = [f"# Documents: {meeting.title if meeting else meeting_id}\n"]
-        output.append(f"Found {len(documents)} document(s):\n")
+        title = meeting.title if meeting else meeting_id
+        fields = output.selected(DEFAULT_DOCUMENT_FIELDS)
+        # Document contents share max_chars in order; later ones get what is left
+        budget = output.budget()
+        entries = [self._document_entry(doc, fields, budget) for doc in documents]
         
-        for doc in documents:
-            output.append(f"## {doc.title}")
-            output.append(f"**Type:** {doc.document_type}")
-            output.append(f"**Created:** {self._format_local_time(doc.created_at)}")
+        if output.is_json:
+            return [TextContent(type="text", text=render_json(
+                {"meeting_id": meeting_id, "title": title, "documents": entries}))]
+        
+        lines = [f"# Documents: {title}\n"]
+        lines.append(f"Found {len(documents)} document(s):\n")
+        
+        for entry in entries:
+            lines.append(f"## {entry['title']}")
+            if "id" in entry:
+                lines.append(f"**ID:** {entry['id']}")
+            if "type" in entry:
+                lines.append(f"**Type:** {entry['type']}")
+            if "created" in entry:
+                lines.append(f"**Created:** {self._format_local_time(entry['created'])}")
             
-            if doc.tags:
-                output.append(f"**Tags:** {', '.join(doc.tags)}")
+            if entry.get("tags"):
+                lines.append(f"**Tags:** {', '.join(entry['tags'])}")
             
-            output.append(f"\n{doc.content}\n")
-            output.append("---\n")
+            if "content" in entry:
+                lines.append(f"\n{entry['content']}\n")
+                if entry["truncated"]:
+                    lines.append(f"*… truncated ({entry['truncated']} more characters) to stay within max_chars*\n")
+            lines.append("---\n")
         
-        return [TextContent(type="text", text="\n".join(output))]
+        return [TextContent(type="text", text="\n".join(lines))]
     
-    async def _analyze_meeting_patterns(self, pattern_type: str, date_range: Optional[Dict] = None) -> List[TextContent]:
-        """Analyze patterns across meetings."""
+    def _document_entry(self, doc: MeetingDocument, fields: Iterable[str], budget: TextBudget) -> Dict[str, Any]:
+        """Selected fields of a document; ``truncated`` counts content characters cut by the budget."""
+        entry: Dict[str, Any] = {"title": doc.title}
+        if "id" in fields:
+            entry["id"] = doc.id
+        if "type" in fields:
+            entry["type"] = doc.document_type
+        if "created" in fields:
+            entry["created"] = self._convert_to_local_time(doc.created_at)
+        if "tags" in fields:
+            entry["tags"] = doc.tags
+        if "content" in fields:
+            content = budget.take(doc.body)
+            entry["content"] = content
+            entry["truncated"] = len(doc.body) - len(content)
+        return entry
+    
+    async def _get_meetings_batch(self, meeting_ids: List[str], fields: Optional[List[str]] = None,
+                                  max_chars_per_item: int = DEFAULT_BATCH_ITEM_CHARS,
+                                  output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
+        """Get several meetings in one response, each limited to a text budget.
+        
+        Notes, then the transcript, then previews draw on the same per-meeting
+        budget; whatever does not fit is cut at a word boundary and points at
+        the single-meeting tool (or transcript cursor) for the rest.
+        """
         if not self.cache_data:
             return [TextContent(type="text", text="No meeting data available")]
         
-        meetings = list(self.cache_data.meetings.values())
+        fields = fields or DEFAULT_BATCH_FIELDS
+        unknown = [field for field in fields if field not in BATCH_FIELDS]
+        if unknown:
+            return [TextContent(type="text", text=f"Unknown fields: {', '.join(unknown)} "
+                                                  f"(expected {', '.join(BATCH_FIELDS)})")]
+        meeting_ids = list(dict.fromkeys(meeting_ids))
+        if len(meeting_ids) > MAX_BATCH_MEETINGS:
+            return [TextContent(type="text", text=f"Too many meetings: {len(meeting_ids)} "
+                                                  f"(at most {MAX_BATCH_MEETINGS} per call)")]
         
-        # Filter by date range if provided
-        if date_range:
-            start_date_str = date_range.get("start_date", "1900-01-01")
-            end_date_str = date_range.get("end_date", "2100-01-01")
-            
-            # Parse dates and ensure timezone-aware
-            naive_start = datetime.fromisoformat(start_date_str)
-            naive_end = datetime.fromisoformat(end_date_str)
-            
-            # Localize naive datetimes to UTC
-            if naive_start.tzinfo is None:
-                start_date = naive_start.replace(tzinfo=zoneinfo.ZoneInfo('UTC'))
+        items = [self._batch_item(meeting_id, fields, max(max_chars_per_item, 0)) for meeting_id in meeting_ids]
+        
+        if output.is_json:
+            return [TextContent(type="text", text=render_json(
+                {"meetings": [self._batch_item_payload(item) for item in items]}))]
+        
+        lines = [f"# Meetings ({len(meeting_ids)} requested)\n"]
+        for item in items:
+            lines.extend(self._batch_item_lines(item))
+            lines.append("---\n")
+        
+        return [TextContent(type="text", text="\n".join(lines))]
+    
+    def _batch_item(self, meeting_id: str, fields: List[str], budget: int) -> Dict[str, Any]:
+        """Collect one get_meetings_batch entry within its character budget.
+        
+        ``transcript`` holds the page located by _transcript_page (None if the
+        meeting has none); each preview records whether it was cut short.
+        """
+        meeting = self.cache_data.meetings.get(meeting_id)
+        if meeting is None:
+            return {"id": meeting_id, "found": False}
+        
+        item: Dict[str, Any] = {"id": meeting_id, "title": meeting.title, "found": True}
+        if "metadata" in fields:
+            item["metadata"] = self._meeting_details(meeting_id)
+        
+        documents = [self.cache_data.documents[doc_id]
+                     for doc_id in self.snapshot.meeting_index.documents_for(meeting_id)]
+        transcript = self.cache_data.transcripts.get(meeting_id)
+        item_budget = TextBudget(budget)
+        
+        if "notes" in fields:
+            item["notes"] = [self._document_entry(doc, ("type", "content"), item_budget) for doc in documents]
+        
+        if "transcript" in fields:
+            if transcript is None:
+                item["transcript"] = None
+            elif item_budget.remaining:
+                page = self._transcript_page(transcript, max_chars=item_budget.remaining)
+                item_budget.take(transcript.segments.text[page["start"]:page["end"]])
+                item["transcript"] = page
             else:
-                start_date = naive_start
-                
-            if naive_end.tzinfo is None:
-                end_date = naive_end.replace(tzinfo=zoneinfo.ZoneInfo('UTC'))
+                item["transcript"] = {"omitted": True}
+        
+        if "preview" in fields:
+            # (start of the text, full length): only the start of each body is read
+            previews = {}
+            if documents and "notes" not in fields:
+                previews["notes"] = (" ".join(doc.body[:PREVIEW_CHARS + 1] for doc in documents),
+                                     sum(len(doc.body) for doc in documents) + len(documents) - 1)
+            if transcript is not None and "transcript" not in fields:
+                text = transcript.segments.text
+                previews["transcript"] = (text[:PREVIEW_CHARS + 1], len(text))
+            item["preview"] = {}
+            for key, (text, length) in previews.items():
+                preview = item_budget.take(clip(text, PREVIEW_CHARS))
+                item["preview"][key] = {"text": preview, "truncated": len(preview) < length}
+        return item
+    
+    def _batch_item_payload(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """JSON form of a collected batch entry."""
+        page = item.get("transcript")
+        if page and "omitted" not in page:
+            transcript = self.cache_data.transcripts[item["id"]]
+            item = {**item, "transcript": self._transcript_payload(transcript, page, ("content",))}
+        return item
+    
+    def _batch_item_lines(self, item: Dict[str, Any]) -> List[str]:
+        """Markdown lines of a collected batch entry."""
+        meeting_id = item["id"]
+        if not item["found"]:
+            return [f"## {meeting_id}\n", f"Meeting '{meeting_id}' not found\n"]
+        
+        lines = [f"## {item['title']} ({meeting_id})\n"]
+        if "metadata" in item:
+            lines.extend(self._meeting_detail_lines(item["metadata"]))
+        
+        if "notes" in item:
+            lines.append("\n### Notes\n")
+            if not item["notes"]:
+                lines.append("No documents found")
+            for entry in item["notes"]:
+                lines.append(f"**{entry['title']}** ({entry['type']})\n")
+                lines.append(entry["content"])
+                if entry["truncated"]:
+                    lines.append(f"*… truncated ({entry['truncated']} more characters); "
+                                 f"use get_meeting_documents for the full notes*")
+        
+        if "transcript" in item:
+            lines.append("\n### Transcript\n")
+            page = item["transcript"]
+            if page is None:
+                lines.append("No transcript available")
+            elif "omitted" in page:
+                lines.append("*Omitted: no budget left; use get_meeting_transcript*")
             else:
-                end_date = naive_end
-                
-            meetings = [m for m in meetings if start_date <= m.date <= end_date]
+                lines.extend(self._transcript_lines(self.cache_data.transcripts[meeting_id], page))
+        
+        for key, label in (("notes", "Notes preview"), ("transcript", "Transcript preview")):
+            preview = item.get("preview", {}).get(key)
+            if preview is not None:
+                ellipsis = "…" if preview["truncated"] else ""
+                lines.append(f"**{label}:** {preview['text']}{ellipsis}")
+        
+        lines.append("")
+        return lines
+    
+    async def _analyze_meeting_patterns(self, pattern_type: str, date_range: Optional[Dict] = None,
+                                        output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
+        """Analyze patterns across meetings."""
+        if not self.cache_data:
+            return [TextContent(type="text", text="No meeting data available")]
+        
+        # Counts come from per-day rollups, merged over the date range if one is given
+        try:
+            bounds = self._date_range_bounds(date_range)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Invalid date_range: {e}")]
+        if pattern_type == "content_topics":
+            return await self._analyze_content_topics(*(bounds or (None, None)), output=output)
+        summary = self.snapshot.meeting_index.summary(self.cache_data.meetings, *(bounds or (None, None)))
         
         if pattern_type == "participants":
-            return await self._analyze_participant_patterns(meetings)
+            return await self._analyze_participant_patterns(summary, output)
         elif pattern_type == "frequency":
-            return await self._analyze_frequency_patterns(meetings)
+            return await self._analyze_frequency_patterns(summary, output)
         elif pattern_type == "topics":
-            return await self._analyze_topic_patterns(meetings)
+            return await self._analyze_topic_patterns(summary, output)
         else:
             return [TextContent(type="text", text=f"Unknown pattern type: {pattern_type}")]
     
-    async def _analyze_participant_patterns(self, meetings: List[MeetingMetadata]) -> List[TextContent]:
-        """Analyze participant patterns."""
-        participant_counts = {}
+    @staticmethod
+    def _date_range_bounds(date_range: Optional[Dict]) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """Inclusive UTC epoch-second bounds of a ``date_range`` argument, or None for no filter.
+        
+        Naive values are taken as UTC; a date-only end_date covers that whole day.
+        """
+        if not date_range:
+            return None
+        if not isinstance(date_range, dict):
+            raise ValueError("expected an object with start_date and/or end_date")
         
-        for meeting in meetings:
-            for participant in meeting.participants:
-                participant_counts[participant] = participant_counts.get(participant, 0) + 1
+        def bound(key: str, end: bool) -> Optional[int]:
+            value = date_range.get(key)
+            if value is None or value == "":
+                return None
+            if not isinstance(value, str):
+                raise ValueError(f"{key} must be an ISO date string like 2024-01-31, got {type(value).__name__}")
+            parsed = datetime.fromisoformat(value)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=zoneinfo.ZoneInfo('UTC'))
+            seconds = epoch_seconds(parsed)
+            if end and len(value) == 10:
+                seconds += 86400 - 1
+            return seconds
         
-        if not participant_counts:
+        bounds = bound("start_date", end=False), bound("end_date", end=True)
+        return bounds if bounds != (None, None) else None
+    
+    async def _analyze_participant_patterns(self, summary: RollupSummary,
+                                            output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
+        """Analyze participant patterns."""
+        if not summary.participants:
             return [TextContent(type="text", text="No participant data found")]
         
-        sorted_participants = sorted(participant_counts.items(), key=lambda x: x[1], reverse=True)
+        top_participants = heapq.nlargest(10, summary.participants.items(), key=lambda x: x[1])
+        
+        if output.is_json:
+            return [TextContent(type="text", text=render_json({
+                "pattern_type": "participants", "meetings": summary.meetings,
+                "participants": [{"name": name, "meetings": count} for name, count in top_participants]}))]
         
-        output = [
-            f"# Participant Analysis ({len(meetings)} meetings)\n",
+        lines = [
+            f"# Participant Analysis ({summary.meetings} meetings)\n",
             "## Most Active Participants\n"
         ]
         
-        for participant, count in sorted_participants[:10]:
-            output.append(f"• **{participant}:** {count} meetings")
+        for participant, count in top_participants:
+            lines.append(f"• **{participant}:** {count} meetings")
         
-        return [TextContent(type="text", text="\n".join(output))]
+        return [TextContent(type="text", text="\n".join(lines))]
     
-    async def _analyze_frequency_patterns(self, meetings: List[MeetingMetadata]) -> List[TextContent]:
+    async def _analyze_frequency_patterns(self, summary: RollupSummary,
+                                          output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
         """Analyze meeting frequency patterns."""
-        if not meetings:
+        if not summary.meetings:
             return [TextContent(type="text", text="No meetings found for analysis")]
         
-        # Group by month
-        monthly_counts = {}
-        for meeting in meetings:
-            month_key = meeting.date.strftime("%Y-%m")
-            monthly_counts[month_key] = monthly_counts.get(month_key, 0) + 1
+        # Grouped by month
+        monthly_counts = {month: count for month, count in summary.months.items() if count}
+        avg_per_month = summary.meetings / len(monthly_counts) if monthly_counts else 0
         
-        output = [
-            f"# Meeting Frequency Analysis ({len(meetings)} meetings)\n",
+        if output.is_json:
+            return [TextContent(type="text", text=render_json({
+                "pattern_type": "frequency", "meetings": summary.meetings,
+                "months": [{"month": month, "meetings": count} for month, count in sorted(monthly_counts.items())],
+                "average_per_month": round(avg_per_month, 2)}))]
+        
+        lines = [
+            f"# Meeting Frequency Analysis ({summary.meetings} meetings)\n",
             "## Meetings by Month\n"
         ]
         
         for month, count in sorted(monthly_counts.items()):
-            output.append(f"• **{month}:** {count} meetings")
+            lines.append(f"• **{month}:** {count} meetings")
         
-        avg_per_month = len(meetings) / len(monthly_counts) if monthly_counts else 0
-        output.append(f"\n**Average per month:** {avg_per_month:.1f}")
+        lines.append(f"\n**Average per month:** {avg_per_month:.1f}")
         
-        return [TextContent(type="text", text="\n".join(output))]
+        return [TextContent(type="text", text="\n".join(lines))]
     
-    async def _analyze_topic_patterns(self, meetings: List[MeetingMetadata]) -> List[TextContent]:
+    async def _analyze_topic_patterns(self, summary: RollupSummary,
+                                      output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
         """Analyze topic patterns from meeting titles."""
-        if not meetings:
+        if not summary.meetings:
             return [TextContent(type="text", text="No meetings found for analysis")]
         
-        # Simple keyword extraction from titles
-        word_counts = {}
-        for meeting in meetings:
-            words = meeting.title.lower().split()
-            for word in words:
-                # Filter out common words
-                if len(word) > 3 and word not in ['meeting', 'call', 'sync', 'with']:
-                    word_counts[word] = word_counts.get(word, 0) + 1
-        
-        if not word_counts:
+        # Keywords from titles, common words filtered out when the rollups were built
+        if not summary.topics:
             return [TextContent(type="text", text="No significant topics found in meeting titles")]
         
-        sorted_topics = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
+        top_topics = heapq.nlargest(15, summary.topics.items(), key=lambda x: x[1])
         
-        output = [
-            f"# Topic Analysis ({len(meetings)} meetings)\n",
+        if output.is_json:
+            return [TextContent(type="text", text=render_json({
+                "pattern_type": "topics", "meetings": summary.meetings,
+                "topics": [{"topic": topic, "mentions": count} for topic, count in top_topics]}))]
+        
+        lines = [
+            f"# Topic Analysis ({summary.meetings} meetings)\n",
             "## Most Common Topics (from titles)\n"
         ]
         
-        for topic, count in sorted_topics[:15]:
-            output.append(f"• **{topic}:** {count} mentions")
+        for topic, count in top_topics:
+            lines.append(f"• **{topic}:** {count} mentions")
+        
+        return [TextContent(type="text", text="\n".join(lines))]
+    
+    async def _topic_index(self) -> TopicIndex:
+        """TF-IDF index of the current snapshot, built in a worker thread on first use."""
+        snapshot = self.snapshot
+        async with self._topic_lock:
+            if snapshot.topic_index is None:
+                started = time.perf_counter()
+                snapshot.topic_index = await asyncio.to_thread(
+                    TopicIndex.build, snapshot.cache_data, snapshot.meeting_index)
+                self.stats.record_phase("index_topics", time.perf_counter() - started)
+        return snapshot.topic_index
+    
+    async def _analyze_content_topics(self, start: Optional[int], end: Optional[int],
+                                      output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
+        """Analyze salient terms of notes and transcripts by TF-IDF."""
+        topic_index = await self._topic_index()
+        low, high = topic_index.rows_between(start, end)
+        if low == high:
+            return [TextContent(type="text", text="No meetings found for analysis")]
+        
+        top_terms = topic_index.top_terms(start, end, limit=15)
+        if not top_terms:
+            return [TextContent(type="text", text="No significant topics found in notes or transcripts")]
+        
+        if output.is_json:
+            return [TextContent(type="text", text=render_json({
+                "pattern_type": "content_topics", "meetings": high - low,
+                "terms": [{"term": term, "salience": round(score, 4), "meetings": meetings}
+                          for term, score, meetings in top_terms]}))]
+        
+        lines = [
+            f"# Content Topic Analysis ({high - low} meetings)\n",
+            "## Most Salient Terms (TF-IDF over notes and transcripts)\n"
+        ]
+        
+        for term, score, meetings in top_terms:
+            lines.append(f"• **{term}:** salience {score:.2f} across {meetings} meetings")
         
-        return [TextContent(type="text", text="\n".join(output))]
+        return [TextContent(type="text", text="\n".join(lines))]
     
-    def run(self, transport_type: str = "stdio"):
-        """Run the server."""
+    async def _server_stats(self, output: OutputOptions = DEFAULT_OUTPUT) -> List[TextContent]:
+        """Report load phase timings, tool latencies, cache sizes and memory use."""
+        snapshot = self.snapshot
+        # Walking the indexes is linear in their size, so keep it off the event loop
+        sizes = await asyncio.to_thread(snapshot_sizes, snapshot) if snapshot else None
+        stats = {
+            "uptime_seconds": time.time() - self.stats.started,
+            "loading": self._load_task is not None,
+            "snapshot": {"version": snapshot.version, "loaded_at": snapshot.loaded_at} if snapshot else None,
+            "reloads": asdict(self.reload_stats),
+            "phases": {phase: asdict(timing) for phase, timing in self.stats.ordered_phases().items()},
+            "tools": {name: histogram.summary() for name, histogram in sorted(self.stats.tools.items())},
+            "response_cache": dict(asdict(self.response_cache.stats), enabled=self.response_cache.enabled),
+            "sizes": sizes,
+            "memory": dict(process_memory(), arena_bytes=self.arena.size if self.arena else None),
+        }
+        
+        if output.is_json:
+            return [TextContent(type="text", text=render_json(stats))]
+        
+        reloads = self.reload_stats
+        lines = ["# Server Stats\n",
+                 f"**Uptime:** {stats['uptime_seconds']:.0f}s"]
+        if snapshot:
+            lines.append(f"**Snapshot:** version {snapshot.version}, loaded {self._format_local_time(snapshot.loaded_at)}")
+        if stats["loading"]:
+            lines.append("**Loading:** a load is in progress")
+        lines.append(f"**Loads:** {reloads.loads} ({reloads.reloads} reloads, {reloads.store_hits} from the snapshot store, "
+                     f"{reloads.failures} failed); last {reloads.last_seconds:.2f}s, max {reloads.max_seconds:.2f}s")
+        if reloads.last_error:
+            lines.append(f"**Last load error:** {reloads.last_error}")
+        
+        if self.stats.phases:
+            lines.append("\n## Load Phases (seconds)\n")
+            for phase, timing in self.stats.ordered_phases().items():
+                lines.append(f"• **{phase}:** last {timing.last_seconds:.3f}, max {timing.max_seconds:.3f}, "
+                             f"total {timing.total_seconds:.3f} over {timing.count}")
+        
+        if stats["tools"]:
+            lines.append("\n## Tool Latency (ms)\n")
+            for name, summary in stats["tools"].items():
+                lines.append(f"• **{name}:** {summary['count']} calls ({summary['cached']} cached, "
+                             f"{summary['errors']} errors); p50 {summary['p50_ms']:.1f}, p95 {summary['p95_ms']:.1f}, "
+                             f"p99 {summary['p99_ms']:.1f}, max {summary['max_ms']:.1f}")
+        
+        cache = stats["response_cache"]
+        lines.append("\n## Response Cache\n")
+        lines.append(f"• **Entries:** {cache['entries']} ({cache['chars']:,} chars)" +
+                     ("" if cache["enabled"] else " (disabled)"))
+        lines.append(f"• **Hits / misses:** {cache['hits']} / {cache['misses']}; "
+                     f"{cache['evictions']} evicted, {cache['invalidations']} invalidated")
+        
+        if sizes:
+            lines.append("\n## Cache Sizes\n")
+            for section in ("documents", "transcripts"):
+                loaded = sizes.get(f"{section}_loaded")
+                count = f"{sizes[section]:,}" + (f" ({loaded:,} parsed)" if loaded is not None else "")
+                lines.append(f"• **{section.capitalize()}:** {count}")
+            lines.append(f"• **Meetings:** {sizes['meetings']:,}")
+            lines.append(f"• **Text in memory:** {sizes['text_chars']:,} chars")
+            lines.append(f"• **Search index:** {sizes['search_terms']:,} terms, "
+                         f"~{sizes['search_index_bytes'] / 1e6:.1f} MB of postings")
+            for name, label in (("topic_index_bytes", "Topic index"), ("semantic_index_bytes", "Semantic index")):
+                if sizes[name] is not None:
+                    lines.append(f"• **{label}:** ~{sizes[name] / 1e6:.1f} MB")
+        
+        memory = stats["memory"]
+        lines.append("\n## Memory\n")
+        for key, label in (("rss_mb", "Resident"), ("peak_rss_mb", "Peak resident")):
+            if memory[key] is not None:
+                lines.append(f"• **{label}:** {memory[key]:.0f} MB")
+        if memory["arena_bytes"] is not None:
+            lines.append(f"• **Text arena:** {memory['arena_bytes'] / 1e6:.1f} MB on disk")
+        
+        return [TextContent(type="text", text="\n".join(lines))]
+    
+    def _initialization_options(self) -> InitializationOptions:
+        from mcp.types import ServerCapabilities
+        
+        return InitializationOptions(
+            server_name="granola-mcp-server",
+            server_version="0.1.0",
+            # Empty dict indicates tool support is available
+            capabilities=ServerCapabilities(tools={})
+        )
+    
+    def run(self, transport_type: str = "stdio", host: Optional[str] = None, port: Optional[int] = None,
+            socket_path: Optional[str] = None):
+        """Run the server.
+        
+        ``stdio`` serves the client that spawned the process. ``http``
+        (streamable HTTP at /mcp) and ``sse`` (at /sse) serve any number of
+        clients from this process, on ``socket_path`` (a Unix socket) or
+        ``host``:``port``, defaulting to GRANOLA_HTTP_SOCKET, GRANOLA_HTTP_HOST
+        and GRANOLA_HTTP_PORT.
+        """
         import asyncio
         from mcp.server.stdio import stdio_server
-        from mcp.types import ServerCapabilities
         
         if transport_type == "stdio":
             async def main():
-                # Set up server capabilities for tool support
-                capabilities = ServerCapabilities(
-                    tools={}  # Empty dict indicates tool support is available
-                )
-                
-                options = InitializationOptions(
-                    server_name="granola-mcp-server",
-                    server_version="0.1.0",
-                    capabilities=capabilities
-                )
+                # Start loading right away so the first tool call finds the cache ready
+                self._preload()
                 
                 async with stdio_server() as (read_stream, write_stream):
-                    await self.server.run(read_stream, write_stream, options)
+                    await self.server.run(read_stream, write_stream, self._initialization_options())
             
             return asyncio.run(main())
+        
+        # Imported here so stdio works on mcp releases without the HTTP session manager
+        from .http_transport import DEFAULT_HOST, DEFAULT_PORT, TRANSPORTS, serve_http
+        
+        if transport_type in TRANSPORTS:
+            return asyncio.run(serve_http(
+                self, transport_type,
+                host=host or os.getenv("GRANOLA_HTTP_HOST", DEFAULT_HOST),
+                port=port or int(os.getenv("GRANOLA_HTTP_PORT", str(DEFAULT_PORT))),
+                socket_path=socket_path or os.getenv("GRANOLA_HTTP_SOCKET") or None,
+            ))
         else:
-            raise ValueError(f"Unsupported transport type: {transport_type}. Only 'stdio' is supported.")
-
+            raise ValueError(f"Unsupported transport type: {transport_type}. "
+                             f"Use 'stdio', {', '.join(repr(t) for t in TRANSPORTS)}.")
 
 def main():
     """Main entry point for the server."""
@@ -749,7 +1986,7 @@ def main():
     try:
         server = GranolaMCPServer()
         print(f"Initialized server, cache path: {server.cache_path}", file=sys.stderr)
-        server.run()
+        server.run(os.getenv("GRANOLA_TRANSPORT", "stdio"))
     except Exception as e:
         print(f"Error starting server: {e}", file=sys.stderr)
         import traceback
@@ -0,0 +1,102 @@
+"""Cache snapshot bookkeeping for hot reloads of the Granola cache file."""
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Set
+
+from .lazy import entry_objects
+from .meeting_index import MeetingIndex
+from .models import CacheData
+from .search_index import SearchIndex
+from .semantic_index import SemanticIndex
+from .topic_index import TopicIndex
+
+
+@dataclass(frozen=True)
+class SourceFingerprint:
+    """Cheap identity of the cache file on disk (no content read)."""
+    mtime_ns: int
+    size: int
+    inode: int
+
+    @classmethod
+    def from_path(cls, path: str) -> Optional["SourceFingerprint"]:
+        """Stat the file, returning None when it does not exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return cls(mtime_ns=st.st_mtime_ns, size=st.st_size, inode=st.st_ino)
+
+
+@dataclass
+class CacheSnapshot:
+    """A parsed cache together with the file version it was built from.
+
+    Snapshots are never mutated after being installed on the server; a reload
+    builds a new snapshot and swaps the reference in one assignment. The only
+    exceptions are ``topic_index`` and ``semantic_index``, which are derived
+    from the other fields and built on first use, and a metadata-only
+    ``search_index`` of a lazy load, replaced by a full-text one on the
+    first search.
+    """
+    cache_data: CacheData
+    search_index: SearchIndex
+    meeting_index: MeetingIndex
+    fingerprint: Optional[SourceFingerprint]
+    version: int
+    loaded_at: datetime
+    topic_index: Optional[TopicIndex] = None
+    semantic_index: Optional[SemanticIndex] = None
+
+
+def changed_meeting_ids(previous: CacheData, current: CacheData) -> Set[str]:
+    """Meetings added, removed or modified between two parses.
+
+    Incremental parsing carries unchanged models (or lazy entries) over by
+    reference, so any meeting whose metadata, document or transcript object
+    differs changed.
+    """
+    changed: Set[str] = set()
+    for section in ("meetings", "documents", "transcripts"):
+        old, new = entry_objects(getattr(previous, section)), entry_objects(getattr(current, section))
+        for key in old.keys() | new.keys():
+            before, after = old.get(key), new.get(key)
+            if before is after:
+                continue
+            if section == "documents":
+                # Documents are keyed by their own ID; report the owning meeting
+                changed.update(doc.meeting_id for doc in (before, after) if doc is not None)
+            else:
+                changed.add(key)
+    return changed
+
+
+@dataclass
+class ReloadStats:
+    """Counters describing cache (re)load activity."""
+    loads: int = 0
+    reloads: int = 0
+    store_hits: int = 0
+    failures: int = 0
+    last_seconds: float = 0.0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_error: Optional[str] = field(default=None)
+
+    def record(self, seconds: float, initial: bool, from_store: bool = False):
+        """Record a successful load that took ``seconds``."""
+        self.loads += 1
+        if not initial:
+            self.reloads += 1
+        if from_store:
+            self.store_hits += 1
+        self.last_seconds = seconds
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def record_failure(self, error: Exception):
+        """Record a load attempt that raised ``error``."""
+        self.failures += 1
+        self.last_error = str(error)
@@ -0,0 +1,194 @@
+"""Highlighted search snippets, located through the index's stored term positions.
+
+The search index already knows at which token positions a query matched,
+so choosing the densest windows needs no text at all. Only the chosen
+windows are then mapped back to characters, by scanning the field text
+up to the last token they need.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import TranscriptSegments
+from .search_index import TOKEN_RE, SearchIndex, next_unit_base, parse_query
+
+# Fields snippets are taken from, in order of preference on equal density
+SNIPPET_FIELDS = ("transcript", "notes")
+
+# Matches within this many tokens of a window's first match share its snippet
+SNIPPET_SPAN = 20
+
+# Tokens of context shown before the first and after the last match
+SNIPPET_CONTEXT = 8
+
+
+@dataclass
+class Snippet:
+    """An excerpt of a meeting's notes or transcript around query matches.
+
+    ``start``/``end`` are character offsets into the source text: the
+    joined transcript, or note document number ``unit``.
+    ``highlights`` are the matched character ranges within ``text``.
+    """
+    field: str
+    unit: int
+    start: int
+    end: int
+    text: str
+    highlights: List[Tuple[int, int]] = field(default_factory=list)
+    leading: bool = False  # the source continues before ``start``
+    trailing: bool = False  # the source continues after ``end``
+    matches: int = 0
+    segments: Optional[Tuple[int, int]] = None  # transcript segments [first, stop) covered
+
+    def payload(self) -> Dict[str, Any]:
+        """JSON fields of the snippet."""
+        payload: Dict[str, Any] = {"field": self.field, "text": self.text, "highlights": self.highlights,
+                                   "offset": self.start, "end": self.end}
+        if self.field == "notes":
+            payload["document"] = self.unit
+        if self.segments:
+            payload["start_segment"], payload["end_segment"] = self.segments
+        return payload
+
+    def markdown(self) -> str:
+        """The excerpt on one line with matches in bold."""
+        pieces = ["…" if self.leading else ""]
+        cursor = 0
+        for start, end in self.highlights:
+            pieces.append(self.text[cursor:start])
+            pieces.append(f"**{self.text[start:end]}**")
+            cursor = end
+        pieces.append(self.text[cursor:])
+        pieces.append("…" if self.trailing else "")
+        return " ".join("".join(pieces).split())
+
+
+def choose_windows(hits: List[Tuple[int, int]], limit: int) -> List[Tuple[int, int, List[Tuple[int, int]]]]:
+    """Pick up to ``limit`` token windows around the densest clusters of hits.
+
+    ``hits`` are sorted (position, length) pairs. Returns (first token,
+    last token, hits inside) per window, densest cluster first; windows
+    never share a hit.
+    """
+    hits = list(hits)
+    windows = []
+    while hits and len(windows) < limit:
+        starts = [position for position, _ in hits]
+        best, best_count = 0, 0
+        for i, position in enumerate(starts):
+            count = bisect_left(starts, position + SNIPPET_SPAN, i) - i
+            if count > best_count:
+                best, best_count = i, count
+        cluster = hits[best:best + best_count]
+        first = max(cluster[0][0] - SNIPPET_CONTEXT, 0)
+        last = max(position + length - 1 for position, length in cluster) + SNIPPET_CONTEXT
+        # Hits that fall in the context are highlighted too, and not reused
+        windows.append((first, last, [hit for hit in hits if first <= hit[0] <= last]))
+        hits = [hit for hit in hits if not first <= hit[0] <= last]
+    return windows
+
+
+def _token_spans(units: List[str], wanted: List[Tuple[int, int]]) -> Dict[int, Tuple[int, int, int]]:
+    """Map token positions inside the ``wanted`` ranges to (unit, char start, char end).
+
+    Unit bases follow the search index layout; scanning stops after the
+    last wanted position.
+    """
+    wanted = _merge(wanted)
+    limit = wanted[-1][1]
+    spans: Dict[int, Tuple[int, int, int]] = {}
+    base = 0
+    for unit_number, unit in enumerate(units):
+        # Tokens are found the way the index found them, on the lowercased text
+        text = unit.lower()
+        count = 0
+        for count, match in enumerate(TOKEN_RE.finditer(text), 1):
+            position = base + count - 1
+            if position > limit:
+                return spans
+            i = bisect_left(wanted, (position + 1,)) - 1
+            if i >= 0 and wanted[i][0] <= position <= wanted[i][1]:
+                spans[position] = (unit_number, match.start(), match.end())
+        base = next_unit_base(base, count)
+        if base > limit:
+            break
+    return spans
+
+
+def _merge(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sorted union of overlapping ranges."""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def field_snippets(index: SearchIndex, meeting_id: str, field_name: str, units: List[str],
+                   terms: List[str], phrases: List[List[str]], limit: int) -> List[Snippet]:
+    """Snippets of one field of a meeting."""
+    hits = index.match_positions(field_name, meeting_id, terms, phrases)
+    if not hits or not units:
+        return []
+    windows = choose_windows(hits, limit)
+    spans = _token_spans(units, [(first, last) for first, last, _ in windows])
+
+    snippets = []
+    for first, last, inside in windows:
+        anchor = spans.get(inside[0][0])
+        if anchor is None:
+            continue
+        unit_number = anchor[0]
+        # Context stops at the edges of the unit the first match is in
+        covered = [spans[p] for p in range(first, last + 1)
+                   if p in spans and spans[p][0] == unit_number]
+        start, end = covered[0][1], covered[-1][2]
+        source = units[unit_number]
+        text = source if len(source) == len(source.lower()) else source.lower()
+
+        excerpt = text[start:end]
+        highlights: List[Tuple[int, int]] = []
+        for position, length in inside:
+            head, tail = spans.get(position), spans.get(position + length - 1)
+            if head and tail and head[0] == tail[0] == unit_number:
+                highlights.append((head[1] - start, tail[2] - start))
+        # Adjacent matches ("pricing review") highlight as one range
+        joined: List[Tuple[int, int]] = []
+        for low, high in _merge(highlights):
+            if joined and not excerpt[joined[-1][1]:low].strip():
+                joined[-1] = (joined[-1][0], high)
+            else:
+                joined.append((low, high))
+        snippets.append(Snippet(field=field_name, unit=unit_number, start=start, end=end,
+                                text=excerpt, highlights=joined,
+                                leading=start > 0, trailing=end < len(text), matches=len(inside)))
+    return snippets
+
+
+def find_snippets(index: SearchIndex, meeting_id: str, query: str, units_by_field: Dict[str, List[str]],
+                  limit: int = 2) -> List[Snippet]:
+    """The ``limit`` densest snippets of a meeting across notes and transcript."""
+    if limit <= 0:
+        return []
+    terms, phrases = parse_query(query)
+    if not terms and not phrases:
+        return []
+
+    candidates = []
+    for order, field_name in enumerate(SNIPPET_FIELDS):
+        for snippet in field_snippets(index, meeting_id, field_name, units_by_field.get(field_name, []),
+                                      terms, phrases, limit):
+            candidates.append((-snippet.matches, order, snippet.start, snippet))
+    candidates.sort(key=lambda candidate: candidate[:3])
+    return [snippet for *_, snippet in candidates[:limit]]
+
+
+def snippet_segments(snippet: Snippet, segments: TranscriptSegments) -> Optional[Tuple[int, int]]:
+    """Transcript segments [first, stop) covered by a transcript snippet."""
+    if snippet.field != "transcript" or not len(segments):
+        return None
+    return segments.segment_at(snippet.start), segments.segment_at(max(snippet.end - 1, snippet.start)) + 1
@@ -0,0 +1,226 @@
+"""Timings, latency histograms and size estimates reported by the server_stats tool.
+
+A load is timed with a PhaseClock handed down through the reader and the
+parser. Phases nest: a phase started while another is running pauses it,
+so each phase's time excludes the phases inside it (decoding an entry
+does not count the file reads it triggers), and time spent outside any
+phase is reported as ``other``. Tool latencies go into fixed log-spaced
+buckets, which keeps recording O(1) and the memory use constant.
+"""
+
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+# Phases of a load, in the order they run
+LOAD_PHASES = ("store_load", "read", "outer_decode", "inner_decode", "fingerprint", "parse_meetings",
+               "parse_transcripts", "parse_documents", "parse_workers", "index_build", "arena_store",
+               "store_save", "other")
+
+# Upper bounds of the latency buckets in milliseconds; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class PhaseClock:
+    """Exclusive wall time per phase of one load; not thread-safe."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self._stack: List[str] = []
+        self._mark = 0.0
+
+    def start(self, phase: str):
+        now = time.perf_counter()
+        if self._stack:
+            self._charge(now)
+        self._stack.append(phase)
+        self._mark = now
+
+    def stop(self):
+        now = time.perf_counter()
+        self._charge(now)
+        self._stack.pop()
+        self._mark = now
+
+    def _charge(self, now: float):
+        phase = self._stack[-1]
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + now - self._mark
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+
+@dataclass
+class PhaseStats:
+    """Time spent in one phase over all loads (or first-use index builds)."""
+    count: int = 0
+    last_seconds: float = 0.0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.last_seconds = seconds
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+class LatencyHistogram:
+    """Call latencies of one tool, counted per LATENCY_BUCKETS_MS bucket."""
+
+    def __init__(self):
+        self.buckets = array('Q', bytes(8 * (len(LATENCY_BUCKETS_MS) + 1)))
+        self.count = 0
+        self.errors = 0
+        self.cached = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float, error: bool = False, cached: bool = False):
+        ms = seconds * 1e3
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.errors += error
+        self.cached += cached
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the ``fraction`` quantile, capped at the maximum seen."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        bounds = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "cached": self.cached,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": {bound: count for bound, count in zip(bounds, self.buckets) if count},
+        }
+
+
+class ServerStats:
+    """Phase timings and per-tool latencies since the server started."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.phases: Dict[str, PhaseStats] = {}
+        self.tools: Dict[str, LatencyHistogram] = {}
+
+    def record_phase(self, phase: str, seconds: float):
+        self.phases.setdefault(phase, PhaseStats()).record(seconds)
+
+    def record_load(self, clock: PhaseClock, seconds: float):
+        """Record the phases of a load that took ``seconds`` in total."""
+        for phase, spent in clock.seconds.items():
+            self.record_phase(phase, spent)
+        self.record_phase("other", max(0.0, seconds - sum(clock.seconds.values())))
+
+    def record_tool(self, name: str, seconds: float, error: bool = False, cached: bool = False):
+        self.tools.setdefault(name, LatencyHistogram()).record(seconds, error, cached)
+
+    def ordered_phases(self) -> Dict[str, PhaseStats]:
+        """Phases in LOAD_PHASES order, followed by first-use index builds."""
+        order = {phase: i for i, phase in enumerate(LOAD_PHASES)}
+        return dict(sorted(self.phases.items(), key=lambda item: (order.get(item[0], len(order)), item[0])))
+
+
+def _nbytes(value: Any) -> int:
+    """Buffer size of a numpy or ``array`` array, 0 for anything else."""
+    if value is None:
+        return 0
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, array):
+        return value.itemsize * len(value)
+    return 0
+
+
+def _text_chars(body: Any) -> int:
+    """Characters of a body held in memory (none for arena-backed text)."""
+    return len(body) if isinstance(body, str) else 0
+
+
+def process_memory() -> Dict[str, Optional[float]]:
+    """Current and peak resident memory of this process in MB, where the platform reports them."""
+    current = peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024) / 1e6
+    except ImportError:
+        pass
+    return {"rss_mb": current, "peak_rss_mb": peak}
+
+
+def snapshot_sizes(snapshot) -> Dict[str, Any]:
+    """Entry counts and estimated bytes of a snapshot's models and indexes.
+
+    Index sizes count the array buffers only; text counts characters of
+    bodies held as strings (a lazy load only has those of the meetings
+    viewed so far, an arena none).
+    """
+    from .lazy import LazySection
+
+    cache_data = snapshot.cache_data
+    sizes: Dict[str, Any] = {"meetings": len(cache_data.meetings)}
+    text_chars = 0
+    for section in ("documents", "transcripts"):
+        models = getattr(cache_data, section)
+        if isinstance(models, LazySection):
+            sizes[section] = len(models.entries)
+            loaded = [entry.model for entry in models.entries.values() if entry.source is None]
+            sizes[f"{section}_loaded"] = len(loaded)
+            models = [model for model in loaded if model is not None]
+        else:
+            sizes[section] = len(models)
+            models = models.values()
+        if section == "documents":
+            text_chars += sum(_text_chars(document.body) for document in models)
+        else:
+            text_chars += sum(_text_chars(transcript.segments.text) for transcript in models)
+    sizes["text_chars"] = text_chars
+
+    search_index = snapshot.search_index
+    postings = [p for terms in search_index.postings.values() for p in terms.values()]
+    sizes["search_terms"] = len(postings)
+    sizes["search_index_bytes"] = (sum(_nbytes(p.docs) + _nbytes(p.freqs) + _nbytes(p.positions) for p in postings)
+                                   + sum(_nbytes(lengths) for lengths in search_index.field_lengths.values()))
+    topic_index = snapshot.topic_index
+    sizes["topic_index_bytes"] = (sum(_nbytes(getattr(topic_index, name))
+                                      for name in ("epochs", "indptr", "indices", "weights"))
+                                  if topic_index is not None else None)
+    semantic_index = snapshot.semantic_index
+    sizes["semantic_index_bytes"] = (sum(_nbytes(getattr(semantic_index, name))
+                                         for name in ("vectors", "row_starts", "chunks", "epochs",
+                                                      "centroids", "assignment"))
+                                     if semantic_index is not None else None)
+    return sizes
@@ -0,0 +1,98 @@
+"""Persistent on-disk store of parsed cache snapshots.
+
+Parsing ``cache-v3.json`` and building the search index is the bulk of
+start-up time. The store keeps the derived data in a pickle next to other
+per-user caches, keyed by the source file's fingerprint, so a fresh process
+can skip parsing entirely when Granola has not written since.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from . import __version__
+from .models import CacheData
+from .search_index import SearchIndex
+from .snapshot import SourceFingerprint
+
+# Bump whenever parsing or index structures change shape
+STORE_VERSION = 7
+
+
+def default_store_dir() -> str:
+    """Directory used for stored snapshots unless configured otherwise."""
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "granola-mcp-server")
+
+
+class SnapshotStore:
+    """Reads and writes derived snapshots for one source cache file.
+
+    The file holds two consecutive pickles: a small header used to decide
+    whether the snapshot is current, and the payload itself. Only files this
+    server wrote under the user's own cache directory are ever unpickled.
+    """
+
+    def __init__(self, directory: str, source_path: str):
+        self.directory = Path(directory)
+        source_key = hashlib.blake2b(os.path.abspath(source_path).encode('utf-8'), digest_size=8).hexdigest()
+        self.path = self.directory / f"snapshot-{source_key}.pickle"
+        # Base name of the semantic index metadata and vector files
+        self.semantic_path = self.directory / f"semantic-{source_key}"
+        # Prefix of text arena files
+        self.arena_prefix = f"arena-{source_key}"
+
+    def _header(self, fingerprint: SourceFingerprint, settings: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "store_version": STORE_VERSION,
+            "package_version": __version__,
+            "fingerprint": asdict(fingerprint),
+            "settings": settings,
+        }
+
+    def load(self, fingerprint: SourceFingerprint,
+             settings: Dict[str, Any]) -> Optional[Tuple[CacheData, SearchIndex]]:
+        """Return the stored snapshot if it was built from this exact source file."""
+        try:
+            with open(self.path, 'rb') as f:
+                header = pickle.load(f)
+                if header != self._header(fingerprint, settings):
+                    return None
+                cache_data, search_index = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading stored snapshot {self.path}: {e}", file=sys.stderr)
+            return None
+        return cache_data, search_index
+
+    def save(self, fingerprint: SourceFingerprint, settings: Dict[str, Any],
+             cache_data: CacheData, search_index: SearchIndex):
+        """Write a snapshot atomically, replacing any previous one."""
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".snapshot-", suffix=".tmp")
+            try:
+                with os.fdopen(handle, 'wb') as f:
+                    pickle.dump(self._header(fingerprint, settings), f, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump((cache_data, search_index), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except Exception as e:
+            print(f"Error writing stored snapshot {self.path}: {e}", file=sys.stderr)
+
+    def remove_stale_arenas(self, keep: Optional[str]):
+        """Delete text arenas of this source other than ``keep``; open maps of them stay readable."""
+        for path in self.directory.glob(f"{self.arena_prefix}-*.arena"):
+            if str(path) != keep:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    print(f"Error removing text arena {path}: {e}", file=sys.stderr)
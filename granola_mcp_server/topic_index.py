@@ -0,0 +1,135 @@
+"""TF-IDF term salience over meeting notes and transcripts.
+
+Each meeting is one row of a sparse term-document matrix stored in CSR
+form (``indptr``/``indices``/``weights`` NumPy arrays). Rows follow the
+meeting index timeline, so the meetings of a date range are a contiguous
+block of rows and salience over that range is a single weighted
+``bincount`` over a slice of the arrays.
+"""
+
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .lazy import peek
+from .meeting_index import MeetingIndex
+from .models import CacheData
+from .search_index import tokenize
+
+# Common English and conversational words that never make a topic
+STOPWORDS = frozenset("""
+    about above actually after again against all also although always among and another any anyone anything
+    are around because been before being below between both but can cannot could did does doing done down
+    during each either else enough even ever every everyone everything few first for from further get gets
+    getting going gonna got had has have having her here hers herself him himself his how however into its
+    itself just kind know last let like likely look looking lot lots made make makes making many maybe mean
+    might more most much must myself need needs never next not nothing now off okay once one only onto other
+    others our ours ourselves out over own part pretty put quite rather really right said same say saying
+    says see seems she should since some someone something sort still such sure take than thank thanks that
+    the their theirs them themselves then there these they thing things think this those though through
+    thus today together too two under until upon very want wanted wants was way well were what whatever when
+    where whether which while who whom whose why will with within without would yeah yes yet you your yours
+    yourself yourselves
+""".split())
+
+# Terms must occur in at least this many meetings once the corpus is large enough
+MIN_DOCUMENT_FREQUENCY = 2
+MIN_DF_CORPUS = 20
+
+# Terms found in more than this share of meetings are too common to be topics
+MAX_DOCUMENT_RATIO = 0.8
+
+
+def content_terms(text: str) -> List[str]:
+    """Unigrams and bigrams of a text, skipping stopwords, short words and numbers."""
+    tokens = tokenize(text)
+    keep = [len(token) > 2 and token not in STOPWORDS and not token.isdigit() for token in tokens]
+    terms = [token for token, kept in zip(tokens, keep) if kept]
+    terms += [f"{first} {second}" for first, second, k1, k2 in zip(tokens, tokens[1:], keep, keep[1:])
+              if k1 and k2]
+    return terms
+
+
+class TopicIndex:
+    """Sublinear TF-IDF weights of notes and transcript terms, one L2-normalised row per meeting."""
+
+    def __init__(self, terms: List[str], epochs: np.ndarray, indptr: np.ndarray,
+                 indices: np.ndarray, weights: np.ndarray):
+        self.terms = terms
+        self.epochs = epochs  # row -> meeting epoch seconds, ascending
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+    @classmethod
+    def build(cls, cache_data: CacheData, meeting_index: MeetingIndex) -> "TopicIndex":
+        vocabulary: Dict[str, int] = {}
+        indptr = array('q', [0])
+        indices = array('i')
+        counts = array('i')
+        for meeting_id in meeting_index.ids_by_date:
+            # Lazily loaded bodies are parsed for the occasion and not kept
+            documents = (peek(cache_data.documents, doc_id) for doc_id in meeting_index.documents_for(meeting_id))
+            texts = [document.content for document in documents if document is not None]
+            transcript = peek(cache_data.transcripts, meeting_id)
+            if transcript is not None:
+                texts.append(transcript.content)
+            term_counts = Counter()
+            for text in texts:
+                term_counts.update(content_terms(text))
+            indices.extend(vocabulary.setdefault(term, len(vocabulary)) for term in term_counts)
+            counts.extend(term_counts.values())
+            indptr.append(len(indices))
+
+        rows = len(indptr) - 1
+        indptr_np = np.frombuffer(indptr, dtype=np.int64)
+        indices_np = np.frombuffer(indices, dtype=np.int32)
+        counts_np = np.frombuffer(counts, dtype=np.int32)
+
+        # Drop rare and ubiquitous terms, renumbering the survivors
+        frequency = np.bincount(indices_np, minlength=len(vocabulary))
+        keep = frequency <= max(MAX_DOCUMENT_RATIO * rows, 1)
+        if rows >= MIN_DF_CORPUS:
+            keep &= frequency >= MIN_DOCUMENT_FREQUENCY
+        renumber = np.cumsum(keep, dtype=np.int64) - 1
+        entry_kept = keep[indices_np]
+        row_of_entry = np.repeat(np.arange(rows, dtype=np.int64), np.diff(indptr_np))[entry_kept]
+        indices_np = renumber[indices_np[entry_kept]].astype(np.int32)
+        counts_np = counts_np[entry_kept]
+        indptr_np = np.zeros(rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_of_entry, minlength=rows), out=indptr_np[1:])
+
+        idf = np.log((rows + 1) / (frequency[keep] + 1)) + 1.0
+        weights = (1.0 + np.log(counts_np)) * idf[indices_np]
+        norms = np.sqrt(np.bincount(row_of_entry, weights=weights * weights, minlength=rows))
+        weights /= np.where(norms > 0, norms, 1.0)[row_of_entry]
+
+        all_terms = list(vocabulary)
+        terms = [all_terms[i] for i in np.flatnonzero(keep)]
+        epochs = np.frombuffer(meeting_index.epochs, dtype=np.int64).copy()
+        return cls(terms, epochs, indptr_np, indices_np, weights.astype(np.float32))
+
+    def rows_between(self, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[int, int]:
+        """Row range [low, high) of meetings dated within [start, end] epoch seconds."""
+        low = int(np.searchsorted(self.epochs, start, side='left')) if start is not None else 0
+        high = int(np.searchsorted(self.epochs, end, side='right')) if end is not None else len(self.epochs)
+        return low, high
+
+    def top_terms(self, start: Optional[int] = None, end: Optional[int] = None,
+                  limit: int = 15) -> List[Tuple[str, float, int]]:
+        """Most salient terms of a date range as (term, summed TF-IDF weight, meetings containing it)."""
+        low, high = self.rows_between(start, end)
+        first, last = self.indptr[low], self.indptr[high]
+        if first == last:
+            return []
+        indices = self.indices[first:last]
+        scores = np.bincount(indices, weights=self.weights[first:last], minlength=len(self.terms))
+        meetings = np.bincount(indices, minlength=len(self.terms))
+        limit = min(limit, int(np.count_nonzero(scores)))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(self.terms[i], float(scores[i]), int(meetings[i])) for i in top]
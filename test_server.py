@@ -2,11 +2,39 @@
 """Enhanced test script for Granola MCP Server."""
 
 import asyncio
+import contextlib
+import io
 import json
+import math
+import os
+import pickle
+import random
+import shutil
 import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from granola_mcp_server.server import GranolaMCPServer
+import numpy as np
+
+# Keep test runs from writing stored snapshots into the user's cache directory
+os.environ.setdefault("GRANOLA_SNAPSHOT", "0")
+
+from granola_mcp_server import cache_reader, meeting_index, parsing
+from granola_mcp_server import server as server_module
+from granola_mcp_server.arena import ArenaText, TextArena
+from granola_mcp_server.meeting_index import MeetingIndex
+from granola_mcp_server.models import CacheData, MeetingDocument, MeetingMetadata, TranscriptSegments
+from granola_mcp_server.rollups import title_topics
+from granola_mcp_server.semantic_index import HashingEmbedder, SemanticIndex, embed_texts, paragraph_ranges
+from granola_mcp_server.snippets import find_snippets
+from granola_mcp_server.topic_index import content_terms
+from granola_mcp_server.search_index import SearchIndex
+from granola_mcp_server.stats import LatencyHistogram, PhaseClock
+from granola_mcp_server.output import OutputOptions
+from granola_mcp_server.server import MAX_BATCH_MEETINGS, PREVIEW_CHARS, SEARCH_FIELDS, GranolaMCPServer
 
 
 async def create_test_cache_with_panels():
@@ -119,5 +147,1455 @@ async def test_server():
         Path(cache_path).unlink()
 
 
+def write_cache(path, state):
+    """Write a Granola-style nested cache file for ``state``."""
+    with open(path, "w") as handle:
+        json.dump({"cache": json.dumps({"state": state})}, handle)
+
+
+def make_meeting(title, created_at, people=None, notes=""):
+    """Build a minimal Granola document entry."""
+    return {
+        "title": title,
+        "created_at": created_at,
+        "notes_plain": notes,
+        "people": [{"name": name} for name in (people or [])],
+    }
+
+
+async def finish_reload(server):
+    """Start a reload if the cache file changed and wait until it is installed."""
+    await server._ensure_cache_loaded()
+    if server._load_task is not None:
+        await server._load_task
+
+
+async def test_hot_reload():
+    """Cache changes on disk are picked up without restarting the server."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        state = {"documents": {"m1": make_meeting("Kickoff", "2024-02-01T09:00:00Z")}}
+        write_cache(cache_path, state)
+
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._ensure_cache_loaded()
+        first = server.snapshot
+        assert set(server.cache_data.meetings) == {"m1"}
+
+        # Unchanged file: no reload
+        await server._ensure_cache_loaded()
+        assert server.snapshot is first
+        assert server.reload_stats.loads == 1
+
+        state["documents"]["m2"] = make_meeting("Follow-up", "2024-02-02T09:00:00Z")
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, first.fingerprint.mtime_ns + 1_000_000))
+
+        await finish_reload(server)
+        assert set(server.cache_data.meetings) == {"m1", "m2"}
+        assert server.snapshot.version == first.version + 1
+        assert server.reload_stats.reloads == 1
+
+        # A half-written file keeps the previous snapshot in service
+        with open(cache_path, "w") as broken:
+            broken.write('{"cache": "{\\"state\\": {')
+        await finish_reload(server)
+        assert set(server.cache_data.meetings) == {"m1", "m2"}
+        assert server.reload_stats.failures == 1
+
+        print("✅ Hot reload test passed!")
+
+    finally:
+        Path(cache_path).unlink()
+
+
+async def test_incremental_parse():
+    """Only added or modified entries are rebuilt on re-parse."""
+    server = GranolaMCPServer(cache_path="/nonexistent/cache-v3.json")
+    raw = {
+        "documents": {
+            "m1": make_meeting("Planning", "2024-03-01T09:00:00Z", notes="Roadmap"),
+            "m2": make_meeting("Retro", "2024-03-02T09:00:00Z", notes="Went well"),
+            "m3": make_meeting("Hiring", "2024-03-03T09:00:00Z", notes="Candidates"),
+        },
+        "transcripts": {
+            "m1": [{"text": "Let's plan", "source": "microphone"}],
+        },
+    }
+    first = server._parse_cache_data(raw)
+
+    raw["documents"]["m2"]["notes_plain"] = "Went better"
+    del raw["documents"]["m3"]
+    raw["documents"]["m4"] = make_meeting("Demo", "2024-03-04T09:00:00Z")
+    second = server._parse_cache_data(raw, previous=first)
+
+    assert second.meetings["m1"] is first.meetings["m1"]
+    assert second.documents["m1"] is first.documents["m1"]
+    assert second.transcripts["m1"] is first.transcripts["m1"]
+    assert second.documents["m2"] is not first.documents["m2"]
+    assert second.documents["m2"].content == "Went better"
+    assert "m3" not in second.meetings and "m3" not in second.documents
+    assert "m4" in second.meetings
+
+    print("✅ Incremental parse test passed!")
+
+
+async def test_search_index():
+    """Indexed search keeps the title/participant/transcript weighting and follows reloads."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        state = {
+            "documents": {
+                "m1": make_meeting("Pricing Review", "2024-04-01T09:00:00Z", people=["Ana Pricing"]),
+                "m2": make_meeting("Weekly Sync", "2024-04-02T09:00:00Z", people=["Bo"]),
+                "m3": make_meeting("Roadmap", "2024-04-03T09:00:00Z"),
+            },
+            "transcripts": {
+                "m2": [{"text": "we discussed the pricing review", "source": "system"}],
+            },
+        }
+        write_cache(cache_path, state)
+
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._ensure_cache_loaded()
+        index = server.snapshot.search_index
+
+        assert index.legacy_scores("pricing") == {"m1": 3, "m2": 1}
+        assert index.legacy_scores("pricing rev") == {"m1": 2, "m2": 1}
+        assert index.legacy_scores("review pricing") == {}
+
+        results = await server._search_meetings("pricing", 5)
+        assert results[0].text.index("(m1)") < results[0].text.index("(m2)")
+
+        state["documents"]["m3"]["title"] = "Pricing Roadmap"
+        del state["documents"]["m1"]
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, server.snapshot.fingerprint.mtime_ns + 1_000_000))
+        await finish_reload(server)
+
+        assert server.snapshot.search_index.legacy_scores("pricing") == {"m2": 1, "m3": 2}
+        # The previous snapshot's index is left untouched
+        assert index.legacy_scores("pricing") == {"m1": 3, "m2": 1}
+
+        print("✅ Search index test passed!")
+
+    finally:
+        Path(cache_path).unlink()
+
+
+async def test_bm25_search():
+    """BM25 ranks by term frequency, honours quoted phrases and field boosts."""
+    server = GranolaMCPServer(cache_path="/nonexistent/cache-v3.json")
+    raw = {
+        "documents": {
+            "m1": make_meeting("Weekly Sync", "2024-05-01T09:00:00Z", notes="budget budget budget planning"),
+            "m2": make_meeting("Weekly Sync", "2024-05-02T09:00:00Z", notes="planning the offsite"),
+            "m3": make_meeting("Budget", "2024-05-03T09:00:00Z"),
+        },
+        "transcripts": {
+            "m2": [{"text": "budget planning ran long"}],
+        },
+    }
+    index = SearchIndex.build(server._parse_cache_data(raw))
+
+    scores = index.bm25_scores("budget")
+    assert set(scores) == {"m1", "m2", "m3"}
+    assert scores["m1"] > scores["m2"]
+
+    assert set(index.bm25_scores('"budget planning"')) == {"m1", "m2"}
+    assert set(index.bm25_scores('"planning budget"')) == set()
+
+    title_only = index.bm25_scores("budget", {"participants": 0, "notes": 0, "transcript": 0})
+    assert set(title_only) == {"m3"}
+
+    for boosts in ({"summary": 1.0}, {"title": -1}, {"title": "3"}, {"title": True}, {"notes": float("nan")}):
+        try:
+            index.bm25_scores("budget", boosts)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"accepted field_boosts {boosts}")
+
+    print("✅ BM25 search test passed!")
+
+
+async def test_snapshot_store():
+    """A second process start loads the stored snapshot instead of re-parsing."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        with tempfile.TemporaryDirectory() as store_dir:
+            state = {"documents": {"m1": make_meeting("Budget review", "2024-06-01T09:00:00Z")}}
+            write_cache(cache_path, state)
+
+            cold = GranolaMCPServer(cache_path=cache_path, snapshot_dir=store_dir)
+            await cold._load_cache()
+            assert cold.reload_stats.store_hits == 0
+
+            warm = GranolaMCPServer(cache_path=cache_path, snapshot_dir=store_dir)
+            await warm._load_cache()
+            assert warm.reload_stats.store_hits == 1
+            assert warm.cache_data.meetings["m1"].title == "Budget review"
+            assert set(warm.snapshot.search_index.bm25_scores("budget")) == {"m1"}
+
+            # A changed source file invalidates the stored snapshot
+            state["documents"]["m1"]["title"] = "Budget review v2"
+            write_cache(cache_path, state)
+            os.utime(cache_path, ns=(1, cold.snapshot.fingerprint.mtime_ns + 1_000_000))
+            stale = GranolaMCPServer(cache_path=cache_path, snapshot_dir=store_dir)
+            await stale._load_cache()
+            assert stale.reload_stats.store_hits == 0
+            assert stale.cache_data.meetings["m1"].title == "Budget review v2"
+
+        print("✅ Snapshot store test passed!")
+
+    finally:
+        Path(cache_path).unlink()
+
+
+async def test_streaming_reader():
+    """The streaming reader yields the same entries as json.load, whatever the chunking."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        state = {
+            "documents": {"m1": make_meeting('Café "quoted" \\ 😀', "2024-05-01T09:00:00Z", ["Zoë"], "a\nb")},
+            "transcripts": {"m1": [{"text": "hello 😀", "source": "system"}]},
+            "documentPanels": {"m1": {"p": {"content": [{"type": "text", "text": "\\ud83d"}]}}},
+            "other": [1, 2.5e3, None],
+        }
+        write_cache(cache_path, state)
+        expected = list(cache_reader.iter_dict_entries(state))
+
+        original = cache_reader.CHUNK_SIZE
+        try:
+            for size in (1, 5, 7, 64):
+                cache_reader.CHUNK_SIZE = size
+                streamed = [entry[:3] for entry in cache_reader.iter_cache_entries(cache_path)]
+                assert streamed == [entry[:3] for entry in expected], size
+        finally:
+            cache_reader.CHUNK_SIZE = original
+
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._load_cache()
+        assert server.cache_data.meetings["m1"].participants == ["Zoë"]
+
+        # Files without the nested layout fall back to json.load
+        with open(cache_path, "w") as flat:
+            json.dump(state, flat)
+        await server._load_cache()
+        assert server.cache_data.meetings["m1"].title.startswith("Café")
+
+        print("✅ Streaming reader test passed!")
+
+    finally:
+        Path(cache_path).unlink()
+
+
+async def test_background_load():
+    """Loads run off the event loop and concurrent callers share one load."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        write_cache(cache_path, {"documents": {"m1": make_meeting("Standup", "2024-07-01T09:00:00Z")}})
+        server = GranolaMCPServer(cache_path=cache_path)
+
+        parse = server._read_and_parse
+        def slow_parse(previous, clock=None):
+            time.sleep(0.3)
+            return parse(previous, clock)
+        server._read_and_parse = slow_parse
+
+        # A short wait reports "loading" instead of blocking
+        assert not await server._ensure_cache_loaded(timeout=0.05)
+        assert "still loading" in server._loading_message()
+
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while server.snapshot is None:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        results = await asyncio.gather(*(server._ensure_cache_loaded() for _ in range(5)), ticker())
+        assert all(results[:5])
+        assert ticks > 5, "event loop was blocked during the load"
+        assert server.reload_stats.loads == 1
+        assert set(server.cache_data.meetings) == {"m1"}
+
+        print("✅ Background load test passed!")
+
+    finally:
+        Path(cache_path).unlink()
+
+
+async def test_reload_in_background():
+    """Tool calls during a reload are answered from the previous snapshot without waiting."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        state = {"documents": {"m1": make_meeting("Standup", "2024-07-01T09:00:00Z")}}
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path, snapshot_dir=tempfile.mkdtemp())
+        await server._ensure_cache_loaded()
+
+        build = server._build_snapshot_data
+        def slow_build(*args):
+            time.sleep(0.5)
+            return build(*args)
+        server._build_snapshot_data = slow_build
+
+        state["documents"]["m1"]["title"] = "Standup (moved)"
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, server.snapshot.fingerprint.mtime_ns + 1_000_000))
+
+        started = time.perf_counter()
+        result = await server._call_tool("get_meeting_details", {"meeting_id": "m1"})
+        assert time.perf_counter() - started < 0.25, "tool call waited for the reload"
+        assert "# Meeting Details: Standup\n" in result[0].text
+        assert server._load_task is not None
+
+        await finish_reload(server)
+        result = await server._call_tool("get_meeting_details", {"meeting_id": "m1"})
+        assert "Standup (moved)" in result[0].text
+        assert server.reload_stats.reloads == 1
+    finally:
+        Path(cache_path).unlink()
+
+    print("✅ Background reload test passed!")
+
+
+async def test_parallel_parse():
+    """Parsing across worker processes gives the same result as in-process parsing."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        documents, transcripts, panels = {}, {}, {}
+        for i in range(20):
+            key = f"m{i}"
+            documents[key] = make_meeting(f"Meeting {i}", "2024-08-01T09:00:00Z", ["Ana", "Ben"],
+                                          notes="" if i % 2 else f"Notes {i}")
+            transcripts[key] = [{"text": f"line {j} of {i}", "source": ("system", "microphone")[j % 2]}
+                                for j in range(5)]
+            panels[key] = {"p": {"content": [{"type": "text", "text": f"Panel {i}"}]}}
+        write_cache(cache_path, {"documents": documents, "transcripts": transcripts, "documentPanels": panels})
+
+        serial = GranolaMCPServer(cache_path=cache_path)
+        serial.parse_workers = 0
+        expected = serial._read_and_parse(previous=None)
+
+        original = parsing.BATCH_CHARS
+        parsing.BATCH_CHARS = 1000
+        try:
+            pooled = GranolaMCPServer(cache_path=cache_path)
+            pooled.parse_workers = 2
+            result = pooled._read_and_parse(previous=None)
+        finally:
+            parsing.BATCH_CHARS = original
+
+        assert result.meetings == expected.meetings
+        assert result.documents == expected.documents
+        assert result.transcripts == expected.transcripts
+        assert result.documents["m1"].content == "Panel 1"
+        assert result.transcripts["m0"].speakers == ["system", "microphone"]
+
+        print("✅ Parallel parse test passed!")
+
+    finally:
+        Path(cache_path).unlink()
+
+
+async def test_transcript_segments():
+    """Transcripts keep per-segment speaker and timing in columnar form."""
+    server = GranolaMCPServer(cache_path="/nonexistent/cache-v3.json")
+    raw = {
+        "documents": {"m1": make_meeting("Sync", "2024-09-01T09:00:00Z")},
+        "transcripts": {
+            "m1": [
+                {"text": " Hello there ", "source": "microphone",
+                 "start_timestamp": "2024-09-01T09:00:00.000Z", "end_timestamp": "2024-09-01T09:00:02.500Z"},
+                {"text": "   ", "source": "system"},
+                {"text": "Hi!", "source": "system", "start_timestamp": "2024-09-01T09:00:03Z"},
+            ],
+        },
+    }
+    transcript = server._parse_cache_data(raw).transcripts["m1"]
+    segments = transcript.segments
+
+    assert transcript.content == "Hello there Hi!"
+    assert transcript.speakers == ["microphone", "system"]
+    assert len(segments) == 2
+    assert segments.segment_text(1) == "Hi!"
+    assert list(segments.speaker_ids) == [0, 1]
+    assert segments.end_times[0] - segments.start_times[0] == 2.5
+    assert segments.end_times[1] != segments.end_times[1]  # missing timing is NaN
+    assert segments.segment_at(transcript.content.index("Hi")) == 1
+
+    # Time windows are bisected: a segment running into the window is included, untimed ones never are
+    timed = TranscriptSegments()
+    for start, end in ((math.nan, math.nan), (0, 10), (8, 30), (12, math.nan), (20, 25), (40, 45)):
+        timed.append(f"at{start}", start_time=start, end_time=end)
+    assert timed.time_range(15, 22) == (2, 5)
+    assert timed.time_range(31, 35) == (5, 5)
+    assert timed.time_range(50) == (6, 6)
+    assert timed.time_range(end_time=5) == (1, 2)
+    untimed = TranscriptSegments.from_text("no timing")
+    assert untimed.time_range() == untimed.time_range(0, 10) == (1, 1)
+
+    print("✅ Transcript segments test passed!")
+
+
+async def test_transcript_pagination():
+    """Transcripts can be read in bounded pages and by segment or time window."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        segments = [
+            {"text": f"Segment {i} says word{i} again", "source": "microphone",
+             "start_timestamp": f"2024-10-01T09:{i:02d}:00Z", "end_timestamp": f"2024-10-01T09:{i:02d}:30Z"}
+            for i in range(30)
+        ]
+        write_cache(cache_path, {
+            "documents": {"m1": make_meeting("Long call", "2024-10-01T09:00:00Z")},
+            "transcripts": {"m1": segments},
+        })
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._ensure_cache_loaded()
+        full_text = server.cache_data.transcripts["m1"].content
+
+        # Following cursors reassembles the whole transcript in bounded pages
+        pages, cursor = [], None
+        while True:
+            result = await server._get_meeting_transcript("m1", max_chars=100, cursor=cursor)
+            text = result[0].text
+            body = text.split(")\n\n", 1)[1].split("\n\n**More available:**")[0]
+            assert len(body) <= 100
+            pages.append(body)
+            if "**More available:**" not in text:
+                break
+            cursor = text.rsplit("`", 2)[1]
+        assert " ".join(pages) == full_text
+
+        # Malformed, out-of-range and foreign cursors are all rejected the same way
+        version = server.snapshot.version
+        for bad in ("garbage", f"{version}:30:-1:50", f"{version}:30:60:50", f"{version}:30:0:100000",
+                    f"{version}:29:0:50", f"{version + 1}:30:0:50"):
+            result = await server._get_meeting_transcript("m1", cursor=bad)
+            assert result[0].text == f"Invalid transcript window: unrecognised cursor '{bad}'", result[0].text
+        for bad in (0, -5):
+            result = await server._get_meeting_transcript("m1", max_chars=bad)
+            assert result[0].text == f"Invalid transcript window: max_chars must be an integer of at least 1, got {bad}"
+
+        result = await server._get_meeting_transcript("m1", start_segment=3, end_segment=5)
+        assert "Segment 3 says" in result[0].text and "Segment 4 says" in result[0].text
+        assert "Segment 5 says" not in result[0].text
+
+        # Minutes 10-12 from the start, given as seconds
+        result = await server._get_meeting_transcript("m1", start_time=600, end_time=720)
+        assert "word10" in result[0].text and "word12" in result[0].text
+        assert "word9 " not in result[0].text and "word13" not in result[0].text
+
+        result = await server._get_meeting_transcript("m1", start_time="2024-10-01T09:29:00Z")
+        assert "word29" in result[0].text and "word28" not in result[0].text
+
+        # No window arguments: the unchanged full transcript
+        result = await server._get_meeting_transcript("m1")
+        assert result[0].text.endswith("## Transcript Content\n\n" + full_text)
+
+        print("✅ Transcript pagination test passed!")
+
+    finally:
+        Path(cache_path).unlink()
+
+
+async def test_meeting_index():
+    """Per-meeting lookups use secondary indexes that stay in sync on reload."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        state = {"documents": {
+            "m1": make_meeting("Kickoff", "2024-01-05T09:00:00Z", ["Ana", "Ben"], "Notes"),
+            "m2": make_meeting("Review", "2024-02-05T09:00:00Z", ["ana"], "Notes"),
+            "m3": make_meeting("Planning", "2024-03-05T09:00:00Z", ["Ben"], "Notes"),
+        }}
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._ensure_cache_loaded()
+        index = server.snapshot.meeting_index
+        assert isinstance(index, MeetingIndex)
+
+        assert index.documents_for("m1") == ["m1"]
+        assert index.meetings_with("Ben") == ["m1", "m3"]
+        assert index.meetings_with("ANA") == ["m1"]
+        start = int(datetime(2024, 2, 1, tzinfo=timezone.utc).timestamp())
+        end = int(datetime(2024, 3, 31, tzinfo=timezone.utc).timestamp())
+        assert index.meeting_ids_between(start, end) == ["m2", "m3"]
+
+        result = await server._analyze_meeting_patterns("frequency", {"start_date": "2024-02-01"})
+        assert "(2 meetings)" in result[0].text
+        # A date-only end_date includes meetings later that day
+        result = await server._analyze_meeting_patterns("frequency", {"end_date": "2024-02-05"})
+        assert "(2 meetings)" in result[0].text
+        result = await server._search_meetings("notes", date_range={"start_date": "2024-02-01",
+                                                                    "end_date": "2024-02-28"})
+        assert "(m2)" in result[0].text and "(m1)" not in result[0].text and "(m3)" not in result[0].text
+        # The participant filter goes through meetings_with, so the name matches case-insensitively
+        result = await server._search_meetings("notes", participant="ben")
+        assert "(m1)" in result[0].text and "(m3)" in result[0].text and "(m2)" not in result[0].text
+        result = await server._search_meetings("notes", participant="Ben", date_range={"start_date": "2024-02-01"})
+        assert "(m3)" in result[0].text and "(m1)" not in result[0].text
+        result = await server._search_meetings("notes", participant="Nobody")
+        assert result[0].text == "No meetings found matching 'notes'"
+        result = await server._search_meetings("notes", participant=["Ben"])
+        assert result[0].text == "Invalid participant: expected a name, got list"
+        result = await server._search_meetings("notes", field_boosts={"title": -2})
+        assert result[0].text == "Invalid field_boosts: boost for 'title' must be a non-negative number, got -2"
+        result = await server._search_meetings("notes", date_range={"start_date": "not a date"})
+        assert result[0].text.startswith("Invalid date_range")
+        for date_range in ({"start_date": 20240201}, {"end_date": ["2024-02-28"]}, "2024-02-01"):
+            result = await server._search_meetings("notes", date_range=date_range)
+            assert result[0].text.startswith("Invalid date_range"), result[0].text
+        result = await server._analyze_meeting_patterns("frequency", {"start_date": 20240201})
+        assert result[0].text.startswith("Invalid date_range")
+
+        # Move m1 later, drop m3, add m4; the patched index matches a fresh build
+        state["documents"]["m1"]["created_at"] = "2024-04-01T09:00:00Z"
+        state["documents"]["m1"]["people"] = [{"name": "Cleo"}]
+        del state["documents"]["m3"]
+        state["documents"]["m4"] = make_meeting("Retro", "2024-01-01T09:00:00Z", ["Ben"], "Notes")
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, server.snapshot.fingerprint.mtime_ns + 1_000_000))
+        previous = server.snapshot.cache_data
+        await finish_reload(server)
+
+        # Force the incremental path; a small cache would otherwise rebuild
+        original = meeting_index.REBUILD_RATIO
+        meeting_index.REBUILD_RATIO = 2.0
+        try:
+            patched = index.updated(previous, server.cache_data, {"m1", "m3", "m4"})
+        finally:
+            meeting_index.REBUILD_RATIO = original
+        assert patched is not index
+        assert server.snapshot.meeting_index.ids_by_date == MeetingIndex.build(server.cache_data).ids_by_date
+        for current in (patched, server.snapshot.meeting_index):
+            assert current.ids_by_date == ["m4", "m2", "m1"]
+            assert current.meetings_with("ben") == ["m4"]
+            assert current.meetings_with("Cleo") == ["m1"]
+            assert current.documents_for("m3") == []
+        assert index.meetings_with("Ben") == ["m1", "m3"], "previous index must not change"
+        result = await server._call_tool("search_meetings", {"query": "notes", "participant": "BEN"})
+        assert "(m4)" in result[0].text and "(m1)" not in result[0].text
+
+        print("✅ Meeting index test passed!")
+
+    finally:
+        Path(cache_path).unlink()
+
+
+async def test_rollups():
+    """Day rollups give the same counts as counting meetings directly, before and after updates."""
+    rng = random.Random(7)
+    people = ["Ana", "Ben", "Cleo", "Dev"]
+    words = ["roadmap", "budget", "hiring", "weekly", "sync"]
+
+    def random_meeting(meeting_id):
+        moment = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(60 * 24 * 90))
+        return MeetingMetadata(id=meeting_id, title=" ".join(rng.sample(words, 2)), date=moment,
+                               participants=rng.sample(people, rng.randint(0, 3)))
+
+    def direct(meetings, start, end):
+        selected = [m for m in meetings.values() if start <= int(m.date.timestamp()) <= end]
+        participants, months, topics = Counter(), Counter(), Counter()
+        for meeting in selected:
+            participants.update(list(dict.fromkeys(meeting.participants)))
+            months[meeting.date.strftime("%Y-%m")] += 1
+            topics.update(title_topics(meeting.title))
+        return len(selected), participants, months, topics
+
+    def check(index, meetings):
+        for _ in range(25):
+            start = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()) + rng.randrange(86400 * 90)
+            end = start + rng.choice([3600, 86400, 86400 * 7, 86400 * 40]) + rng.randrange(86400)
+            summary = index.summary(meetings, start, end)
+            assert (summary.meetings, +summary.participants, +summary.months, +summary.topics) == \
+                direct(meetings, start, end)
+
+    cache_data = CacheData(meetings={f"m{i}": random_meeting(f"m{i}") for i in range(300)})
+    index = MeetingIndex.build(cache_data)
+    check(index, cache_data.meetings)
+    everything = index.summary(cache_data.meetings)
+    assert everything.meetings == 300 and sum(everything.months.values()) == 300
+
+    # Incremental update: move, drop and add a few meetings
+    updated = CacheData(meetings=dict(cache_data.meetings))
+    for i in range(5):
+        updated.meetings[f"m{i}"] = random_meeting(f"m{i}")
+        del updated.meetings[f"m{i + 100}"]
+        updated.meetings[f"n{i}"] = random_meeting(f"n{i}")
+    changed = {f"m{i}" for i in range(5)} | {f"m{i + 100}" for i in range(5)} | {f"n{i}" for i in range(5)}
+    patched = index.updated(cache_data, updated, changed)
+    assert patched.rollups is not index.rollups
+    check(patched, updated.meetings)
+    check(index, cache_data.meetings)
+
+    print("✅ Rollups test passed!")
+
+
+async def test_topic_index():
+    """TF-IDF topics come from notes and transcripts, slice by date and are cached per snapshot."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        state = {
+            "documents": {
+                "m1": make_meeting("Weekly", "2024-01-05T09:00:00Z", ["Ana"], "Kubernetes migration plan"),
+                "m2": make_meeting("Weekly", "2024-02-05T09:00:00Z", ["Ana"], "Pricing review and pricing tiers"),
+                "m3": make_meeting("Weekly", "2024-03-05T09:00:00Z", ["Ana"], "Hiring loop"),
+            },
+            "transcripts": {
+                "m2": [{"text": "we should revisit pricing for enterprise", "source": "system"}],
+                "m3": [{"text": "the kubernetes migration slipped", "source": "microphone"}],
+            },
+        }
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._ensure_cache_loaded()
+
+        assert content_terms("The pricing review, 2024") == ["pricing", "review", "pricing review"]
+
+        result = await server._analyze_meeting_patterns("content_topics")
+        text = result[0].text
+        assert "Content Topic Analysis (3 meetings)" in text
+        assert "**pricing:**" in text and "**kubernetes migration:**" in text
+        assert "Weekly" not in text and "**weekly:**" not in text, "titles are not content"
+        topic_index = server.snapshot.topic_index
+        assert topic_index is not None
+
+        # Weights are sublinear TF times smoothed IDF, L2-normalised per meeting
+        terms = dict(zip(topic_index.terms, range(len(topic_index.terms))))
+        row = slice(topic_index.indptr[1], topic_index.indptr[2])
+        weights = dict(zip((topic_index.terms[i] for i in topic_index.indices[row]), topic_index.weights[row]))
+        m2_terms = content_terms("Pricing review and pricing tiers") + content_terms("we should revisit pricing for enterprise")
+        raw = {term: (1 + math.log(m2_terms.count(term))) * (math.log(4 / 2) + 1) for term in set(m2_terms)}
+        norm = math.sqrt(sum(value * value for value in raw.values()))
+        assert set(weights) == set(raw)
+        for term, value in raw.items():
+            assert abs(weights[term] - value / norm) < 1e-6
+        assert "pricing" in terms
+
+        # Date slicing only counts meetings in range
+        top = topic_index.top_terms(*server._date_range_bounds({"start_date": "2024-03-01"}))
+        assert {term for term, _, _ in top} == {"kubernetes", "migration", "slipped", "hiring", "loop",
+                                               "kubernetes migration", "migration slipped", "hiring loop"}
+        assert all(meetings == 1 for _, _, meetings in top)
+        result = await server._analyze_meeting_patterns("content_topics", {"start_date": "2025-01-01"})
+        assert result[0].text == "No meetings found for analysis"
+
+        # Cached for the snapshot, rebuilt after a reload
+        await server._analyze_meeting_patterns("content_topics", {"end_date": "2024-01-31"})
+        assert server.snapshot.topic_index is topic_index
+        state["documents"]["m1"]["notes_plain"] = "Observability budget"
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, server.snapshot.fingerprint.mtime_ns + 1_000_000))
+        await finish_reload(server)
+        assert server.snapshot.topic_index is None
+        result = await server._analyze_meeting_patterns("content_topics", {"end_date": "2024-01-31"})
+        assert "**observability:**" in result[0].text and "kubernetes" not in result[0].text
+    finally:
+        os.unlink(cache_path)
+
+    print("✅ Topic index test passed!")
+
+
+async def test_meetings_batch():
+    """get_meetings_batch returns selected fields for many meetings within a per-item budget."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        long_notes = " ".join(f"word{i}" for i in range(400))
+        state = {
+            "documents": {
+                "m1": make_meeting("Kickoff", "2024-01-05T09:00:00Z", ["Ana", "Ben"], "Short notes"),
+                "m2": make_meeting("Review", "2024-02-05T09:00:00Z", ["Ana"], long_notes),
+            },
+            "transcripts": {
+                "m1": [{"text": f"sentence number {i}.", "source": "microphone"} for i in range(200)],
+            },
+        }
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._ensure_cache_loaded()
+
+        # Default fields: metadata plus short previews
+        text = (await server._get_meetings_batch(["m1", "m2", "missing", "m1"]))[0].text
+        assert text.startswith("# Meetings (3 requested)")
+        assert "## Kickoff (m1)" in text and "**Participants:** Ana, Ben" in text
+        assert "**Transcript preview:** sentence number 0." in text
+        assert "Meeting 'missing' not found" in text
+        preview = next(line for line in text.splitlines() if line.startswith("**Notes preview:** word0"))
+        assert len(preview) < PREVIEW_CHARS + 40 and preview.endswith("…")
+
+        # Full notes and transcript share the per-item budget and say how to get the rest
+        text = (await server._get_meetings_batch(["m1", "m2"], fields=["notes", "transcript"],
+                                                 max_chars_per_item=500))[0].text
+        assert "**ID:**" not in text
+        m1, m2 = text.split("## Kickoff (m1)")[1].split("## Review (m2)")
+        assert "Short notes" in m1 and "`cursor` set to" in m1
+        assert "characters 0-" in m1
+        assert "word10 " in m2 and "word399" not in m2 and "use get_meeting_documents" in m2
+        assert "No transcript available" in m2
+        notes = m2.split("### Notes")[1].split("*… truncated")[0]
+        assert 400 < len(notes.split("(meeting_notes)")[-1].strip()) <= 500
+
+        result = await server._get_meetings_batch(["m1"], fields=["everything"])
+        assert result[0].text.startswith("Unknown fields: everything")
+        result = await server._get_meetings_batch([f"m{i}" for i in range(MAX_BATCH_MEETINGS + 1)])
+        assert result[0].text.startswith("Too many meetings")
+    finally:
+        os.unlink(cache_path)
+
+    print("✅ Meetings batch test passed!")
+
+
+async def test_output_options():
+    """fields, max_chars and format shape every tool's response."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        state = {
+            "documents": {
+                "m1": make_meeting("Budget review", "2024-01-05T09:00:00Z", ["Ana", "Ben"],
+                                   " ".join(f"budget{i}" for i in range(200))),
+                "m2": make_meeting("Budget sync", "2024-02-05T09:00:00Z", ["Ana"], "budget notes"),
+                "m3": make_meeting("Budget retro", "2024-03-05T09:00:00Z", ["Cleo"], "budget retro notes"),
+            },
+            "transcripts": {
+                "m1": [{"text": "we reviewed the budget", "source": "microphone"}],
+            },
+        }
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._ensure_cache_loaded()
+
+        # Option parsing
+        options = OutputOptions.from_arguments({"fields": ["id"], "max_chars": 10, "format": "json"}, SEARCH_FIELDS)
+        assert options.is_json and options.fields == {"id"} and options.max_chars == 10
+        for bad in ({"format": "xml"}, {"fields": ["nope"]}, {"max_chars": -1}):
+            try:
+                OutputOptions.from_arguments(bad, SEARCH_FIELDS)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{bad} should be rejected")
+
+        # search_meetings: projection, compact JSON and a result budget
+        json_options = OutputOptions(format="json")
+        payload = json.loads((await server._search_meetings("budget", output=json_options))[0].text)
+        assert {result["id"] for result in payload["results"]} == {"m1", "m2", "m3"}
+        assert set(payload["results"][0]) == {"title", "id", "date", "participants", "snippets"}
+        assert payload["results"][0]["date"][10] == "T" and payload["omitted"] == 0
+        options = OutputOptions(fields=frozenset({"score"}), max_chars=80, format="json")
+        payload = json.loads((await server._search_meetings("budget", output=options))[0].text)
+        assert set(payload["results"][0]) == {"title", "score"} and payload["results"][0]["score"] > 0
+        assert len(payload["results"]) == 2 and payload["omitted"] == 1
+        text = (await server._search_meetings("budget", output=OutputOptions(max_chars=120)))[0].text
+        assert text.count("• **") == 1 and "(showing 1)" in text and "2 more result(s) omitted" in text
+
+        # get_meeting_details
+        payload = json.loads((await server._get_meeting_details("m1", output=json_options))[0].text)
+        assert payload["participants"] == ["Ana", "Ben"] and payload["transcript"] is True
+        assert payload["duration"] is None and payload["documents"] == 1
+        text = (await server._get_meeting_details("m1", output=OutputOptions(fields=frozenset({"id"}))))[0].text
+        assert "**ID:** m1" in text and "**Date:**" not in text and "**Participants:**" not in text
+
+        # get_meeting_documents: content shares max_chars
+        text = (await server._get_meeting_documents("m1", output=OutputOptions(max_chars=50)))[0].text
+        assert "budget0" in text and "budget199" not in text and "more characters) to stay within max_chars" in text
+        options = OutputOptions(fields=frozenset({"id", "content"}), max_chars=50, format="json")
+        payload = json.loads((await server._get_meeting_documents("m1", output=options))[0].text)
+        document = payload["documents"][0]
+        assert set(document) == {"title", "id", "content", "truncated"}
+        assert len(document["content"]) <= 50 and document["truncated"] > 0
+
+        # get_meeting_transcript
+        payload = json.loads((await server._get_meeting_transcript("m1", max_chars=10, output=json_options))[0].text)
+        assert payload["content"] == "we"
+        assert payload["next_cursor"] and payload["range"]["length"] == len("we reviewed the budget")
+        text = (await server._get_meeting_transcript("m1", output=OutputOptions(fields=frozenset({"speakers"}))))[0].text
+        assert "**Speakers:**" in text and "we reviewed" not in text
+
+        # get_meetings_batch and analyze_meeting_patterns
+        payload = json.loads((await server._get_meetings_batch(["m1", "zz"], fields=["metadata", "transcript"],
+                                                               output=json_options))[0].text)
+        first, missing = payload["meetings"]
+        assert first["metadata"]["id"] == "m1" and first["transcript"]["content"] == "we reviewed the budget"
+        assert missing == {"id": "zz", "found": False}
+        payload = json.loads((await server._analyze_meeting_patterns("participants", output=json_options))[0].text)
+        assert payload["participants"][0] == {"name": "Ana", "meetings": 2}
+        payload = json.loads((await server._analyze_meeting_patterns("frequency", output=json_options))[0].text)
+        assert payload["meetings"] == 3 and payload["average_per_month"] == 1.0
+    finally:
+        os.unlink(cache_path)
+
+    print("✅ Output options test passed!")
+
+
+async def test_search_snippets():
+    """Search hits carry highlighted snippets located from stored term positions."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        segments = [{"text": f"Segment {i} talks about nothing much.", "source": "microphone",
+                     "start_timestamp": f"2024-01-05T09:00:{i:02d}Z"} for i in range(40)]
+        segments[25]["text"] = "Then we agreed the Pricing Review moves to Friday."
+        state = {
+            "documents": {
+                "m1": make_meeting("Weekly", "2024-01-05T09:00:00Z", ["Ana"], "Owners for the pricing review"),
+                "m2": make_meeting("Other", "2024-01-06T09:00:00Z", ["Ben"], "Unrelated notes"),
+            },
+            "transcripts": {"m1": segments},
+        }
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._ensure_cache_loaded()
+        transcript = server.cache_data.transcripts["m1"]
+
+        snippets = server._search_snippets("m1", "pricing review", 2)
+        assert sorted(snippet.field for snippet in snippets) == ["notes", "transcript"]
+        for snippet in snippets:
+            assert [snippet.text[a:b].lower() for a, b in snippet.highlights] == ["pricing review"]
+        spoken = next(snippet for snippet in snippets if snippet.field == "transcript")
+        assert transcript.content[spoken.start:spoken.end] == spoken.text
+        assert spoken.segments[0] <= 25 < spoken.segments[1]
+        assert spoken.leading and spoken.trailing and "**Pricing Review**" in spoken.markdown()
+
+        # The segment range reads the matching part of the transcript
+        text = (await server._get_meeting_transcript("m1", start_segment=spoken.segments[0],
+                                                     end_segment=spoken.segments[1]))[0].text
+        assert "Pricing Review moves to Friday" in text
+
+        # Search output shows the snippets, in Markdown and JSON
+        result = (await server._search_meetings("pricing review"))[0].text
+        assert "  > …talks about nothing much. Then we agreed the **Pricing Review** moves" in result
+        assert "_(transcript segments 24-26, offset" in result and "**pricing review**" in result
+        payload = json.loads((await server._search_meetings("pricing", snippets=1,
+                                                            output=OutputOptions(format="json")))[0].text)
+        snippet = payload["results"][0]["snippets"][0]
+        assert set(snippet) >= {"field", "text", "highlights", "offset", "end"}
+        result = (await server._search_meetings("pricing", snippets=0))[0].text
+        assert "  > " not in result
+    finally:
+        os.unlink(cache_path)
+
+    # Notes made of several documents: a document after a long one keeps its own positions
+    created = datetime(2024, 1, 5, tzinfo=timezone.utc)
+    documents = {
+        "d1": MeetingDocument(id="d1", meeting_id="m1", title="Long", content=" ".join(["filler"] * 150),
+                              document_type="meeting_notes", created_at=created),
+        "d2": MeetingDocument(id="d2", meeting_id="m1", title="Short", content="Pricing review owners",
+                              document_type="meeting_notes", created_at=created),
+    }
+    cache_data = CacheData(meetings={"m1": MeetingMetadata(id="m1", title="Weekly", date=created)},
+                           documents=documents)
+    index = SearchIndex.build(cache_data)
+    assert index.phrase_matches("notes", ["filler", "pricing"]) == {}
+    snippets = find_snippets(index, "m1", '"pricing review"', {"notes": [d.content for d in documents.values()]})
+    assert len(snippets) == 1 and snippets[0].unit == 1 and snippets[0].text == "Pricing review owners"
+    assert snippets[0].highlights == [(0, 14)] and not snippets[0].leading
+
+    print("✅ Search snippets test passed!")
+
+
+class CountingEmbedder:
+    """Wraps an embedder and counts the texts it embeds."""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.name, self.dim = embedder.name, embedder.dim
+        self.texts = 0
+
+    def embed(self, texts):
+        self.texts += len(texts)
+        return self.embedder.embed(texts)
+
+
+async def test_semantic_search():
+    """Semantic search ranks chunks by embedding similarity and only embeds changed meetings."""
+    # The hashing embedder is deterministic and puts related wording closer than unrelated text
+    first, second = HashingEmbedder(), HashingEmbedder()
+    texts = ["pricing for enterprise customers", "we priced the enterprise tier", "kubernetes cluster upgrade"]
+    vectors = embed_texts(first, texts)
+    assert (vectors == embed_texts(second, texts)).all()
+    assert abs(float(vectors[0] @ vectors[0]) - 1.0) < 1e-5
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+
+    notes = "Agenda\n\n" + "\n\n".join(" ".join(["filler"] * 60) + f" part{i}" for i in range(4))
+    ranges = paragraph_ranges(notes)
+    assert len(ranges) > 1 and all(end - start <= 800 for start, end in ranges)
+    assert notes[ranges[0][0]:ranges[0][1]].startswith("Agenda")
+
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+    store_dir = tempfile.mkdtemp()
+
+    try:
+        filler = [{"text": f"status update number {i} with nothing new", "source": "microphone"} for i in range(60)]
+        state = {
+            "documents": {
+                "m1": make_meeting("Weekly", "2024-01-05T09:00:00Z", ["Ana"],
+                                   "Hiring plan\n\nWe need two backend engineers before the summer"),
+                "m2": make_meeting("Sync", "2024-02-05T09:00:00Z", ["Ben"], "Kubernetes upgrade checklist"),
+                "m3": make_meeting("Call", "2024-03-05T09:00:00Z", ["Cy"]),
+                "m4": make_meeting("Offsite", "2024-04-05T09:00:00Z", ["Di"],
+                                   "Background\n\n" + "Quarterly forecast slides were shared. " * 18 + "\n\n"
+                                   + "Catering menu options. " * 6 + "The budget freeze blocks vendor renewals. "
+                                   + "Parking passes expire soon. " * 6),
+            },
+            "transcripts": {
+                "m3": filler[:30] + [{"text": "the enterprise pricing tiers were priced too low",
+                                      "source": "system"}] + filler[30:],
+            },
+        }
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path, snapshot_dir=store_dir)
+        server.embedder = CountingEmbedder(HashingEmbedder())
+        await server._ensure_cache_loaded()
+
+        # Built on first use: every chunk embedded once, vectors in a memory-mapped file
+        semantic_index = await server._semantic_index()
+        assert server.embedder.texts == len(semantic_index) >= 4
+        assert semantic_index.vectors.filename is not None
+
+        # A long notes chunk after the first is narrowed to the sentence matching the query
+        position = semantic_index.meeting_ids.index("m4")
+        row = next(row for row in range(len(semantic_index))
+                   if semantic_index.chunk_meetings[row] == position and semantic_index.chunks[row][2] > 0)
+        query = embed_texts(HashingEmbedder(), ["budget freeze vendor renewals"])[0]
+        narrowed = semantic_index.passage(row, 1.0, server.cache_data, server.snapshot.meeting_index,
+                                          query, HashingEmbedder(), 60)
+        assert narrowed.text.startswith("The budget freeze") and narrowed.start <= narrowed.end
+        assert semantic_index.chunks[row][2] <= narrowed.start and narrowed.end <= semantic_index.chunks[row][3]
+
+        result = (await server._semantic_search("enterprise pricing", limit=1))[0].text
+        assert result.startswith("Found 1 meeting(s) related to 'enterprise pricing'")
+        assert "**Call** (m3)" in result and "enterprise pricing tiers" in result
+        assert "_(transcript segments" in result
+        assert server.snapshot.semantic_index is semantic_index
+
+        # Passages point at their source text and transcript segments
+        payload = json.loads((await server._semantic_search(
+            "hiring backend engineers", output=OutputOptions(format="json")))[0].text)
+        top = payload["results"][0]
+        assert top["id"] == "m1" and top["score"] > 0
+        passage = top["passages"][0]
+        assert passage["field"] == "notes" and "backend engineers" in passage["text"]
+        document = server.cache_data.documents["m1"]
+        assert document.content[passage["offset"]:passage["end"]] == passage["text"]
+        payload = json.loads((await server._semantic_search(
+            "enterprise pricing", passages=1, output=OutputOptions(format="json")))[0].text)
+        spoken = payload["results"][0]["passages"][0]
+        transcript = server.cache_data.transcripts["m3"]
+        first_segment, stop_segment = spoken["start_segment"], spoken["end_segment"]
+        assert transcript.segments.segment_at(spoken["offset"]) == first_segment < stop_segment
+        assert transcript.content.find("enterprise pricing") in range(spoken["offset"], spoken["end"])
+
+        # Date ranges restrict results; a query of stopwords matches nothing
+        result = (await server._semantic_search("enterprise pricing", date_range={"end_date": "2024-02-28"}))[0].text
+        assert "(m3)" not in result
+        result = (await server._semantic_search("the and of"))[0].text
+        assert result == "No meetings found related to 'the and of'", result
+
+        # A reload only embeds the changed meeting; the rest are copied from the previous index
+        state["documents"]["m2"]["notes_plain"] = "Kubernetes upgrade postponed to the next quarter"
+        state["documents"]["m2"]["updated_at"] = "2024-02-06T09:00:00Z"
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, server.snapshot.fingerprint.mtime_ns + 1_000_000))
+        await finish_reload(server)
+        embedded = server.embedder.texts
+        await server._semantic_index()
+        assert server.embedder.texts - embedded == 1
+        result = (await server._semantic_search("kubernetes postponed", limit=1))[0].text
+        assert "(m2)" in result and "postponed" in result
+
+        # A restarted server memory-maps the stored vectors and embeds nothing
+        restarted = GranolaMCPServer(cache_path=cache_path, snapshot_dir=store_dir)
+        restarted.embedder = CountingEmbedder(HashingEmbedder())
+        await restarted._ensure_cache_loaded()
+        await restarted._semantic_index()
+        assert restarted.embedder.texts == 0
+        result = (await restarted._semantic_search("kubernetes postponed", limit=1))[0].text
+        assert "(m2)" in result
+
+        # The clustered index answers like brute force on a clear match
+        snapshot = restarted.snapshot
+        clustered = SemanticIndex.build(snapshot.cache_data, snapshot.meeting_index, HashingEmbedder(),
+                                        ann_min_chunks=1)
+        assert clustered.centroids is not None
+        query = embed_texts(HashingEmbedder(), ["enterprise pricing tiers"])[0]
+        exact = snapshot.semantic_index.top_chunks(query, 1)
+        assert clustered.top_chunks(query, 1, probes=1)[0][0] == exact[0][0]
+    finally:
+        os.unlink(cache_path)
+        shutil.rmtree(store_dir)
+
+    print("✅ Semantic search test passed!")
+
+
+async def test_embedder_threads():
+    """Batches embedded from several threads at once match a serial embedding."""
+    rng = random.Random(7)
+    texts = [" ".join(f"word{rng.randrange(20000)}" for _ in range(30)) for _ in range(2000)]
+    expected = HashingEmbedder().embed(texts)
+
+    shared = HashingEmbedder()
+    failures = []
+    def embed(rows):
+        try:
+            for start in range(0, len(rows), 20):
+                batch = rows[start:start + 20]
+                if not np.allclose(shared.embed([texts[row] for row in batch]), expected[batch]):
+                    failures.append(f"rows {batch[0]}..{batch[-1]} differ")
+        except Exception as e:
+            failures.append(repr(e))
+    threads = [threading.Thread(target=embed, args=(list(range(k, len(texts), 4)),)) for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not failures, failures[:3]
+
+    print("✅ Embedder threads test passed!")
+
+
+async def test_text_arena():
+    """Bodies moved to the text arena read back the same, slice without decoding everything and persist."""
+    store_dir = tempfile.mkdtemp()
+    arena = TextArena.create(store_dir, "arena-test")
+    samples = ["plain ascii", "café olé", "naïve – “quoted” €", "emoji 🎉 and more", ""]
+    handles = [arena.store(sample) for sample in samples]
+    arena.flush()
+    assert [handle.width for handle in handles] == [1, 1, 2, 4, 1]
+    for sample, handle in zip(samples, handles):
+        assert str(handle) == sample and handle == sample and len(handle) == len(sample)
+        assert handle[2:7] == sample[2:7] and handle[-3:] == sample[-3:]
+    assert handles[3][6] == "🎉"
+    assert pickle.loads(pickle.dumps(handles[2])) == samples[2]
+
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+    os.environ["GRANOLA_TEXT_ARENA"] = "1"
+    try:
+        state = {
+            "documents": {
+                "m1": make_meeting("Kickoff", "2024-01-05T09:00:00Z", ["Ana"], "Résumé of the kickoff " * 40),
+                "m2": make_meeting("Review", "2024-02-05T09:00:00Z", ["Ben"], "Short notes"),
+            },
+            "transcripts": {
+                "m1": [{"text": f"sentence number {i}.", "source": "microphone"} for i in range(300)],
+            },
+        }
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path, snapshot_dir=store_dir)
+        await server._ensure_cache_loaded()
+        document = server.cache_data.documents["m1"]
+        transcript = server.cache_data.transcripts["m1"]
+        assert isinstance(document.body, ArenaText) and isinstance(transcript.segments.text, ArenaText)
+        assert document.content == "Résumé of the kickoff " * 40
+        assert server.cache_data.text_arena == server.arena.path
+        assert [path for path in os.listdir(store_dir) if path.startswith(server.store.arena_prefix)] == [
+            os.path.basename(server.arena.path)]
+
+        # Tool output is the same as with bodies held in memory
+        del os.environ["GRANOLA_TEXT_ARENA"]
+        plain = GranolaMCPServer(cache_path=cache_path)
+        await plain._ensure_cache_loaded()
+        assert isinstance(plain.cache_data.documents["m1"].body, str)
+        for call in (lambda s: s._get_meeting_transcript("m1", max_chars=500),
+                     lambda s: s._get_meeting_transcript("m1", start_segment=10, end_segment=20),
+                     lambda s: s._get_meeting_documents("m1", output=OutputOptions(max_chars=100)),
+                     lambda s: s._get_meetings_batch(["m1", "m2"]),
+                     lambda s: s._get_meetings_batch(["m1"], fields=["notes", "transcript"], max_chars_per_item=700),
+                     lambda s: s._search_meetings("kickoff sentence")):
+            assert (await call(server))[0].text == (await call(plain))[0].text
+        os.environ["GRANOLA_TEXT_ARENA"] = "1"
+
+        # A reload appends only the changed bodies; unchanged ones keep their handles
+        size = server.arena.size
+        state["documents"]["m2"]["notes_plain"] = "Longer notes after the review"
+        state["documents"]["m2"]["updated_at"] = "2024-02-06T09:00:00Z"
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, server.snapshot.fingerprint.mtime_ns + 1_000_000))
+        await finish_reload(server)
+        assert server.cache_data.transcripts["m1"].segments.text is transcript.segments.text
+        assert server.arena.size == size + len("Longer notes after the review")
+        assert server.cache_data.documents["m2"].content == "Longer notes after the review"
+
+        # A restart reads the stored snapshot and the same arena file
+        restarted = GranolaMCPServer(cache_path=cache_path, snapshot_dir=store_dir)
+        await restarted._ensure_cache_loaded()
+        assert restarted.reload_stats.store_hits == 1 and restarted.arena is server.arena
+        restored = restarted.cache_data.transcripts["m1"]
+        assert isinstance(restored.segments.text, ArenaText)
+        assert restored.segments.segment_text(299) == "sentence number 299."
+
+        # Once the arena is mostly dead text, bodies move to a fresh file and the old one is removed
+        old_arena = server.arena
+        old_arena.store("x" * 50_000)
+        minimum, server_module.MIN_COMPACT_BYTES = server_module.MIN_COMPACT_BYTES, 0
+        try:
+            server._store_bodies(server.cache_data)
+        finally:
+            server_module.MIN_COMPACT_BYTES = minimum
+        assert server.arena is not old_arena and not os.path.exists(old_arena.path)
+        assert server.arena.size < 10_000
+        assert server.cache_data.documents["m1"].body.arena is server.arena
+        assert server.cache_data.transcripts["m1"].content == restored.content
+    finally:
+        os.environ.pop("GRANOLA_TEXT_ARENA", None)
+        os.unlink(cache_path)
+        shutil.rmtree(store_dir)
+
+    print("✅ Text arena test passed!")
+
+
+async def test_slotted_models():
+    """Models are slotted, pickle cleanly and parsing rejects malformed raw fields."""
+    created = datetime(2024, 3, 1, 9, tzinfo=timezone.utc)
+    meeting = MeetingMetadata(id="m1", title="Planning", date=created)
+    document = MeetingDocument(id="m1", meeting_id="m1", title="Planning", content="Notes",
+                               document_type="meeting_notes", created_at=created)
+    for model in (meeting, document, CacheData()):
+        assert not hasattr(model, "__dict__")
+    assert document.body == document.content == "Notes" and document.tags == []
+    assert MeetingMetadata(id="m2", title="Other", date=created).participants is not meeting.participants
+
+    cache_data = CacheData(meetings={"m1": meeting}, documents={"m1": document})
+    assert pickle.loads(pickle.dumps(cache_data)) == cache_data
+
+    # Pydantic used to reject these; the parser now checks them itself
+    assert parsing.parse_meeting("m1", {"title": None, "created_at": "2024-03-01T09:00:00Z"}) is None
+    assert parsing.parse_meeting("m1", {"title": "Sync", "people": [{"name": 7}]}) is None
+    parsed = parsing.parse_meeting("m1", {"title": "Sync", "type": None, "people": [{"name": "Ana"}, {}]})
+    assert parsed.participants == ["Ana"] and parsed.meeting_type is None
+
+    print("✅ Slotted models test passed!")
+
+
+async def test_response_cache():
+    """Repeated calls are answered from the response cache until the snapshot changes."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        state = {"documents": {"m1": make_meeting("Pricing review", "2024-02-01T09:00:00Z", ["Ana"]),
+                               "m2": make_meeting("Hiring sync", "2024-02-02T09:00:00Z", ["Ben"])}}
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path)
+        stats = server.response_cache.stats
+
+        first = await server._call_tool("search_meetings", {"query": "pricing", "limit": 5})
+        assert (stats.hits, stats.misses) == (0, 1)
+        # Key order and unset options do not matter
+        again = await server._call_tool("search_meetings", {"limit": 5, "query": "pricing", "date_range": None})
+        assert again[0].text == first[0].text and (stats.hits, stats.misses) == (1, 1)
+        # Output options are part of the key
+        as_json = await server._call_tool("search_meetings", {"query": "pricing", "limit": 5, "format": "json"})
+        assert as_json[0].text != first[0].text and stats.misses == 2
+        # Lookups of single meetings are not cached
+        await server._call_tool("get_meeting_details", {"meeting_id": "m1"})
+        assert stats.entries == 2 and stats.misses == 2
+
+        # A reload invalidates what was computed on the previous snapshot
+        state["documents"]["m3"] = make_meeting("Pricing follow-up", "2024-02-03T09:00:00Z")
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, server.snapshot.fingerprint.mtime_ns + 1_000_000))
+        await finish_reload(server)
+        reloaded = await server._call_tool("search_meetings", {"query": "pricing", "limit": 5})
+        assert "Pricing follow-up" in reloaded[0].text and "Pricing follow-up" not in first[0].text
+        assert stats.invalidations == 2 and stats.entries == 1
+
+        # Bounded by entry count, least recently used first
+        server.response_cache.max_entries = 2
+        await server._call_tool("analyze_meeting_patterns", {"pattern_type": "participants"})
+        await server._call_tool("search_meetings", {"query": "pricing", "limit": 5})
+        await server._call_tool("analyze_meeting_patterns", {"pattern_type": "frequency"})
+        assert stats.evictions == 1 and stats.entries == 2
+        hits = stats.hits
+        await server._call_tool("search_meetings", {"query": "pricing", "limit": 5})
+        assert stats.hits == hits + 1
+
+        # Results larger than the character budget are not kept
+        server.response_cache.max_chars = 10
+        misses = stats.misses
+        for _ in range(2):
+            await server._call_tool("analyze_meeting_patterns", {"pattern_type": "topics"})
+        assert stats.misses == misses + 2 and stats.entries == 2
+    finally:
+        os.unlink(cache_path)
+
+    print("✅ Response cache test passed!")
+
+
+async def test_lazy_parse():
+    """Lazy loads parse notes and transcripts on first access and answer like eager ones."""
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    state = {
+        "documents": {
+            "m1": make_meeting("Pricing review", "2024-05-01T09:00:00Z", ["Ana"]),
+            "m2": make_meeting("Hiring sync", "2024-05-02T09:00:00Z", ["Ben"], notes="Budget for two engineers"),
+            "m3": make_meeting("Roadmap", "2024-05-03T09:00:00Z"),
+        },
+        "documentPanels": {"m1": {"p1": {"content": [{"type": "text", "text": "Panel pricing notes"}]}}},
+        "transcripts": {
+            "m1": [{"text": "the pricing tiers need review", "source": "microphone"}],
+            "m2": [{"text": "we agreed on the hiring budget", "source": "system"}],
+            "m3": [{"text": "   ", "source": "system"}],
+        },
+    }
+    calls = [
+        ("search_meetings", {"query": "pricing budget", "limit": 5, "format": "json"}),
+        ("get_meeting_documents", {"meeting_id": "m1"}),
+        ("get_meeting_transcript", {"meeting_id": "m2"}),
+        ("get_meeting_details", {"meeting_id": "m3"}),
+        ("analyze_meeting_patterns", {"pattern_type": "content_topics"}),
+    ]
+
+    try:
+        write_cache(cache_path, state)
+        eager = GranolaMCPServer(cache_path=cache_path)
+        os.environ["GRANOLA_LAZY_PARSE"] = "1"
+        server = GranolaMCPServer(cache_path=cache_path)
+        await server._ensure_cache_loaded()
+
+        # Only metadata and title/participant postings exist after the load
+        entries = {**server.cache_data.documents.entries,
+                   **{f"t-{key}": entry for key, entry in server.cache_data.transcripts.entries.items()}}
+        assert all(entry.source is not None for entry in entries.values())
+        assert not server.snapshot.search_index.full_text
+        assert server.snapshot.meeting_index.documents_for("m1") == ["m1"]
+
+        # Membership and counts come from the raw entries, so they parse nothing
+        transcripts = server.cache_data.transcripts
+        assert "m1" in transcripts and "m4" not in transcripts and len(transcripts) == 3
+        assert all(entry.source is not None for entry in transcripts.entries.values())
+        details = await server._call_tool("get_meeting_details", {"meeting_id": "m1"})
+        assert "Available" in details[0].text and transcripts.entries["m1"].source is not None
+
+        details = await server._call_tool("get_meeting_documents", {"meeting_id": "m1"})
+        assert "Panel pricing notes" in details[0].text
+        documents = server.cache_data.documents.entries
+        assert documents["m1"].source is None and documents["m2"].source is not None
+
+        for name, arguments in calls:
+            lazy_result = await server._call_tool(name, arguments)
+            eager_result = await eager._call_tool(name, arguments)
+            assert lazy_result[0].text == eager_result[0].text, name
+        assert server.snapshot.search_index.full_text
+        # Building the full-text and topic indexes parsed every body without keeping them
+        assert "m3" not in server.cache_data.transcripts
+        assert server.cache_data.documents.entries["m3"].source is not None
+        assert len(server.cache_data.transcripts) == 2
+
+        # A reload re-creates only changed entries; loaded ones carry over
+        loaded = documents["m1"]
+        state["transcripts"]["m2"][0]["text"] = "we agreed on the contractor budget"
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, server.snapshot.fingerprint.mtime_ns + 1_000_000))
+        await finish_reload(server)
+        assert server.cache_data.documents.entries["m1"] is loaded and loaded.model is not None
+        assert server.snapshot.search_index.full_text
+        results = await server._call_tool("search_meetings", {"query": "contractor", "format": "json"})
+        assert [hit["id"] for hit in json.loads(results[0].text)["results"]] == ["m2"]
+    finally:
+        os.environ.pop("GRANOLA_LAZY_PARSE", None)
+        os.unlink(cache_path)
+
+    print("✅ Lazy parse test passed!")
+
+
+async def test_http_transport():
+    """One process serves concurrent streamable HTTP and SSE sessions over a Unix socket."""
+    import stat
+
+    import httpx
+    from mcp import ClientSession
+    from mcp.client.sse import sse_client
+    from mcp.client.streamable_http import streamablehttp_client
+    from granola_mcp_server.http_transport import serve_http
+
+    directory = tempfile.mkdtemp()
+    cache_path = os.path.join(directory, "cache-v3.json")
+    socket_path = os.path.join(directory, "granola.sock")
+    write_cache(cache_path, {"documents": {
+        "m1": make_meeting("Pricing review", "2024-06-01T09:00:00Z", ["Ana"], notes="pricing tiers"),
+        "m2": make_meeting("Hiring sync", "2024-06-02T09:00:00Z", ["Ben"]),
+    }})
+
+    def unix_client(headers=None, timeout=None, auth=None):
+        return httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(uds=socket_path),
+                                 headers=headers, timeout=timeout, auth=auth)
+
+    async def call(transport, name, arguments):
+        if transport == "http":
+            client = streamablehttp_client("http://localhost/mcp", httpx_client_factory=unix_client)
+        else:
+            client = sse_client("http://localhost/sse", httpx_client_factory=unix_client)
+        async with client as streams:
+            async with ClientSession(streams[0], streams[1]) as session:
+                await session.initialize()
+                result = await session.call_tool(name, arguments)
+                return result.content[0].text
+
+    server = GranolaMCPServer(cache_path=cache_path)
+    try:
+        for transport in ("http", "sse"):
+            stop = asyncio.Event()
+            serving = asyncio.create_task(serve_http(server, transport, socket_path=socket_path, stop=stop))
+            while not os.path.exists(socket_path):
+                await asyncio.sleep(0.01)
+            # Only the owner may connect
+            assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+            texts = await asyncio.gather(
+                call(transport, "search_meetings", {"query": "pricing"}),
+                call(transport, "get_meeting_details", {"meeting_id": "m2"}),
+                call(transport, "search_meetings", {"query": "pricing"}),
+            )
+            assert "Pricing review" in texts[0] and texts[0] == texts[2]
+            assert "Hiring sync" in texts[1]
+
+            stop.set()
+            await serving
+            assert not os.path.exists(socket_path)
+        # Every session shared the one loaded snapshot
+        assert server.reload_stats.loads == 1
+    finally:
+        shutil.rmtree(directory)
+
+    print("✅ HTTP transport test passed!")
+
+
+async def test_server_stats():
+    """Loads record their phases, tool calls their latency, and server_stats reports both."""
+    clock = PhaseClock()
+    with clock.phase("parse_meetings"):
+        with clock.phase("read"):
+            time.sleep(0.02)
+    # Nested phases are not counted in the enclosing one
+    assert clock.seconds["read"] >= 0.02 and clock.seconds["parse_meetings"] < 0.01
+
+    histogram = LatencyHistogram()
+    for ms in (0.5, 3, 3, 3, 40, 700):
+        histogram.record(ms / 1e3)
+    assert histogram.percentile(0.5) == 5 and histogram.percentile(0.99) == 700
+    assert histogram.summary()["buckets"] == {"<=1ms": 1, "<=5ms": 3, "<=50ms": 1, "<=1000ms": 1}
+
+    handle, cache_path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+
+    try:
+        state = {
+            "documents": {"m1": make_meeting("Pricing review", "2024-02-01T09:00:00Z", ["Ana"], notes="Tiers"),
+                          "m2": make_meeting("Hiring sync", "2024-02-02T09:00:00Z", ["Ben"])},
+            "transcripts": {"m1": [{"text": "the pricing tiers need review", "source": "microphone"}]},
+        }
+        write_cache(cache_path, state)
+        server = GranolaMCPServer(cache_path=cache_path, snapshot_dir=tempfile.mkdtemp())
+        server.request_log = True
+
+        log = io.StringIO()
+        with contextlib.redirect_stderr(log):
+            await server._call_tool("search_meetings", {"query": "pricing", "limit": 5})
+            await server._call_tool("search_meetings", {"query": "pricing", "limit": 5})
+            await server._call_tool("get_meeting_details", {"meeting_id": "m2"})
+        server.request_log = False
+        records = [json.loads(line) for line in log.getvalue().splitlines()]
+        assert [(record["tool"], record["cached"]) for record in records] == [
+            ("search_meetings", False), ("search_meetings", True), ("get_meeting_details", False)]
+        assert all(record["snapshot"] == 1 and record["chars"] > 0 and "error" not in record for record in records)
+
+        result = await server._call_tool("server_stats", {"format": "json"})
+        stats = json.loads(result[0].text)
+        for phase in ("read", "outer_decode", "inner_decode", "parse_meetings", "parse_transcripts",
+                      "parse_documents", "index_build", "other"):
+            assert stats["phases"][phase]["count"] == 1, phase
+        assert stats["reloads"]["loads"] == 1 and stats["response_cache"]["hits"] == 1
+        assert stats["tools"]["search_meetings"]["count"] == 2 and stats["tools"]["search_meetings"]["cached"] == 1
+        assert stats["sizes"]["meetings"] == 2 and stats["sizes"]["transcripts"] == 1
+        assert stats["sizes"]["search_index_bytes"] > 0 and stats["sizes"]["topic_index_bytes"] is None
+
+        # A reload adds to the phase counts; first-use indexes are timed as well
+        state["documents"]["m3"] = make_meeting("Pricing follow-up", "2024-02-03T09:00:00Z")
+        write_cache(cache_path, state)
+        os.utime(cache_path, ns=(1, server.snapshot.fingerprint.mtime_ns + 1_000_000))
+        await finish_reload(server)
+        await server._call_tool("analyze_meeting_patterns", {"pattern_type": "content_topics"})
+        markdown = (await server._call_tool("server_stats", {}))[0].text
+        assert "# Server Stats" in markdown and "1 reloads" in markdown
+        assert "**index_topics:**" in markdown and "**server_stats:** 1 calls" in markdown
+        assert server.stats.phases["index_build"].count == 2
+
+        # Load failures are logged as structured lines on stderr, whatever GRANOLA_REQUEST_LOG says
+        with open(cache_path, "w") as broken:
+            broken.write('{"cache": "{\\"state\\": {')
+        log = io.StringIO()
+        with contextlib.redirect_stderr(log):
+            await finish_reload(server)
+        record = json.loads(log.getvalue())
+        assert record["event"] == "load_failed" and record["cache_path"] == cache_path
+        assert record["initial"] is False and "Unterminated string" in record["error"]
+        assert server.reload_stats.failures == 1
+    finally:
+        os.unlink(cache_path)
+
+    print("✅ Server stats test passed!")
+
+
+async def main():
+    await test_server()
+    await test_hot_reload()
+    await test_incremental_parse()
+    await test_search_index()
+    await test_bm25_search()
+    await test_snapshot_store()
+    await test_streaming_reader()
+    await test_background_load()
+    await test_reload_in_background()
+    await test_parallel_parse()
+    await test_transcript_segments()
+    await test_transcript_pagination()
+    await test_meeting_index()
+    await test_rollups()
+    await test_topic_index()
+    await test_meetings_batch()
+    await test_output_options()
+    await test_search_snippets()
+    await test_semantic_search()
+    await test_embedder_threads()
+    await test_text_arena()
+    await test_slotted_models()
+    await test_response_cache()
+    await test_lazy_parse()
+    await test_http_transport()
+    await test_server_stats()
+
+
 if __name__ == "__main__":
-    asyncio.run(test_server())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file